@@ -11,13 +11,11 @@ Classes and functions defined in this file are considered stable. Always
 import from this file, not from the source files directly.
 """
 
-from .errors import (UsageError as UsageError)
-from .config import (Configuration as Configuration)
+from typing import Any, TYPE_CHECKING
+import importlib
 
-from .core import (NominatimAPI as NominatimAPI,
-                   NominatimAPIAsync as NominatimAPIAsync)
-from .connection import (SearchConnection as SearchConnection)
-from .status import (StatusResult as StatusResult)
+from .version import NOMINATIM_API_VERSION as __version__
+from .errors import (UsageError as UsageError)
 from .types import (PlaceID as PlaceID,
                     OsmID as OsmID,
                     PostcodeRef as PostcodeRef,
@@ -28,18 +26,63 @@ from .types import (PlaceID as PlaceID,
                     GeometryFormat as GeometryFormat,
                     DataLayer as DataLayer,
                     QueryStatistics as QueryStatistics)
-from .results import (SourceTable as SourceTable,
-                      AddressLine as AddressLine,
-                      AddressLines as AddressLines,
-                      WordInfo as WordInfo,
-                      WordInfos as WordInfos,
-                      DetailedResult as DetailedResult,
-                      ReverseResult as ReverseResult,
-                      ReverseResults as ReverseResults,
-                      SearchResult as SearchResult,
-                      SearchResults as SearchResults)
-from .localization import (Locales as Locales)
-from .result_formatting import (FormatDispatcher as FormatDispatcher,
-                                load_format_dispatcher as load_format_dispatcher)
 
-from .version import NOMINATIM_API_VERSION as __version__
+if TYPE_CHECKING:
+    from .config import (Configuration as Configuration)
+    from .core import (NominatimAPI as NominatimAPI,
+                       NominatimAPIAsync as NominatimAPIAsync)
+    from .connection import (SearchConnection as SearchConnection)
+    from .status import (StatusResult as StatusResult)
+    from .results import (SourceTable as SourceTable,
+                          AddressLine as AddressLine,
+                          AddressLines as AddressLines,
+                          WordInfo as WordInfo,
+                          WordInfos as WordInfos,
+                          DetailedResult as DetailedResult,
+                          ReverseResult as ReverseResult,
+                          ReverseResults as ReverseResults,
+                          SearchResult as SearchResult,
+                          SearchResults as SearchResults)
+    from .localization import (Locales as Locales)
+    from .result_formatting import (FormatDispatcher as FormatDispatcher,
+                                    load_format_dispatcher as load_format_dispatcher)
+
+# The remaining names pull in SQLAlchemy, the database drivers and
+# the YAML parser. They are only imported on first access, so that
+# importing the library or one of its lightweight modules stays cheap.
+_LAZY_IMPORTS = {
+    'Configuration': '.config',
+    'NominatimAPI': '.core',
+    'NominatimAPIAsync': '.core',
+    'SearchConnection': '.connection',
+    'StatusResult': '.status',
+    'SourceTable': '.results',
+    'AddressLine': '.results',
+    'AddressLines': '.results',
+    'WordInfo': '.results',
+    'WordInfos': '.results',
+    'DetailedResult': '.results',
+    'ReverseResult': '.results',
+    'ReverseResults': '.results',
+    'SearchResult': '.results',
+    'SearchResults': '.results',
+    'Locales': '.localization',
+    'FormatDispatcher': '.result_formatting',
+    'load_format_dispatcher': '.result_formatting'
+}
+
+
+def __getattr__(name: str) -> Any:
+    """ Import the names of the public interface on first access.
+    """
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> Any:
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
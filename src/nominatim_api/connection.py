@@ -8,20 +8,72 @@
 Extended SQLAlchemy connection class that also includes access to the schema.
 """
 from typing import cast, Any, Mapping, Sequence, Union, Dict, Optional, Set, \
-                   Awaitable, Callable, TypeVar
+                   Awaitable, Callable, TypeVar, AsyncIterator
 import asyncio
+import contextlib
+import contextvars
+import math
+import time
 
 import sqlalchemy as sa
 from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.util import queue as sqla_queue
 
 from .typing import SaFromClause
 from .sql.sqlalchemy_schema import SearchTables
 from .sql.sqlalchemy_types import Geometry
 from .logging import log
 from .config import Configuration
+from .timeout import Timeout
+from .types import current_query_stats
 
 T = TypeVar('T')
 
+# Extra time in seconds to wait for the result of a statement after
+# the database should have cancelled it.
+STATEMENT_GRACE_TIME = 0.5
+
+# Maximum time in seconds by which the statement timeout set on the
+# database side may exceed the remaining request budget before it is
+# set anew. Statements are waited for until the timeout on the database
+# side has passed, so a request may overrun its budget by this much plus
+# the grace time.
+STATEMENT_TIMEOUT_SLACK = 1.0
+
+# Set while a connection is taken from the pool for a fork.
+_NO_WAIT_FOR_CONNECTION = contextvars.ContextVar('_NO_WAIT_FOR_CONNECTION', default=False)
+
+
+class ForkingConnectionPool(sa.pool.AsyncAdaptedQueuePool):
+    """ Connection pool that hands out connections for forked connections
+        only when it can do so without waiting. Free connections are
+        taken in the same step as the check, so that no other request
+        can grab the connection in between.
+    """
+
+    def _do_get(self) -> sa.pool.ConnectionPoolEntry:
+        if _NO_WAIT_FOR_CONNECTION.get() \
+           and -1 < self._max_overflow <= self._overflow:
+            try:
+                return self._pool.get(False)
+            except sqla_queue.Empty:
+                raise sa.exc.TimeoutError('No free connection in the pool.') from None
+
+        return super()._do_get()
+
+
+def _is_query_canceled(exc: 'sa.exc.DBAPIError') -> bool:
+    """ Check if the database error was caused by the statement timeout
+        (SQLSTATE 57014: query_canceled). The error code is either on the
+        error of the DBAPI driver itself or, for the asyncpg adapter,
+        on the original asyncpg exception that caused it.
+    """
+    for err in (exc.orig, getattr(exc.orig, '__cause__', None)):
+        if getattr(err, 'sqlstate', None) == '57014':
+            return True
+
+    return False
+
 
 class SearchConnection:
     """ An extended SQLAlchemy connection class, that also contains
@@ -40,19 +92,140 @@ class SearchConnection:
         self._property_cache = properties
         self._classtables: Optional[Set[str]] = None
         self.query_timeout: Optional[int] = None
+        self.request_timeout: Optional[Timeout] = None
+        self._statement_timeout: Optional[int] = None
 
-    def set_query_timeout(self, timeout: Optional[int]) -> None:
+    def set_query_timeout(self, timeout: Optional[int],
+                          request_timeout: Optional[Timeout] = None) -> None:
         """ Set the timeout after which a query over this connection
-            is cancelled.
+            is cancelled. When a request timeout is given as well, then
+            no query may run past the end of the request.
+
+            The timeout is enforced on the database side, so that
+            cancelled queries do not continue to use database resources.
         """
         self.query_timeout = timeout
+        self.request_timeout = request_timeout
+
+    @contextlib.asynccontextmanager
+    async def fork(self) -> AsyncIterator[Optional['SearchConnection']]:
+        """ Open an additional connection to the same database with its
+            own transaction. The new connection shares the caches and
+            the query timeout with this connection.
+
+            The connection is only taken from the connection pool, when
+            it is available without waiting. Otherwise None is returned
+            and the caller needs to do its work on this connection.
+        """
+        token = _NO_WAIT_FOR_CONNECTION.set(True)
+        try:
+            conn = await self.connection.engine.connect()
+        except sa.exc.TimeoutError:
+            conn = None
+        finally:
+            _NO_WAIT_FOR_CONNECTION.reset(token)
+
+        if conn is None:
+            yield None
+            return
+
+        try:
+            async with conn.begin():
+                forked = SearchConnection(conn, self.t, self._property_cache, self.config)
+                forked.set_query_timeout(self.query_timeout, self.request_timeout)
+                yield forked
+        finally:
+            await conn.close()
+
+    def _get_statement_limit(self) -> Optional[float]:
+        """ Return the time in seconds the next statement may run.
+        """
+        limit: Optional[float] = self.query_timeout
+        if self.request_timeout is not None:
+            remaining = self.request_timeout.remaining()
+            if remaining is not None and (limit is None or remaining < limit):
+                limit = remaining
+
+        return limit
+
+    async def _set_statement_timeout(self, limit: float) -> None:
+        """ Make sure that the database cancels the next statement
+            after at most 'limit' seconds. The setting is only changed,
+            when the current one does not fit the limit anymore.
+        """
+        msecs = max(1, math.ceil(limit * 1000))
+        if self._statement_timeout is not None \
+           and msecs <= self._statement_timeout <= msecs + STATEMENT_TIMEOUT_SLACK * 1000:
+            return
+
+        await self.connection.execute(sa.text(f"SET LOCAL statement_timeout = {msecs}"))
+        self._statement_timeout = msecs
+
+    async def _run_with_timeout(self, func: Callable[[], Awaitable[T]]) -> T:
+        """ Run the given statement function within the time limits
+            of the connection. PostgreSQL cancels statements by itself
+            through the statement_timeout setting, SQLite statements are
+            interrupted, when they are abandoned.
+        """
+        limit = self._get_statement_limit()
+
+        try:
+            if limit is None:
+                return await func()
+
+            if self.connection.dialect.name == 'sqlite':
+                return await self._run_interruptible(func, limit)
+
+            await self._set_statement_timeout(limit)
+            # The timeout on the database side may be longer than the limit,
+            # when it is reused. Do not give up on the statement before
+            # the database has cancelled it.
+            assert self._statement_timeout is not None
+            deadline = self._statement_timeout / 1000 + STATEMENT_GRACE_TIME
+            return await asyncio.wait_for(func(), deadline)
+        except asyncio.TimeoutError:
+            self._count_cancelled()
+            raise
+        except sa.exc.DBAPIError as exc:
+            if _is_query_canceled(exc):
+                self._count_cancelled()
+                raise TimeoutError('Statement cancelled by database.') from exc
+            raise
+
+    async def _run_interruptible(self, func: Callable[[], Awaitable[T]], limit: float) -> T:
+        """ Run the given statement function on an SQLite connection
+            and interrupt the statement, when it runs out of time or the
+            request is cancelled. The statement needs to be interrupted
+            before its coroutine is cancelled, or SQLAlchemy would try to
+            close the connection while the statement is still running.
+        """
+        driver_conn = (await self.connection.get_raw_connection()).driver_connection
+        assert driver_conn is not None
+        task = asyncio.ensure_future(func())
+        try:
+            done, _ = await asyncio.wait((task, ), timeout=limit)
+        except asyncio.CancelledError:
+            await driver_conn.interrupt()
+            await asyncio.gather(task, return_exceptions=True)
+            raise
+
+        if not done:
+            await driver_conn.interrupt()
+            await asyncio.gather(task, return_exceptions=True)
+            raise asyncio.TimeoutError()
+
+        return task.result()
+
+    def _count_cancelled(self) -> None:
+        qs = current_query_stats()
+        qs['cancelled_statements'] = (qs['cancelled_statements'] or 0) + 1
 
     async def scalar(self, sql: sa.sql.base.Executable,
                      params: Union[Mapping[str, Any], None] = None) -> Any:
         """ Execute a 'scalar()' query on the connection.
         """
         log().sql(self.connection, sql, params)
-        return await asyncio.wait_for(self.connection.scalar(sql, params), self.query_timeout)
+        return await self._run_with_timeout(lambda: self.connection.scalar(sql, params))
 
     async def execute(self, sql: 'sa.Executable',
                       params: Union[Mapping[str, Any], Sequence[Mapping[str, Any]], None] = None
@@ -60,7 +233,7 @@ class SearchConnection:
         """ Execute a 'execute()' query on the connection.
         """
         log().sql(self.connection, sql, params)
-        return await asyncio.wait_for(self.connection.execute(sql, params), self.query_timeout)
+        return await self._run_with_timeout(lambda: self.connection.execute(sql, params))
 
     async def get_property(self, name: str, cached: bool = True) -> str:
         """ Get a property from Nominatim's property table.
@@ -100,6 +273,26 @@ class SearchConnection:
 
         return self._property_cache['DB:server_version']
 
+    async def get_data_version(self) -> Any:
+        """ Return a marker for the state of the data in the database.
+            This is the date of the last import or update. Caches use
+            it to find out when their content has become stale.
+
+            The value is read from the database at most once every
+            API_CACHE_CHECK_INTERVAL seconds.
+        """
+        now = time.monotonic()
+        cached = self._property_cache.get('DB:data_version')
+        if cached is not None and now < cached[0]:
+            return cached[1]
+
+        sql = sa.select(self.t.import_status.c.lastimportdate).limit(1)
+        version = await self.scalar(sql)
+        self._property_cache['DB:data_version'] = \
+            (now + self.config.get_int('API_CACHE_CHECK_INTERVAL'), version)
+
+        return version
+
     async def get_cached_value(self, group: str, name: str,
                                factory: Callable[[], Awaitable[T]]) -> T:
         """ Access the cache for this Nominatim instance.
@@ -122,15 +315,31 @@ class SearchConnection:
 
         return value
 
+    async def _get_class_tables(self) -> Set[str]:
+        """ Return the names of all classtype tables. The list is shared
+            between connections and read from the database at most once
+            every API_CACHE_CHECK_INTERVAL seconds.
+        """
+        now = time.monotonic()
+        cached = self._property_cache.get('DB:classtables')
+        if cached is not None and now < cached[0]:
+            return cast(Set[str], cached[1])
+
+        res = await self.execute(sa.text("""SELECT tablename FROM pg_tables
+                                            WHERE tablename LIKE 'place_classtype_%'
+                                         """))
+        tables = {r[0] for r in res}
+        self._property_cache['DB:classtables'] = \
+            (now + self.config.get_int('API_CACHE_CHECK_INTERVAL'), tables)
+
+        return tables
+
     async def get_class_table(self, cls: str, typ: str) -> Optional[SaFromClause]:
         """ Lookup up if there is a classtype table for the given category
             and return a SQLAlchemy table for it, if it exists.
         """
         if self._classtables is None:
-            res = await self.execute(sa.text("""SELECT tablename FROM pg_tables
-                                                WHERE tablename LIKE 'place_classtype_%'
-                                             """))
-            self._classtables = {r[0] for r in res}
+            self._classtables = await self._get_class_tables()
 
         tablename = f"place_classtype_{cls}_{typ}"
 
@@ -8,10 +8,13 @@
 Implementation of classes for API access via libraries.
 """
 from typing import Mapping, Optional, Any, AsyncIterator, Dict, Sequence, List, \
-                   Union, Tuple, cast
+                   Union, Tuple, Hashable, Callable, Awaitable, TypeVar, cast
 import asyncio
+import copy
+import dataclasses
 import sys
 import contextlib
+import time
 from pathlib import Path
 
 if sys.version_info >= (3, 11):
@@ -27,14 +30,23 @@ from .sql.sqlalchemy_schema import SearchTables
 from .sql.async_core_library import PGCORE_LIB, PGCORE_ERROR
 from .config import Configuration
 from .sql import sqlite_functions, sqlalchemy_functions  # noqa
-from .connection import SearchConnection
+from .connection import SearchConnection, ForkingConnectionPool
 from .status import get_status, StatusResult
 from .lookup import get_places, get_detailed_place
 from .reverse import ReverseGeocoder
 from .timeout import Timeout
+from .utils.cache import LRUCache, CallCoalescer
+from .logging import log
+from .result_cache import get_result_cache, cached_call, details_cache_key, normalized_phrases, \
+                          get_reverse_cache, cached_reverse
 from . import search as nsearch
 from . import types as ntyp
-from .results import DetailedResult, ReverseResult, SearchResults
+from .results import DetailedResult, ReverseResult, SearchResults, get_address_place_cache
+
+# Number of queries of a batch search for which the words are looked up together.
+BATCH_CHUNK_SIZE = 100
+
+T = TypeVar('T')
 
 
 class NominatimAPIAsync:
@@ -80,6 +92,12 @@ class NominatimAPIAsync:
         self._engine: Optional[sa_asyncio.AsyncEngine] = None
         self._tables: Optional[SearchTables] = None
         self._property_cache: Dict[str, Any] = {'DB:server_version': 0}
+        self._warming_up = False
+        self._data_version_refresh: Optional['asyncio.Task[None]'] = None
+
+        coalesce_size = self.config.get_int('API_COALESCE_SIZE')
+        if coalesce_size > 0:
+            self._property_cache['CACHE:inflight'] = CallCoalescer[Hashable](coalesce_size)
 
     async def setup_database(self) -> None:
         """ Set up the SQL engine and connections.
@@ -98,7 +116,7 @@ class NominatimAPIAsync:
             if self.config.get_int('API_POOL_SIZE') == 0:
                 extra_args['poolclass'] = sa.pool.NullPool
             else:
-                extra_args['poolclass'] = sa.pool.AsyncAdaptedQueuePool
+                extra_args['poolclass'] = ForkingConnectionPool
                 extra_args['max_overflow'] = 0
                 extra_args['pool_size'] = self.config.get_int('API_POOL_SIZE')
 
@@ -168,9 +186,97 @@ class NominatimAPIAsync:
             object remains usable after closing. If a new API functions is
             called, new connections are created.
         """
+        if self._data_version_refresh is not None:
+            self._data_version_refresh.cancel()
+            await asyncio.gather(self._data_version_refresh, return_exceptions=True)
+            self._data_version_refresh = None
         if self._engine is not None:
             await self._engine.dispose()
 
+    def peek_data_version(self) -> Any:
+        """ Return the marker for the state of the data in the database
+            (see SearchConnection.get_data_version()) without accessing
+            the database. When the known value is missing or older than
+            API_CACHE_CHECK_INTERVAL, it is refreshed in the background.
+            Returns None as long as no value is known.
+        """
+        cached = self._property_cache.get('DB:data_version')
+        if (cached is None or time.monotonic() >= cached[0]) \
+           and (self._data_version_refresh is None or self._data_version_refresh.done()):
+            self._data_version_refresh = asyncio.create_task(self._refresh_data_version())
+
+        return None if cached is None else cached[1]
+
+    async def _refresh_data_version(self) -> None:
+        try:
+            async with self.begin() as conn:
+                await conn.get_data_version()
+        except Exception:
+            pass  # The database is unreachable. Keep the old value for now.
+
+    def cache_statistics(self) -> Dict[str, Dict[str, int]]:
+        """ Return usage statistics for the in-process caches of
+            this API object. The result maps the name of each cache to
+            its current and maximum size and the number of hits, misses
+            and evictions. Caches only appear once they have been used.
+
+            When coalescing of identical calls is enabled, its statistics
+            appear under 'inflight'. Here 'hits' counts the calls that
+            shared the result of another call and 'bypassed' the calls
+            that could not be tracked because too many calls were running.
+        """
+        return {key.split(':', 1)[1]: value.stats()
+                for key, value in self._property_cache.items()
+                if isinstance(value, (LRUCache, CallCoalescer))}
+
+    async def warm_up(self, sample_queries: Optional[Path] = None) -> None:
+        """ Prepare the API object for answering requests.
+
+            Opens all connections of the connection pool and sets up the
+            query analyzer and the other objects that would otherwise be
+            created while the first requests are processed. When a file
+            with 'sample_queries' is given, then the search queries in
+            the file are run as well. The file must contain one query
+            per line. Empty lines and lines starting with '#' are ignored.
+
+            While the warm-up is running, `status()` reports that
+            the API is not ready yet.
+        """
+        self._warming_up = True
+        try:
+            await self.setup_database()
+
+            async with contextlib.AsyncExitStack() as stack:
+                conn = await stack.enter_async_context(self.begin())
+                for _ in range(1, self.config.get_int('API_POOL_SIZE')):
+                    await stack.enter_async_context(self.begin())
+
+                await conn.get_data_version()
+                # Loads the list of classtype tables.
+                await conn.get_class_table('', '')
+                await get_result_cache(conn)
+                await get_reverse_cache(conn)
+                await get_address_place_cache(conn)
+                await nsearch.make_query_preprocessor(conn)
+                try:
+                    await conn.get_property('tokenizer')
+                except ValueError:
+                    pass  # database without search data
+                else:
+                    await nsearch.make_query_analyzer(conn)
+
+            if sample_queries is not None:
+                with sample_queries.open(encoding='utf-8') as fd:
+                    queries = [line.strip() for line in fd]
+                for query in queries:
+                    if query and not query.startswith('#'):
+                        try:
+                            await self.search(query)
+                        except Exception:
+                            pass  # A failing query must not stop the warm-up.
+        finally:
+            self._warming_up = False
+
     async def __aenter__(self) -> 'NominatimAPIAsync':
         return self
 
@@ -197,13 +303,88 @@ class NominatimAPIAsync:
         async with timeout_at(abs_timeout), self._engine.begin() as conn:
             yield SearchConnection(conn, self._tables, self._property_cache, self.config)
 
+    async def _coalesced(self, key: Hashable, details: ntyp.LookupDetails, timeout: Timeout,
+                         func: Callable[[], Awaitable[T]]) -> T:
+        """ Run the given API call function unless an identical call
+            is already in progress. Then wait for its result instead.
+            The call is identified by the 'key' and the parameters.
+            The result of a call that ran out of time may be incomplete
+            and is not shared. The waiting calls then run by themselves.
+        """
+        coalescer = self._property_cache.get('CACHE:inflight')
+        if coalescer is None or log().is_active():
+            return await func()
+
+        result, shared = await coalescer.run((key, details_cache_key(details)), func,
+                                             lambda: not timeout.is_elapsed())
+        details.query_stats['coalesced'] = int(shared)
+
+        return cast(T, result)
+
+    async def _forward_search(self, details: ntyp.SearchDetails, timeout: Timeout,
+                              phrases: List[nsearch.Phrase], extra_key: Hashable,
+                              lookup: Callable[[nsearch.ForwardGeocoder],
+                                               Awaitable[SearchResults]]) -> SearchResults:
+        """ Run the given search function through the result cache and
+            coalesce it with identical searches in progress, when these
+            are enabled. Searches are identified by the normalized phrases,
+            the search parameters and the 'extra_key'.
+
+            Identical searches are detected before the connection for the
+            search is checked out, so that waiting searches do not hold
+            a database connection.
+        """
+        qs = details.query_stats
+        norm_phrases: Optional[Tuple[Tuple[int, str], ...]] = None
+
+        async def _normalize(conn: SearchConnection) -> Tuple[Tuple[int, str], ...]:
+            if not phrases:
+                return ()
+            return normalized_phrases(await nsearch.make_query_analyzer(conn),
+                                      await nsearch.make_query_preprocessor(conn), phrases)
+
+        async def _search() -> SearchResults:
+            async with self.begin(abs_timeout=timeout.abs) as conn:
+                qs.log_time('start_query')
+                conn.set_query_timeout(self.query_timeout, timeout)
+                preprocessor = await nsearch.make_query_preprocessor(conn)
+                geocoder = nsearch.ForwardGeocoder(conn, details, timeout, preprocessor)
+
+                cache = await get_result_cache(conn)
+                if cache is None:
+                    return await lookup(geocoder)
+
+                key = (extra_key,
+                       await _normalize(conn) if norm_phrases is None
+                       else norm_phrases,
+                       details_cache_key(details))
+
+                return await cached_call(conn, cache, key, details, timeout,
+                                         lambda: lookup(geocoder))
+
+        if 'CACHE:inflight' not in self._property_cache or log().is_active():
+            return await _search()
+
+        if phrases:
+            # The connection for normalizing the query goes back to the pool
+            # before waiting for an identical search.
+            async with self.begin(abs_timeout=timeout.abs) as conn:
+                norm_phrases = await _normalize(conn)
+        else:
+            norm_phrases = ()
+
+        return await self._coalesced((extra_key, norm_phrases), details, timeout, _search)
+
     async def status(self) -> StatusResult:
         """ Return the status of the database.
         """
+        if self._warming_up:
+            return StatusResult(701, 'Warming up')
+
         timeout = Timeout(self.request_timeout)
         try:
             async with self.begin(abs_timeout=timeout.abs) as conn:
-                conn.set_query_timeout(self.query_timeout)
+                conn.set_query_timeout(self.query_timeout, timeout)
                 status = await get_status(conn)
         except (PGCORE_ERROR, sa.exc.OperationalError):
             return StatusResult(700, 'Database connection failed')
@@ -220,7 +401,7 @@ class NominatimAPIAsync:
         with details.query_stats as qs:
             async with self.begin(abs_timeout=timeout.abs) as conn:
                 qs.log_time('start_query')
-                conn.set_query_timeout(self.query_timeout)
+                conn.set_query_timeout(self.query_timeout, timeout)
                 if details.keywords:
                     await nsearch.make_query_analyzer(conn)
                 return await get_detailed_place(conn, place, details)
@@ -235,7 +416,7 @@ class NominatimAPIAsync:
         with details.query_stats as qs:
             async with self.begin(abs_timeout=timeout.abs) as conn:
                 qs.log_time('start_query')
-                conn.set_query_timeout(self.query_timeout)
+                conn.set_query_timeout(self.query_timeout, timeout)
                 if details.keywords:
                     await nsearch.make_query_analyzer(conn)
                 return await get_places(conn, places, details)
@@ -254,31 +435,204 @@ class NominatimAPIAsync:
         timeout = Timeout(self.request_timeout)
         details = ntyp.ReverseDetails.from_kwargs(params)
         with details.query_stats as qs:
-            async with self.begin(abs_timeout=timeout.abs) as conn:
-                qs.log_time('start_query')
-                conn.set_query_timeout(self.query_timeout)
-                if details.keywords:
-                    await nsearch.make_query_analyzer(conn)
-                geocoder = ReverseGeocoder(conn, details,
-                                           self.reverse_restrict_to_country_area)
-                return await geocoder.lookup(coord)
+            async def _reverse() -> Optional[ReverseResult]:
+                async with self.begin(abs_timeout=timeout.abs) as conn:
+                    qs.log_time('start_query')
+                    conn.set_query_timeout(self.query_timeout, timeout)
+                    if details.keywords:
+                        await nsearch.make_query_analyzer(conn)
+                    geocoder = ReverseGeocoder(conn, details,
+                                               self.reverse_restrict_to_country_area)
+                    cache = await get_reverse_cache(conn)
+                    if cache is None:
+                        return await geocoder.lookup(coord)
+                    return await cached_reverse(conn, cache, coord, details,
+                                                self.reverse_restrict_to_country_area,
+                                                lambda: geocoder.lookup(coord))
+
+            return await self._coalesced(('reverse', float(coord[0]), float(coord[1])),
+                                         details, timeout, _reverse)
+
+    async def reverse_many(self, coords: Sequence[ntyp.AnyPoint],
+                           **params: Any) -> List[Optional[ReverseResult]]:
+        """ Find the places for a list of coordinates.
+
+            Returns a list with one entry per coordinate, which is either
+            the closest result or None if no place matches.
+            The lookups are distributed over up to API_BATCH_CONCURRENCY
+            database connections. Duplicate coordinates are looked up once.
+            The request timeout applies to each coordinate separately.
+            Coordinates whose lookup times out get None as a result.
+        """
+        details = ntyp.ReverseDetails.from_kwargs(params)
+        # Invalid coordinates including NaN fail the comparison and are dropped.
+        todo = list(dict.fromkeys((float(c[0]), float(c[1])) for c in coords
+                                  if abs(c[0]) <= 180 and abs(c[1]) <= 90))
+        if not todo:
+            return [None] * len(coords)
+
+        found: Dict[Tuple[float, float], Optional[ReverseResult]] = {}
+        pending = iter(todo)
+
+        async def _worker() -> None:
+            # Each worker needs its own statistics because the timers
+            # of concurrent lookups would overwrite each other.
+            worker_details = dataclasses.replace(details,
+                                                 query_stats=type(details.query_stats)())
+            with worker_details.query_stats:
+                coord = next(pending, None)
+                while coord is not None:
+                    try:
+                        async with self.begin() as conn:
+                            if details.keywords:
+                                await nsearch.make_query_analyzer(conn)
+                            geocoder = ReverseGeocoder(conn, worker_details,
+                                                       self.reverse_restrict_to_country_area)
+                            while coord is not None:
+                                timeout = Timeout(self.request_timeout)
+                                conn.set_query_timeout(self.query_timeout, timeout)
+                                async with timeout_at(timeout.abs):
+                                    found[coord] = await geocoder.lookup(coord)
+                                coord = next(pending, None)
+                    except (TimeoutError, asyncio.TimeoutError):
+                        # The cancelled statement may have left the transaction
+                        # unusable, so continue on a new connection.
+                        coord = next(pending, None)
+            details.query_stats.add_stats(worker_details.query_stats)
+
+        with details.query_stats as qs:
+            qs.log_time('start_query')
+            num_workers = min(self.config.get_int('API_BATCH_CONCURRENCY'), len(todo))
+            pool_size = self.config.get_int('API_POOL_SIZE')
+            if pool_size > 0:
+                num_workers = min(num_workers, pool_size)
+            await asyncio.gather(*(_worker() for _ in range(max(1, num_workers))))
+
+        # Duplicate coordinates get their own copy of the result,
+        # so that callers may modify the results independently.
+        outlist: List[Optional[ReverseResult]] = []
+        seen = set()
+        for coord in coords:
+            key = (float(coord[0]), float(coord[1]))
+            result = found.get(key)
+            if result is not None and key in seen:
+                result = copy.deepcopy(result)
+            seen.add(key)
+            outlist.append(result)
+
+        return outlist
 
     async def search(self, query: str, **params: Any) -> SearchResults:
         """ Find a place by free-text search. Also known as forward geocoding.
         """
         timeout = Timeout(self.request_timeout)
         details = ntyp.SearchDetails.from_kwargs(params)
-        with details.query_stats as qs:
+        with details.query_stats:
             query = query.strip()
             if not query:
                 raise UsageError('Nothing to search for.')
 
-            async with self.begin(abs_timeout=timeout.abs) as conn:
-                qs.log_time('start_query')
-                conn.set_query_timeout(self.query_timeout)
-                geocoder = nsearch.ForwardGeocoder(conn, details, timeout)
-                phrases = [nsearch.Phrase(nsearch.PHRASE_ANY, p.strip()) for p in query.split(',')]
-                return await geocoder.lookup(phrases)
+            phrases = [nsearch.Phrase(nsearch.PHRASE_ANY, p.strip()) for p in query.split(',')]
+
+            return await self._forward_search(details, timeout, phrases, 'search',
+                                              lambda geocoder: geocoder.lookup(phrases))
+
+    async def autocomplete(self, query: str, **params: Any) -> SearchResults:
+        """ Find a place by free-text search while the query is being typed.
+        """
+        timeout = Timeout(self.request_timeout)
+        details = ntyp.SearchDetails.from_kwargs(params)
+        with details.query_stats:
+            # A trailing space or comma means that the last word is complete.
+            complete = query.rstrip() != query or query.endswith(',')
+            query = query.strip()
+            if not query:
+                raise UsageError('Nothing to search for.')
+
+            phrases = [nsearch.Phrase(nsearch.PHRASE_ANY, p.strip()) for p in query.split(',')]
+            endpoint = 'search' if complete else 'autocomplete'
+
+            def _lookup(geocoder: nsearch.ForwardGeocoder) -> Awaitable[SearchResults]:
+                if complete:
+                    return geocoder.lookup(phrases)
+                return geocoder.lookup_prefix(phrases)
+
+            return await self._forward_search(details, timeout, phrases, endpoint, _lookup)
+
+    async def search_many(self, queries: Sequence[str],
+                          **params: Any) -> List[Union[SearchResults, Exception]]:
+        """ Run a free-text search for each of the given queries.
+
+            Returns a list with the results for each query in the same order.
+            When the search for a query fails, the list contains the
+            exception raised instead of the results.
+            The searches are distributed over up to API_BATCH_CONCURRENCY
+            database connections. Each connection handles the queries in
+            chunks and looks up the words of all queries of a chunk at once.
+            The request timeout applies to each query separately.
+        """
+        details = ntyp.SearchDetails.from_kwargs(params)
+        results: List[Union[SearchResults, Exception]] = [SearchResults() for _ in queries]
+
+        todo = [(i, q.strip()) for i, q in enumerate(queries) if q.strip()]
+        if not todo:
+            return results
+
+        def _phrases(query: str) -> List[nsearch.Phrase]:
+            return [nsearch.Phrase(nsearch.PHRASE_ANY, p.strip()) for p in query.split(',')]
+
+        chunks = iter([todo[i:i + BATCH_CHUNK_SIZE]
+                       for i in range(0, len(todo), BATCH_CHUNK_SIZE)])
+
+        async def _run_chunk(chunk: List[Tuple[int, str]],
+                             worker_details: ntyp.SearchDetails) -> None:
+            pending = list(chunk)
+            while pending:
+                current: Optional[int] = None
+                try:
+                    async with self.begin() as conn:
+                        conn.set_query_timeout(self.query_timeout)
+                        analyzer = await nsearch.make_query_analyzer(conn)
+                        preprocessor = await nsearch.make_query_preprocessor(conn)
+                        await analyzer.prefetch_words([preprocessor.run(_phrases(q))
+                                                       for _, q in pending])
+                        while pending:
+                            current, query = pending[0]
+                            timeout = Timeout(self.request_timeout)
+                            conn.set_query_timeout(self.query_timeout, timeout)
+                            geocoder = nsearch.ForwardGeocoder(conn, worker_details, timeout,
+                                                               preprocessor, analyzer)
+                            results[current] = await geocoder.lookup(_phrases(query))
+                            current = None
+                            del pending[0]
+                except Exception as exc:
+                    if current is None:
+                        raise
+                    # The failed statement may have left the transaction
+                    # unusable, so continue on a new connection.
+                    results[current] = exc
+                    del pending[0]
+
+        async def _worker() -> None:
+            # Each worker needs its own statistics because the timers
+            # of concurrent searches would overwrite each other.
+            worker_details = dataclasses.replace(details,
+                                                 query_stats=type(details.query_stats)())
+            with worker_details.query_stats:
+                for chunk in chunks:
+                    await _run_chunk(chunk, worker_details)
+            details.query_stats.add_stats(worker_details.query_stats)
+
+        with details.query_stats as qs:
+            qs.log_time('start_query')
+            num_workers = min(self.config.get_int('API_BATCH_CONCURRENCY'),
+                              (len(todo) + BATCH_CHUNK_SIZE - 1) // BATCH_CHUNK_SIZE)
+            pool_size = self.config.get_int('API_POOL_SIZE')
+            if pool_size > 0:
+                num_workers = min(num_workers, pool_size)
+            await asyncio.gather(*(_worker() for _ in range(max(1, num_workers))))
+
+        return results
 
     async def search_address(self, amenity: Optional[str] = None,
                              street: Optional[str] = None,
@@ -292,7 +646,7 @@ class NominatimAPIAsync:
         """
         timeout = Timeout(self.request_timeout)
         details = ntyp.SearchDetails.from_kwargs(params)
-        with details.query_stats as qs:
+        with details.query_stats:
             phrases: List[nsearch.Phrase] = []
 
             if amenity:
@@ -331,11 +685,8 @@ class NominatimAPIAsync:
                 if amenity:
                     details.layers |= ntyp.DataLayer.POI
 
-            async with self.begin(abs_timeout=timeout.abs) as conn:
-                qs.log_time('start_query')
-                conn.set_query_timeout(self.query_timeout)
-                geocoder = nsearch.ForwardGeocoder(conn, details, timeout)
-                return await geocoder.lookup(phrases)
+            return await self._forward_search(details, timeout, phrases, 'search_address',
+                                              lambda geocoder: geocoder.lookup(phrases))
 
     async def search_category(self, categories: List[Tuple[str, str]],
                               near_query: Optional[str] = None,
@@ -346,23 +697,23 @@ class NominatimAPIAsync:
         """
         timeout = Timeout(self.request_timeout)
         details = ntyp.SearchDetails.from_kwargs(params)
-        with details.query_stats as qs:
+        with details.query_stats:
             if not categories:
                 return SearchResults()
 
-            async with self.begin(abs_timeout=timeout.abs) as conn:
-                qs.log_time('start_query')
-                conn.set_query_timeout(self.query_timeout)
-                if near_query:
-                    phrases = [nsearch.Phrase(nsearch.PHRASE_ANY, p) for p in near_query.split(',')]
-                else:
-                    phrases = []
-                    if details.keywords:
-                        await nsearch.make_query_analyzer(conn)
+            if near_query:
+                phrases = [nsearch.Phrase(nsearch.PHRASE_ANY, p) for p in near_query.split(',')]
+            else:
+                phrases = []
 
-                geocoder = nsearch.ForwardGeocoder(conn, details, timeout)
+            async def _lookup(geocoder: nsearch.ForwardGeocoder) -> SearchResults:
+                if not phrases and details.keywords:
+                    await nsearch.make_query_analyzer(geocoder.conn)
                 return await geocoder.lookup_pois(categories, phrases)
 
+            return await self._forward_search(details, timeout, phrases,
+                                              ('search_category', tuple(categories)), _lookup)
+
 
 class NominatimAPI:
     """ This class provides a thin synchronous wrapper around the asynchronous
@@ -414,6 +765,26 @@ class NominatimAPI:
         """
         return self._async_api.config
 
+    def cache_statistics(self) -> Dict[str, Dict[str, int]]:
+        """ Return usage statistics for the in-process caches of
+            the API. The result maps the name of each cache to its
+            current and maximum size and the number of hits, misses
+            and evictions. Caches only appear once they have been used.
+        """
+        return self._async_api.cache_statistics()
+
+    def warm_up(self, sample_queries: Optional[Path] = None) -> None:
+        """ Prepare the API object for answering requests. Opens all
+            connections of the connection pool and sets up all objects
+            that would otherwise be created while the first requests
+            are processed.
+
+            Parameters:
+              sample_queries: File with search queries to run as part of
+                  the warm-up, one query per line.
+        """
+        self._loop.run_until_complete(self._async_api.warm_up(sample_queries))
+
     def status(self) -> StatusResult:
         """ Return the status of the database as a dataclass object
             with the fields described below.
@@ -677,6 +1048,30 @@ class NominatimAPI:
         """
         return self._loop.run_until_complete(self._async_api.reverse(coord, **params))
 
+    def reverse_many(self, coords: Sequence[ntyp.AnyPoint],
+                     **params: Any) -> List[Optional[ReverseResult]]:
+        """ Find the places for a list of coordinates. This is the same
+            as calling [reverse()](#nominatim_api.NominatimAPI.reverse)
+            for each coordinate, except that the lookups are run
+            concurrently on up to NOMINATIM_API_BATCH_CONCURRENCY
+            database connections and duplicate coordinates are only
+            looked up once. A coordinate whose lookup times out gets
+            `None` as a result.
+
+            Parameters:
+              coords: List of coordinates to lookup as Points or
+                      tuples (x, y). Must be in WGS84 projection.
+
+            Other parameters:
+              The same parameters as for reverse().
+
+            Returns:
+              A list with one entry for each input coordinate in the same order.
+              The entry is either the result as returned by reverse() or `None`
+              when no place was found for the coordinate.
+        """
+        return self._loop.run_until_complete(self._async_api.reverse_many(coords, **params))
+
     def search(self, query: str, **params: Any) -> SearchResults:
         """ Find a place by free-text search. Also known as forward geocoding.
 
@@ -778,6 +1173,46 @@ class NominatimAPI:
         return self._loop.run_until_complete(
                    self._async_api.search(query, **params))
 
+    def search_many(self, queries: Sequence[str],
+                    **params: Any) -> List[Union[SearchResults, Exception]]:
+        """ Run a free-text search for each of the given queries. This is
+            the same as calling [search()](#nominatim_api.NominatimAPI.search)
+            for each query but the searches run in parallel over multiple
+            database connections and the information about the search terms
+            is retrieved for many queries at once.
+
+            Parameters:
+              queries: List of free-form text queries.
+
+            Other parameters:
+              The same parameters as for search(). They apply to all queries.
+
+            Returns:
+              A list with the search results for each query in the same order.
+              Empty queries yield an empty result list. When the search for
+              a query fails, the exception is returned in its place.
+        """
+        return self._loop.run_until_complete(self._async_api.search_many(queries, **params))
+
+    def autocomplete(self, query: str, **params: Any) -> SearchResults:
+        """ Find a place by free-text search, while the query is still
+            being typed. The last word of the query is taken to be
+            incomplete and is completed with the most frequent words that
+            start with it. A query that ends with a space or a comma is
+            complete and is looked up like with
+            [search()](#nominatim_api.NominatimAPI.search).
+
+            Parameters:
+              query: Free-form text query typed so far.
+
+            Other parameters:
+              The same parameters as for search().
+
+            Returns:
+              The same information as search().
+        """
+        return self._loop.run_until_complete(self._async_api.autocomplete(query, **params))
+
     def search_address(self, amenity: Optional[str] = None,
                        street: Optional[str] = None,
                        city: Optional[str] = None,
@@ -45,6 +45,11 @@ class BaseLogger:
         """
         return ''
 
+    def is_active(self) -> bool:
+        """ Return true when the logger actually records any output.
+        """
+        return False
+
     def function(self, func: str, **kwargs: Any) -> None:
         """ Start a new debug chapter for the given function and its parameters.
         """
@@ -132,6 +137,9 @@ class HTMLLogger(BaseLogger):
     def get_buffer(self) -> str:
         return HTML_HEADER + self.buffer.getvalue() + HTML_FOOTER
 
+    def is_active(self) -> bool:
+        return True
+
     def function(self, func: str, **kwargs: Any) -> None:
         self._timestamp()
         self._write(f"<h1>Debug output for {func}()</h1>\n<p>Parameters:<dl>")
@@ -239,6 +247,9 @@ class TextLogger(BaseLogger):
     def get_buffer(self) -> str:
         return self.buffer.getvalue()
 
+    def is_active(self) -> bool:
+        return True
+
     def function(self, func: str, **kwargs: Any) -> None:
         self._write(f"#### Debug output for {func}()\n\nParameters:\n")
         for name, value in kwargs.items():
@@ -0,0 +1,202 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of Nominatim. (https://nominatim.org)
+#
+# Copyright (C) 2026 by the Nominatim developer community.
+# For a full list of authors see the git log.
+"""
+In-process cache for the results of complete API calls.
+"""
+from typing import Any, Awaitable, Callable, Hashable, List, Optional, Tuple, TypeVar
+import copy
+import dataclasses
+import enum
+import math
+
+from .connection import SearchConnection
+from .logging import log
+from .timeout import Timeout
+from .types import LookupDetails, ReverseDetails, AnyPoint, Bbox, PlaceID, OsmID, PostcodeRef
+from .localization import Locales
+from .results import ReverseResult
+from .utils.cache import LRUCache
+from .search.query import Phrase
+from .search.query_analyzer_factory import AbstractQueryAnalyzer
+from .search.query_preprocessor import QueryPreprocessor
+
+T = TypeVar('T')
+
+ResultCache = LRUCache[Hashable, Any]
+
+# A cached reverse result is reused for points that have moved by at most
+# this fraction of the distance between the original point and the result.
+REVERSE_REUSE_FRACTION = 0.1
+
+
+def _hashable(value: Any) -> Hashable:
+    """ Convert a parameter value into a hashable representation
+        that compares equal for equal parameter values.
+    """
+    if value is None or isinstance(value, (str, int, float, bool, enum.Enum)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    if isinstance(value, Bbox):
+        return ('bbox', ) + tuple(value.coords)
+    if isinstance(value, (PlaceID, OsmID, PostcodeRef)):
+        return str(value)
+    if isinstance(value, Locales):
+        return ('locales', tuple(value.languages), tuple(value.name_tags))
+
+    return repr(value)
+
+
+def details_cache_key(details: LookupDetails) -> Tuple[Hashable, ...]:
+    """ Return a hashable key for the parameters of a call. All fields
+        that may influence the result are taken into account.
+    """
+    return tuple((f.name, _hashable(getattr(details, f.name)))
+                 for f in dataclasses.fields(details)
+                 if f.name != 'query_stats')
+
+
+def normalized_phrases(analyzer: AbstractQueryAnalyzer, preprocessor: QueryPreprocessor,
+                       phrases: List[Phrase]) -> Tuple[Tuple[int, str], ...]:
+    """ Return the phrases in the form the query analyzer would see them,
+        i.e. after preprocessing and normalization.
+    """
+    # Preprocessors may modify the phrases in place, so work on a copy.
+    processed = preprocessor.run([Phrase(p.ptype, p.text) for p in phrases])
+
+    return tuple((p.ptype, analyzer.normalize_text(p.text)) for p in processed)
+
+
+async def get_result_cache(conn: SearchConnection) -> Optional[ResultCache]:
+    """ Return the process-wide result cache or None if result caching
+        has been disabled.
+    """
+    async def _make_cache() -> ResultCache:
+        ttl = conn.config.get_int('API_RESULT_CACHE_TTL')
+        return LRUCache(conn.config.get_int('API_RESULT_CACHE_SIZE'),
+                        ttl=ttl if ttl > 0 else None)
+
+    cache = await conn.get_cached_value('CACHE', 'results', _make_cache)
+
+    return cache if cache.maxsize > 0 else None
+
+
+async def cached_call(conn: SearchConnection, cache: ResultCache, key: Hashable,
+                      details: LookupDetails, timeout: Timeout,
+                      func: Callable[[], Awaitable[T]]) -> T:
+    """ Return the result for the call with the given key from the cache
+        or, when not available, execute 'func' and save its result.
+
+        Results are copied on the way in and out of the cache because
+        callers are free to modify them. Incomplete results from requests
+        which ran into the timeout are not cached. Caching is skipped
+        completely while debug output is collected.
+    """
+    qs = details.query_stats
+
+    if log().is_active():
+        return await func()
+
+    cache.set_version(await conn.get_data_version())
+
+    result = cache.get(key)
+    if result is not None:
+        qs['result_cache_hit'] = 1
+        return copy.deepcopy(result)  # type: ignore[no-any-return]
+
+    qs['result_cache_hit'] = 0
+    result = await func()
+
+    if not timeout.is_elapsed():
+        cache.put(key, copy.deepcopy(result))
+
+    return result
+
+
+def reverse_cache_key(coord: AnyPoint, precision: float, details: ReverseDetails,
+                      restrict_to_country_areas: bool) -> Hashable:
+    """ Return the key for the reverse cache. The coordinate is reduced
+        to the grid cell of the given size (in degrees) it falls into.
+    """
+    cell = (math.floor(coord[0] / precision), math.floor(coord[1] / precision))
+
+    return (cell, restrict_to_country_areas, details_cache_key(details))
+
+
+def reverse_reuse_distance(result: Optional[ReverseResult], precision: float) -> float:
+    """ Return the maximum distance (in degrees) from the original
+        coordinate up to which the given reverse result may be reused.
+
+        The closer a point is to its result, the closer it may also be
+        to a neighbouring place, for example the street on the other side
+        of a block. A result is therefore only reused for points that are
+        much closer to the original coordinate than the result is. Results
+        that contain the coordinate, like areas, are only reused for the
+        same coordinate. Not finding a place is reused within the grid cell.
+    """
+    if result is None:
+        return precision
+
+    return min(precision, REVERSE_REUSE_FRACTION * (result.distance or 0.0))
+
+
+async def get_reverse_cache(conn: SearchConnection) -> Optional[ResultCache]:
+    """ Return the process-wide cache for reverse results or None if
+        reverse caching has been disabled.
+    """
+    async def _make_cache() -> ResultCache:
+        return LRUCache(conn.config.get_int('API_REVERSE_CACHE_SIZE'))
+
+    cache = await conn.get_cached_value('CACHE', 'reverse', _make_cache)
+
+    return cache if cache.maxsize > 0 else None
+
+
+async def cached_reverse(conn: SearchConnection, cache: ResultCache, coord: AnyPoint,
+                         details: ReverseDetails, restrict_to_country_areas: bool,
+                         func: Callable[[], Awaitable[Optional[ReverseResult]]]
+                         ) -> Optional[ReverseResult]:
+    """ Return the reverse result for the given coordinate from the cache
+        or, when not available, execute 'func' and save its result.
+
+        Each cache entry records the coordinate it was computed for and
+        the maximum distance up to which it may be reused. The distance
+        depends on how far the result is from the coordinate, see
+        reverse_reuse_distance(). The distance of a reused result refers
+        to the original coordinate, so it is removed.
+        Not finding any place is cached as well.
+    """
+    qs = details.query_stats
+
+    if log().is_active():
+        return await func()
+
+    precision = 10.0 ** -conn.config.get_int('API_REVERSE_CACHE_PRECISION')
+
+    cache.set_version(await conn.get_data_version())
+
+    key = reverse_cache_key(coord, precision, details, restrict_to_country_areas)
+    entry = cache.get(key)
+    if entry is not None:
+        x, y, max_distance, result = entry
+        moved = math.hypot(coord[0] - x, coord[1] - y)
+        if moved <= max_distance:
+            qs['reverse_cache_hit'] = 1
+            result = copy.deepcopy(result)
+            if result is not None and moved > 0:
+                result.distance = None
+            return result  # type: ignore[no-any-return]
+
+    qs['reverse_cache_hit'] = 0
+    result = await func()
+
+    cache.put(key, (coord[0], coord[1], reverse_reuse_distance(result, precision),
+                    copy.deepcopy(result)))
+
+    return result
@@ -7,7 +7,7 @@
 """
 Helper classes and functions for formatting results into API responses.
 """
-from typing import Type, TypeVar, Dict, List, Callable, Any, Mapping, Optional, cast
+from typing import Type, TypeVar, Dict, List, Callable, Any, Mapping, Optional, Iterator, cast
 from collections import defaultdict
 from pathlib import Path
 import importlib.util
@@ -16,6 +16,7 @@ from .server.content_types import CONTENT_JSON
 
 T = TypeVar('T')
 FormatFunc = Callable[[T, Mapping[str, Any]], str]
+StreamFunc = Callable[[T, Mapping[str, Any]], Iterator[str]]
 ErrorFormatFunc = Callable[[str, str, int], str]
 
 
@@ -30,6 +31,7 @@ class FormatDispatcher:
         if content_types:
             self.content_types.update(content_types)
         self.format_functions: Dict[Type[Any], Dict[str, FormatFunc[Any]]] = defaultdict(dict)
+        self.stream_functions: Dict[Type[Any], Dict[str, StreamFunc[Any]]] = defaultdict(dict)
 
     def format_func(self, result_class: Type[T],
                     fmt: str) -> Callable[[FormatFunc[T]], FormatFunc[T]]:
@@ -42,6 +44,19 @@ class FormatDispatcher:
 
         return decorator
 
+    def stream_func(self, result_class: Type[T],
+                    fmt: str) -> Callable[[StreamFunc[T]], StreamFunc[T]]:
+        """ Decorator for a function that formats a given type of result into
+            the selected format and returns the output in chunks. Such
+            a function is optional. It is used for large responses in
+            addition to the function registered with `format_func()`.
+        """
+        def decorator(func: StreamFunc[T]) -> StreamFunc[T]:
+            self.stream_functions[result_class][fmt] = func
+            return func
+
+        return decorator
+
     def error_format_func(self, func: ErrorFormatFunc) -> ErrorFormatFunc:
         """ Decorator for a function that formats error messages.
             There is only one error formatter per dispatcher. Using
@@ -68,6 +83,25 @@ class FormatDispatcher:
         """
         return self.format_functions[type(result)][fmt](result, options)
 
+    def supports_streaming(self, result_type: Type[Any], fmt: str) -> bool:
+        """ Check if the formatter can produce the given format in chunks.
+        """
+        return fmt in self.stream_functions[result_type]
+
+    def stream_result(self, result: Any, fmt: str,
+                      options: Mapping[str, Any]) -> Iterator[str]:
+        """ Convert the given result into a sequence of strings using
+            the given format. The strings need to be concatenated to
+            get the complete output.
+
+            Formats without a streaming function are returned
+            as a single string.
+        """
+        func = self.stream_functions[type(result)].get(fmt)
+        if func is None:
+            return iter((self.format_result(result, fmt, options), ))
+        return func(result, options)
+
     def format_error(self, content_type: str, msg: str, status: int) -> str:
         """ Convert the given error message into a response string
             taking the requested content_type into account.
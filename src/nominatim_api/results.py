@@ -13,7 +13,7 @@ instead of member functions.
 """
 from typing import (
     Optional, Tuple, Dict, Sequence, TypeVar, Type, List,
-    cast, Callable
+    cast, Callable, Awaitable
 )
 import enum
 import dataclasses
@@ -21,14 +21,22 @@ import datetime as dt
 
 import sqlalchemy as sa
 
-from .typing import SaSelect, SaRow
-from .sql.sqlalchemy_types import Geometry
+from .typing import SaSelect, SaRow, SaColumn
 from .types import Point, Bbox, LookupDetails, EntranceDetails
 from .connection import SearchConnection
 from .logging import log
+from .utils.cache import LRUCache
 
 # This file defines complex result data classes.
 
+# Address places up to this address rank are kept in the address place cache.
+MAX_CACHED_ADDRESS_RANK = 16
+# Columns of placex needed to create the address line for an address place.
+ADDRESS_PLACE_COLUMNS = ('osm_type', 'osm_id', 'name', 'class_', 'type',
+                         'extratags', 'admin_level', 'country_code')
+
+AddressPlaceCache = LRUCache[int, SaRow]
+
 
 def _mingle_name_tags(names: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
     """ Mix-in names from linked places, so that they show up
@@ -440,24 +448,22 @@ async def add_result_details(conn: SearchConnection, results: List[BaseResultT],
     """
     if results:
         log().section('Query details for result')
-        if details.address_details:
-            log().comment('Query address details')
-            await complete_address_details(conn, results)
-        if details.linked_places:
-            log().comment('Query linked places')
-            for result in results:
-                await complete_linked_places(conn, result)
-        if details.parented_places:
-            log().comment('Query parent places')
-            for result in results:
-                await complete_parented_places(conn, result)
-        if details.entrances:
-            log().comment('Query entrances details')
-            await complete_entrances_details(conn, results)
-        if details.keywords:
-            log().comment('Query keywords')
-            for result in results:
-                await complete_keywords(conn, result)
+        with details.query_stats.timer('result_details'):
+            if details.address_details:
+                log().comment('Query address details')
+                await complete_address_details(conn, results)
+            if details.linked_places:
+                log().comment('Query linked places')
+                await complete_linked_places(conn, results)
+            if details.parented_places:
+                log().comment('Query parent places')
+                await complete_parented_places(conn, results)
+            if details.entrances:
+                log().comment('Query entrances details')
+                await complete_entrances_details(conn, results)
+            if details.keywords:
+                log().comment('Query keywords')
+                await complete_keywords(conn, results)
 
 
 def _result_row_to_address_row(row: SaRow, isaddress: Optional[bool] = None) -> AddressLine:
@@ -486,6 +492,40 @@ def _result_row_to_address_row(row: SaRow, isaddress: Optional[bool] = None) ->
                        distance=row.distance)
 
 
+def _address_row_from_place(place: SaRow, row: SaRow, isaddress: bool) -> AddressLine:
+    """ Create a new AddressLine from the information about the address
+        place in 'place' and the information about its relation to the
+        result from place_addressline in 'row'.
+    """
+    extratags = dict(place.extratags or {})
+    if 'linked_place' in extratags:
+        extratags['place'] = extratags['linked_place']
+
+    return AddressLine(place_id=row.place_id,
+                       osm_object=None if place.osm_type is None
+                       else (place.osm_type, place.osm_id),
+                       category=(getattr(place, 'class'), place.type),
+                       names=_mingle_name_tags(place.name) or {},
+                       extratags=extratags,
+                       admin_level=place.admin_level,
+                       fromarea=row.fromarea,
+                       isaddress=isaddress,
+                       rank_address=row.rank_address,
+                       distance=row.distance)
+
+
+async def get_address_place_cache(conn: SearchConnection) -> Optional[AddressPlaceCache]:
+    """ Return the process-wide cache for information about large
+        address areas or None if the cache has been disabled.
+    """
+    async def _make_cache() -> AddressPlaceCache:
+        return LRUCache(conn.config.get_int('API_ADDRESS_CACHE_SIZE'))
+
+    cache = await conn.get_cached_value('CACHE', 'address_places', _make_cache)
+
+    return cache if cache.maxsize > 0 else None
+
+
 def _get_address_lookup_id(result: BaseResultT) -> int:
     assert result.place_id
     if result.source_table != SourceTable.PLACEX or result.rank_search > 27:
@@ -494,7 +534,51 @@ def _get_address_lookup_id(result: BaseResultT) -> int:
     return result.linked_place_id or result.place_id
 
 
-async def _finalize_entry(conn: SearchConnection, result: BaseResultT) -> None:
+def _group_by_place_id(results: Sequence[BaseResultT]) -> Dict[int, List[BaseResultT]]:
+    """ Return the results with a place ID indexed by their place ID.
+        Results for the same place are grouped together.
+    """
+    groups: Dict[int, List[BaseResultT]] = {}
+    for result in results:
+        if result.place_id:
+            groups.setdefault(result.place_id, []).append(result)
+
+    return groups
+
+
+async def _get_country_names(conn: SearchConnection, ccodes: Sequence[str]
+                             ) -> Dict[str, Optional[Dict[str, str]]]:
+    """ Return the names of the countries with the given country codes.
+        Names of all countries not yet cached are retrieved with
+        a single query.
+    """
+    fetched: Optional[Dict[str, Dict[str, str]]] = None
+
+    async def _fetch_all() -> Dict[str, Dict[str, str]]:
+        nonlocal fetched
+        if fetched is None:
+            t = conn.t.country_name
+            sql = sa.select(t.c.country_code, t.c.name, t.c.derived_name)\
+                    .where(t.c.country_code.in_(ccodes))
+            fetched = {}
+            for cres in await conn.execute(sql):
+                names = cast(Dict[str, str], cres[1])
+                if cres[2]:
+                    names.update(cast(Dict[str, str], cres[2]))
+                fetched[cres[0]] = names
+        return fetched
+
+    def _factory(ccode: str) -> Callable[[], Awaitable[Optional[Dict[str, str]]]]:
+        async def _get() -> Optional[Dict[str, str]]:
+            return (await _fetch_all()).get(ccode)
+        return _get
+
+    return {ccode: await conn.get_cached_value('COUNTRY_NAME', ccode, _factory(ccode))
+            for ccode in ccodes}
+
+
+def _finalize_entry(result: BaseResultT,
+                    country_names: Dict[str, Optional[Dict[str, str]]]) -> None:
     assert result.address_rows is not None
 
     postcode = result.postcode or (result.address and result.address.get('postcode'))
@@ -506,24 +590,11 @@ async def _finalize_entry(conn: SearchConnection, result: BaseResultT) -> None:
             distance=0.0))
 
     if result.country_code:
-        async def _get_country_names() -> Optional[Dict[str, str]]:
-            t = conn.t.country_name
-            sql = sa.select(t.c.name, t.c.derived_name)\
-                    .where(t.c.country_code == result.country_code)
-            for cres in await conn.execute(sql):
-                names = cast(Dict[str, str], cres[0])
-                if cres[1]:
-                    names.update(cast(Dict[str, str], cres[1]))
-                return names
-            return None
-
-        country_names = await conn.get_cached_value('COUNTRY_NAME',
-                                                    result.country_code,
-                                                    _get_country_names)
-        if country_names:
+        names = country_names.get(result.country_code)
+        if names:
             result.address_rows.append(AddressLine(
                 category=('place', 'country'),
-                names=country_names,
+                names=names,
                 fromarea=False, isaddress=True, rank_address=4,
                 distance=0.0))
         result.address_rows.append(AddressLine(
@@ -573,13 +644,15 @@ async def complete_address_details(conn: SearchConnection, results: List[BaseRes
     for result in results:
         _setup_address_details(result)
 
-    # Lookup entries from place_address line
+    # Lookup entries from place_address line.
+    # Results for the same place share the lookup.
 
+    groups = _group_by_place_id(results)
     lookup_ids = [{'pid': r.place_id,
                    'lid': _get_address_lookup_id(r),
                    'names': list(r.address.values()) if r.address else [],
                    'c': ('SRID=4326;' + r.centroid.to_wkt()) if r.centroid else ''}
-                  for r in results if r.place_id]
+                  for r in (group[0] for group in groups.values())]
 
     if not lookup_ids:
         return
@@ -590,13 +663,23 @@ async def complete_address_details(conn: SearchConnection, results: List[BaseRes
     t = conn.t.placex
     taddr = conn.t.addressline
 
+    cache = await get_address_place_cache(conn)
+    place_columns: List[SaColumn]
+    if cache is None:
+        place_columns = [t.c[c] for c in ADDRESS_PLACE_COLUMNS]
+    else:
+        # Information about large areas comes from the cache.
+        is_cached = t.c.rank_address <= MAX_CACHED_ADDRESS_RANK
+        place_columns = [sa.type_coerce(sa.case((is_cached, sa.null()), else_=t.c[c]),
+                                        t.c[c].type).label(t.c[c].name)
+                         for c in ADDRESS_PLACE_COLUMNS]
+        place_columns.append(is_cached.label('is_cached'))
+
     sql = sa.select(ltab.c.value['pid'].as_integer().label('src_place_id'),
-                    t.c.place_id, t.c.osm_type, t.c.osm_id, t.c.name,
-                    t.c.class_, t.c.type, t.c.extratags,
-                    t.c.admin_level, taddr.c.fromarea,
+                    t.c.place_id, *place_columns, taddr.c.fromarea,
                     sa.case((t.c.type == 'postal_code', 5),
                             else_=t.c.rank_address).label('rank_address'),
-                    taddr.c.distance, t.c.country_code, t.c.postcode)\
+                    taddr.c.distance)\
             .join(taddr, sa.or_(taddr.c.place_id == ltab.c.value['pid'].as_integer(),
                                 taddr.c.place_id == ltab.c.value['lid'].as_integer()))\
             .join(t, taddr.c.address_place_id == t.c.place_id)\
@@ -614,25 +697,49 @@ async def complete_address_details(conn: SearchConnection, results: List[BaseRes
             .order_by(taddr.c.distance.desc())\
             .order_by(t.c.rank_search.desc())
 
-    current_result = None
+    rows = list(await conn.execute(sql))
+    places: Dict[int, SaRow] = {}
+    if cache is not None:
+        cache.set_version(await conn.get_data_version())
+        missing = set()
+        for row in rows:
+            if row.is_cached and row.place_id not in places:
+                place = cache.get(row.place_id)
+                if place is None:
+                    missing.add(row.place_id)
+                else:
+                    places[row.place_id] = place
+        if missing:
+            psql = sa.select(t.c.place_id, *(t.c[c] for c in ADDRESS_PLACE_COLUMNS))\
+                     .where(t.c.place_id.in_(list(missing)))
+            for place in await conn.execute(psql):
+                places[place.place_id] = place
+                cache.put(place.place_id, place)
+
+    current_place_id = None
+    current_group: List[BaseResultT] = []
     current_rank_address = -1
-    for row in await conn.execute(sql):
-        if current_result is None or row.src_place_id != current_result.place_id:
-            current_result = next((r for r in results if r.place_id == row.src_place_id), None)
-            assert current_result is not None
+    for row in rows:
+        if row.src_place_id != current_place_id:
+            current_place_id = row.src_place_id
+            current_group = groups[row.src_place_id]
             current_rank_address = -1
 
         location_isaddress = row.rank_address != current_rank_address
+        place = places.get(row.place_id, row)
 
-        if current_result.country_code is None and row.country_code:
-            current_result.country_code = row.country_code
+        for result in current_group:
+            if result.country_code is None and place.country_code:
+                result.country_code = place.country_code
 
-        assert current_result.address_rows is not None
-        current_result.address_rows.append(_result_row_to_address_row(row, location_isaddress))
+            assert result.address_rows is not None
+            result.address_rows.append(_address_row_from_place(place, row, location_isaddress))
         current_rank_address = row.rank_address
 
+    country_names = await _get_country_names(
+        conn, list({r.country_code for r in results if r.country_code}))
     for result in results:
-        await _finalize_entry(conn, result)
+        _finalize_entry(result, country_names)
 
     # Finally add the record for the parent entry where necessary.
 
@@ -648,18 +755,16 @@ async def complete_address_details(conn: SearchConnection, results: List[BaseRes
                 .where(t.c.place_id == ltab.c.value['lid'].as_integer())
 
         for row in await conn.execute(sql):
-            current_result = next((r for r in results if r.place_id == row.src_place_id), None)
-            assert current_result is not None
-            assert current_result.address_rows is not None
-
-            current_result.address_rows.append(AddressLine(
-                    place_id=row.place_id,
-                    osm_object=(row.osm_type, row.osm_id),
-                    category=(row.class_, row.type),
-                    names=row.name, extratags=row.extratags or {},
-                    admin_level=row.admin_level,
-                    fromarea=True, isaddress=True,
-                    rank_address=row.rank_address, distance=0.0))
+            for result in groups[row.src_place_id]:
+                assert result.address_rows is not None
+                result.address_rows.append(AddressLine(
+                        place_id=row.place_id,
+                        osm_object=(row.osm_type, row.osm_id),
+                        category=(row.class_, row.type),
+                        names=row.name, extratags=row.extratags or {},
+                        admin_level=row.admin_level,
+                        fromarea=True, isaddress=True,
+                        rank_address=row.rank_address, distance=0.0))
 
     # Now sort everything
     def mk_sort_key(place_id: Optional[int]) -> Callable[[AddressLine], Tuple[bool, int, bool]]:
@@ -670,91 +775,132 @@ async def complete_address_details(conn: SearchConnection, results: List[BaseRes
         result.address_rows.sort(key=mk_sort_key(result.place_id))
 
 
-def _placex_select_address_row(conn: SearchConnection,
-                               centroid: Point) -> SaSelect:
+def _placex_select_address_rows(conn: SearchConnection, results: Sequence[BaseResultT],
+                                column: str) -> Tuple[Dict[int, List[BaseResultT]], SaSelect]:
+    """ Create a query for places that refer to one of the given placex
+        results in the given column. Returns the results indexed
+        by their place ID together with the query.
+    """
+    groups = _group_by_place_id([r for r in results if r.source_table == SourceTable.PLACEX])
+    lookup_ids = [{'pid': pid, 'c': 'SRID=4326;' + group[0].centroid.to_wkt()}
+                  for pid, group in groups.items()]
+
+    ltab = sa.func.JsonArrayEach(sa.type_coerce(lookup_ids, sa.JSON))\
+             .table_valued(sa.column('value', type_=sa.JSON))
+
     t = conn.t.placex
-    return sa.select(t.c.place_id, t.c.osm_type, t.c.osm_id, t.c.name,
-                     t.c.class_.label('class'), t.c.type,
-                     t.c.admin_level, t.c.housenumber,
-                     t.c.geometry.is_area().label('fromarea'),
-                     t.c.rank_address,
-                     t.c.geometry.distance_spheroid(
-                       sa.bindparam('centroid', value=centroid, type_=Geometry)).label('distance'))
+    centroid = sa.func.ST_GeomFromEWKT(ltab.c.value['c'].as_string())
+    sql = sa.select(ltab.c.value['pid'].as_integer().label('src_place_id'),
+                    t.c.place_id, t.c.osm_type, t.c.osm_id, t.c.name,
+                    t.c.class_.label('class'), t.c.type,
+                    t.c.admin_level, t.c.housenumber,
+                    t.c.geometry.is_area().label('fromarea'),
+                    t.c.rank_address,
+                    t.c.geometry.distance_spheroid(centroid).label('distance'))\
+            .where(t.c[column] == ltab.c.value['pid'].as_integer())
+
+    return groups, sql
 
 
-async def complete_linked_places(conn: SearchConnection, result: BaseResult) -> None:
-    """ Retrieve information about places that link to the result.
+async def complete_linked_places(conn: SearchConnection, results: List[BaseResultT]) -> None:
+    """ Retrieve information about places that link to the results.
     """
-    result.linked_rows = AddressLines()
-    if result.source_table != SourceTable.PLACEX:
-        return
+    for result in results:
+        result.linked_rows = AddressLines()
 
-    sql = _placex_select_address_row(conn, result.centroid)\
-        .where(conn.t.placex.c.linked_place_id == result.place_id)
+    groups, sql = _placex_select_address_rows(conn, results, 'linked_place_id')
+    if not groups:
+        return
 
     for row in await conn.execute(sql):
-        result.linked_rows.append(_result_row_to_address_row(row))
+        for result in groups[row.src_place_id]:
+            assert result.linked_rows is not None
+            result.linked_rows.append(_result_row_to_address_row(row))
 
 
 async def complete_entrances_details(conn: SearchConnection, results: List[BaseResultT]) -> None:
     """ Retrieve information about tagged entrances for the given results.
     """
-    place_ids = (r.place_id for r in results if r.source_table == SourceTable.PLACEX)
+    groups = _group_by_place_id([r for r in results if r.source_table == SourceTable.PLACEX])
+    if not groups:
+        return
 
     t = conn.t.placex_entrance
     sql = sa.select(t.c.place_id, t.c.osm_id, t.c.type, t.c.location, t.c.extratags)\
-            .where(t.c.place_id.in_(place_ids))
+            .where(t.c.place_id.in_(list(groups)))
 
-    current_result = None
     for row in await conn.execute(sql):
-        if current_result is None or row.place_id != current_result.place_id:
-            current_result = next((r for r in results if r.place_id == row.place_id), None)
-            assert current_result is not None
-        if current_result.entrances is None:
-            current_result.entrances = []
-        current_result.entrances.append(EntranceDetails(
-            osm_id=row.osm_id,
-            type=row.type,
-            location=Point.from_wkb(row.location),
-            extratags=row.extratags,
-            ))
-
-
-async def complete_keywords(conn: SearchConnection, result: BaseResult) -> None:
-    """ Retrieve information about the search terms used for this place.
+        for result in groups[row.place_id]:
+            if result.entrances is None:
+                result.entrances = []
+            result.entrances.append(EntranceDetails(
+                osm_id=row.osm_id,
+                type=row.type,
+                location=Point.from_wkb(row.location),
+                extratags=row.extratags,
+                ))
+
+
+async def complete_keywords(conn: SearchConnection, results: List[BaseResultT]) -> None:
+    """ Retrieve information about the search terms used for the places.
 
         Requires that the query analyzer was initialised to get access to
         the word table.
     """
+    for result in results:
+        result.name_keywords = []
+        result.address_keywords = []
+
+    groups = _group_by_place_id(results)
+    if not groups:
+        return
+
     t = conn.t.search_name
-    sql = sa.select(t.c.name_vector, t.c.nameaddress_vector)\
-            .where(t.c.place_id == result.place_id)
+    sql = sa.select(t.c.place_id, t.c.name_vector, t.c.nameaddress_vector)\
+            .where(t.c.place_id.in_(list(groups)))
 
-    result.name_keywords = []
-    result.address_keywords = []
+    vectors = [(row.place_id, row.name_vector or [], row.nameaddress_vector or [])
+               for row in await conn.execute(sql)]
+    if not vectors:
+        return
+
+    token_ids = {tid for _, name_tokens, address_tokens in vectors
+                 for tid in (*name_tokens, *address_tokens)}
 
     t = conn.t.meta.tables['word']
-    sel = sa.select(t.c.word_id, t.c.word_token, t.c.word)
+    sql = sa.select(t.c.word_id, t.c.word_token, t.c.word)\
+            .where(t.c.word_id.in_(list(token_ids)))
+
+    words: Dict[int, List[WordInfo]] = {}
+    for row in await conn.execute(sql):
+        words.setdefault(row.word_id, []).append(WordInfo(*row))
 
-    for name_tokens, address_tokens in await conn.execute(sql):
-        for row in await conn.execute(sel.where(t.c.word_id.in_(name_tokens))):
-            result.name_keywords.append(WordInfo(*row))
+    for place_id, name_tokens, address_tokens in vectors:
+        name_words = [w for tid in _unique(name_tokens) for w in words.get(tid, [])]
+        address_words = [w for tid in _unique(address_tokens) for w in words.get(tid, [])]
+        for result in groups[place_id]:
+            result.name_keywords = list(name_words)
+            result.address_keywords = list(address_words)
 
-        for row in await conn.execute(sel.where(t.c.word_id.in_(address_tokens))):
-            result.address_keywords.append(WordInfo(*row))
 
+def _unique(ids: Sequence[int]) -> List[int]:
+    return list(dict.fromkeys(ids))
 
-async def complete_parented_places(conn: SearchConnection, result: BaseResult) -> None:
-    """ Retrieve information about places that the result provides the
+
+async def complete_parented_places(conn: SearchConnection, results: List[BaseResultT]) -> None:
+    """ Retrieve information about places that the results provide the
         address for.
     """
-    result.parented_rows = AddressLines()
-    if result.source_table != SourceTable.PLACEX:
+    for result in results:
+        result.parented_rows = AddressLines()
+
+    groups, sql = _placex_select_address_rows(conn, results, 'parent_place_id')
+    if not groups:
         return
 
-    sql = _placex_select_address_row(conn, result.centroid)\
-        .where(conn.t.placex.c.parent_place_id == result.place_id)\
-        .where(conn.t.placex.c.rank_search == 30)
+    sql = sql.where(conn.t.placex.c.rank_search == 30)
 
     for row in await conn.execute(sql):
-        result.parented_rows.append(_result_row_to_address_row(row))
+        for result in groups[row.src_place_id]:
+            assert result.parented_rows is not None
+            result.parented_rows.append(_result_row_to_address_row(row))
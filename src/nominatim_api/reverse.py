@@ -8,12 +8,14 @@
 Implementation of reverse geocoding.
 """
 from typing import Optional, List, Callable, Type, Tuple, Dict, Any, cast, Union
+import asyncio
+import contextlib
 import functools
 
 import sqlalchemy as sa
 
 from .typing import SaColumn, SaSelect, SaFromClause, SaLabel, SaRow, \
-                    SaBind, SaLambdaSelect
+                    SaBind, SaLambdaSelect, TypeAlias
 from .sql.sqlalchemy_types import Geometry
 from .connection import SearchConnection
 from . import results as nres
@@ -22,6 +24,7 @@ from .types import AnyPoint, DataLayer, ReverseDetails, GeometryFormat, Bbox
 
 
 RowFunc = Callable[[SaRow, Type[nres.ReverseResult]], nres.ReverseResult]
+RowTask: TypeAlias = 'asyncio.Task[Tuple[Optional[SaRow], RowFunc]]'
 
 WKT_PARAM: SaBind = sa.bindparam('wkt', type_=Geometry)
 MAX_RANK_PARAM: SaBind = sa.bindparam('max_rank')
@@ -85,6 +88,14 @@ def _get_closest(*rows: Optional[SaRow]) -> Optional[SaRow]:
     return min(rows, key=lambda row: 1000 if row is None else row.distance)
 
 
+async def _cancel(task: Optional[RowTask]) -> None:
+    """ Cancel a background lookup and wait for it to release its connection.
+    """
+    if task is not None:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
 class ReverseGeocoder:
     """ Class implementing the logic for looking up a place from a
         coordinate.
@@ -604,6 +615,51 @@ class ReverseGeocoder:
 
         return address_row, row_func
 
+    async def _lookup_area_or_country(self) -> Tuple[Optional[SaRow], RowFunc]:
+        """ Find a larger area or the country for the current search.
+            This is the fallback, when there is no street or POI close by.
+        """
+        row: Optional[SaRow] = None
+        row_func: RowFunc = nres.create_from_placex_row
+
+        if self.restrict_to_country_areas:
+            ccodes = await self.lookup_country_codes()
+            if not ccodes:
+                return None, row_func
+        else:
+            ccodes = []
+
+        if self.max_rank > 4:
+            row = await self.lookup_area()
+        if row is None and self.layer_enabled(DataLayer.ADDRESS):
+            row, row_func = await self.lookup_country(ccodes)
+
+        return row, row_func
+
+    async def _lookup_area_or_country_forked(self, conn: SearchConnection
+                                             ) -> Tuple[Optional[SaRow], RowFunc]:
+        """ Run the fallback lookup for areas and countries on
+            an additional connection from the connection pool.
+        """
+        geocoder = ReverseGeocoder(conn, self.params, self.restrict_to_country_areas)
+        geocoder.bind_params = dict(self.bind_params)
+        return await geocoder._lookup_area_or_country()
+
+    async def _start_speculative_lookup(self, stack: contextlib.AsyncExitStack
+                                        ) -> Optional[RowTask]:
+        """ Start the fallback lookup for areas and countries in the
+            background, if speculative execution is enabled and a
+            connection is free for it. The connection is held by 'stack'.
+        """
+        if log().is_active() or not self.conn.config.get_bool('API_SPECULATIVE_REVERSE'):
+            return None
+
+        conn = await stack.enter_async_context(self.conn.fork())
+        if conn is None:
+            return None
+
+        return asyncio.create_task(self._lookup_area_or_country_forked(conn))
+
     async def lookup(self, coord: AnyPoint) -> Optional[nres.ReverseResult]:
         """ Look up a single coordinate. Returns the place information,
             if a place was found near the coordinates or None otherwise.
@@ -614,24 +670,25 @@ class ReverseGeocoder:
 
         row: Optional[SaRow] = None
         row_func: RowFunc = nres.create_from_placex_row
+        areas_done = False
 
         if self.max_rank >= 26:
-            row, tmp_row_func = await self.lookup_street_poi()
-            if row is not None:
-                row_func = tmp_row_func
-
-        if row is None:
-            if self.restrict_to_country_areas:
-                ccodes = await self.lookup_country_codes()
-                if not ccodes:
-                    return None
-            else:
-                ccodes = []
-
-            if self.max_rank > 4:
-                row = await self.lookup_area()
-            if row is None and self.layer_enabled(DataLayer.ADDRESS):
-                row, row_func = await self.lookup_country(ccodes)
+            async with contextlib.AsyncExitStack() as stack:
+                fallback = await self._start_speculative_lookup(stack)
+                try:
+                    row, tmp_row_func = await self.lookup_street_poi()
+                except BaseException:
+                    await _cancel(fallback)
+                    raise
+                if row is not None:
+                    await _cancel(fallback)
+                    row_func = tmp_row_func
+                elif fallback is not None:
+                    row, row_func = await fallback
+                    areas_done = True
+
+        if row is None and not areas_done:
+            row, row_func = await self._lookup_area_or_country()
 
         if row is None:
             return None
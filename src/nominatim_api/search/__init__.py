@@ -18,3 +18,4 @@ from .query import (Phrase as Phrase,
                     PHRASE_POSTCODE as PHRASE_POSTCODE,
                     PHRASE_COUNTRY as PHRASE_COUNTRY)
 from .query_analyzer_factory import (make_query_analyzer as make_query_analyzer)
+from .query_preprocessor import (make_query_preprocessor as make_query_preprocessor)
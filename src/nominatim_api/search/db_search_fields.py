@@ -9,6 +9,7 @@ Data structures for more complex fields in abstract search descriptions.
 """
 from typing import List, Tuple, Iterator, Dict, Type, cast
 import dataclasses
+import itertools
 
 import sqlalchemy as sa
 
@@ -24,35 +25,83 @@ class CountedTokenIDs:
 
         If a token count is one, then statistics are likely to be unavailable
         and a relatively high count is assumed instead.
+
+        Where the statistics of the tokens contain the number of places
+        two tokens appear together in, these pair counts are used to
+        estimate the size of a lookup over more than one token.
     """
 
     def __init__(self, tokens: Iterator[Token], count_column: str = 'count'):
-        self.tokens = list({(cast(int, getattr(t, count_column)), t.token) for t in tokens})
+        unique = {t.token: t for t in tokens}
+        self.tokens = list({(cast(int, getattr(t, count_column)), t.token)
+                            for t in unique.values()})
         self.tokens.sort(key=lambda t: t[0] if t[0] > 1 else 100000)
+        self.lookup_order = self.tokens
+
+        self.pairs: Dict[Tuple[int, int], int] = {}
+        for t1, t2 in itertools.combinations(sorted(unique), 2):
+            count = unique[t1].get_pair_count(t2, count_column)
+            if count is None:
+                count = unique[t2].get_pair_count(t1, count_column)
+            if count is not None:
+                self.pairs[(t1, t2)] = count
 
     def __len__(self) -> int:
         return len(self.tokens)
 
+    def _estimate_count(self, tokens: List[Tuple[int, int]], fac: int) -> float:
+        """ Estimate the number of rows that contain all the given tokens.
+            Without pair statistics, each token after the first one
+            is assumed to reduce the number of rows by the factor 'fac'.
+        """
+        ids = sorted(t[1] for t in tokens)
+        pair_counts = [self.pairs[p] for p in itertools.combinations(ids, 2)
+                       if p in self.pairs]
+        if pair_counts:
+            return min(pair_counts) / float(fac)**(len(tokens) - 2)
+
+        return tokens[0][0] / float(fac)**(len(tokens) - 1)
+
+    def _best_pair_first(self) -> List[Tuple[int, int]]:
+        """ Return the tokens in lookup order with the pair of tokens
+            that appear together least often in front.
+        """
+        if not self.pairs:
+            return self.tokens
+
+        _, pair = min((c, p) for p, c in self.pairs.items())
+        return [t for t in self.tokens if t[1] in pair] \
+            + [t for t in self.tokens if t[1] not in pair]
+
     def get_num_lookup_tokens(self, limit: int, fac: int) -> int:
         """ Suggest the number of tokens to be used for an index lookup.
             The idea here is to use as few items as possible while making
             sure the number of rows returned stays below 'limit' which
             makes recheck of the returned rows more expensive than adding
             another item for the index lookup. 'fac' is the factor by which
-            the limit is increased every time a lookup item is added.
+            the number of rows is assumed to be reduced every time a lookup
+            item is added, unless the pair statistics tell otherwise.
+
+            The lookup order of the tokens is changed when a pair of
+            tokens is more restrictive than the least frequent token.
 
             If the list of tokens doesn't seem suitable at all for index
             lookup, -1 is returned.
         """
+        self.lookup_order = self.tokens
         length = len(self.tokens)
         min_count = self.tokens[0][0]
         if min_count == 1:
             return min(length, 3)  # no statistics available, use index
 
-        for i in range(min(length, 3)):
-            if min_count < limit:
+        if min_count < limit:
+            return 1
+
+        order = self._best_pair_first()
+        for i in range(1, min(length, 3)):
+            if self._estimate_count(order[:i + 1], fac) < limit:
+                self.lookup_order = order
                 return i + 1
-            limit = limit * fac
 
         return -1
 
@@ -60,16 +109,16 @@ class CountedTokenIDs:
         return self.tokens[0][0]
 
     def expected_for_all_search(self, fac: int = 5) -> int:
-        return int(self.tokens[0][0] / (fac**(len(self.tokens) - 1)))
+        return int(self._estimate_count(self.tokens, fac))
 
     def get_tokens(self) -> List[int]:
         return [t[1] for t in self.tokens]
 
     def get_head_tokens(self, num_tokens: int) -> List[int]:
-        return [t[1] for t in self.tokens[:num_tokens]]
+        return [t[1] for t in self.lookup_order[:num_tokens]]
 
     def get_tail_tokens(self, first: int) -> List[int]:
-        return [t[1] for t in self.tokens[first:]]
+        return [t[1] for t in self.lookup_order[first:]]
 
     def split_lookup(self, split: int, column: str) -> 'List[FieldLookup]':
         lookup = [FieldLookup(column, self.get_head_tokens(split), lookups.LookupAll)]
@@ -7,10 +7,14 @@
 """
 Public interface to the search code.
 """
-from typing import List, Any, Optional, Iterator, Tuple, Dict
+from typing import List, Any, Optional, Iterator, Tuple, Dict, Callable
+import asyncio
+import bisect
+import contextlib
 import itertools
 import re
 import difflib
+import time
 
 import sqlalchemy as sa
 
@@ -26,18 +30,32 @@ from .query_analyzer_factory import make_query_analyzer, AbstractQueryAnalyzer
 from .query_preprocessor import QueryPreprocessor
 from .query import Phrase, QueryStruct
 
+# Searches with a penalty that exceeds the penalty of the best search
+# by more than this value are never executed.
+MAX_PENALTY_RANGE = 1.5
+
+# Once this number of searches has been executed, only searches with
+# the same penalty as the previous one are executed.
+MAX_SEARCH_ROUNDS = 16
+
+# Maximum number of words tried for the incomplete last word
+# of a prefix query.
+MAX_COMPLETIONS = 5
+
 
 class ForwardGeocoder:
     """ Main class responsible for place search.
     """
 
     def __init__(self, conn: SearchConnection,
-                 params: SearchDetails, timeout: Timeout) -> None:
+                 params: SearchDetails, timeout: Timeout,
+                 query_preprocessor: Optional[QueryPreprocessor] = None,
+                 query_analyzer: Optional[AbstractQueryAnalyzer] = None) -> None:
         self.conn = conn
         self.params = params
         self.timeout = timeout
-        self.query_preprocessor = QueryPreprocessor(self.conn.config)
-        self.query_analyzer: Optional[AbstractQueryAnalyzer] = None
+        self.query_preprocessor = query_preprocessor or QueryPreprocessor(self.conn.config)
+        self.query_analyzer = query_analyzer
 
     @property
     def limit(self) -> int:
@@ -96,7 +114,10 @@ class ForwardGeocoder:
         if self.query_analyzer is None:
             self.query_analyzer = await make_query_analyzer(self.conn)
 
-        query = await self.query_analyzer.analyze_query(self.query_preprocessor.run(phrases))
+        qs = self.params.query_stats
+        with qs.timer('preprocess'):
+            phrases = self.query_preprocessor.run(phrases)
+        query = await self.query_analyzer.analyze_query(phrases)
         query.compute_direction_penalty()
         log().var_dump('Query direction penalty',
                        lambda: f"[{'LR' if query.dir_penalty < 0 else 'RL'}] {query.dir_penalty}")
@@ -105,58 +126,126 @@ class ForwardGeocoder:
         if query.num_token_slots() > 0:
             # 2. Compute all possible search interpretations
             log().section('Compute abstract searches')
-            search_builder = SearchBuilder(query, self.params)
-            num_searches = 0
-            for assignment in yield_token_assignments(query):
-                searches.extend(search_builder.build(assignment))
-                if num_searches < len(searches):
-                    log().table_dump('Searches for assignment',
-                                     _dump_searches(searches, query, num_searches))
-                num_searches = len(searches)
-            searches.sort(key=lambda s: (s.penalty, s.SEARCH_PRIO))
+            with qs.timer('token_assignment'):
+                searches.extend(self._yield_searches(query))
+                searches.sort(key=lambda s: (s.penalty, s.SEARCH_PRIO))
 
         return query, searches
 
+    async def build_prefix_searches(self, phrases: List[Phrase]
+                                    ) -> Tuple[List[QueryStruct], List[AbstractSearch]]:
+        """ Analyse a query with an incomplete last word and return the
+            tokenized queries for the different completions together with
+            the possible searches over all of them.
+        """
+        if self.query_analyzer is None:
+            self.query_analyzer = await make_query_analyzer(self.conn)
+
+        qs = self.params.query_stats
+        with qs.timer('preprocess'):
+            phrases = self.query_preprocessor.run(phrases)
+        queries = await self.query_analyzer.analyze_prefix_query(phrases, MAX_COMPLETIONS)
+
+        searches: List[AbstractSearch] = []
+        log().section('Compute abstract searches')
+        with qs.timer('token_assignment'):
+            for query in queries:
+                if query.num_token_slots() > 0:
+                    query.compute_direction_penalty()
+                    searches.extend(self._yield_searches(query))
+            searches.sort(key=lambda s: (s.penalty, s.SEARCH_PRIO))
+
+        return queries, searches
+
+    def _yield_searches(self, query: QueryStruct) -> Iterator[AbstractSearch]:
+        """ Lazily build the searches for the token assignments of the query.
+
+            Assignments come in order of increasing penalty and a search
+            never has a lower penalty than the assignment it was built from.
+            So the building can stop as soon as the assignment penalty
+            makes it impossible for any further search to be executed
+            by execute_searches().
+        """
+        search_builder = SearchBuilder(query, self.params)
+        penalties: List[float] = []
+        for assignment in yield_token_assignments(query):
+            if penalties:
+                if assignment.penalty > penalties[0] + MAX_PENALTY_RANGE:
+                    break
+                if bisect.bisect_left(penalties, assignment.penalty) >= MAX_SEARCH_ROUNDS:
+                    break
+            new_searches = list(search_builder.build(assignment))
+            if new_searches:
+                log().table_dump('Searches for assignment',
+                                 _dump_searches(new_searches, query))
+                for search in new_searches:
+                    bisect.insort(penalties, search.penalty)
+                yield from new_searches
+
     async def execute_searches(self, query: QueryStruct,
                                searches: List[AbstractSearch]) -> SearchResults:
         """ Run the abstract searches against the database until a result
             is found.
+
+            When speculative searches are enabled, the following searches
+            are started in advance on additional connections. Results are
+            still evaluated strictly in order, so that the outcome is the
+            same as with sequential execution.
         """
         log().section('Execute database searches')
         results: Dict[Any, SearchResult] = {}
         qs = self.params.query_stats
 
         qs['search_min_penalty'] = round(searches[0].penalty, 2)
-        min_ranking = searches[0].penalty + 1.5
-        prev_penalty = 0.0
-        for i, search in enumerate(searches):
-            if search.penalty > prev_penalty and (search.penalty > min_ranking or i > 15):
-                break
-            log().table_dump(f"{i + 1}. Search", _dump_searches([search], query))
-            log().var_dump('Params', self.params)
-            lookup_results = await search.lookup(self.conn, self.params)
-            for result in lookup_results:
-                rhash = (result.source_table, result.place_id,
-                         result.housenumber, result.country_code)
-                prevresult = results.get(rhash)
-                if prevresult:
-                    prevresult.accuracy = min(prevresult.accuracy, result.accuracy)
-                else:
-                    if not results:
-                        qs['search_first_result_round'] = i
-                    spenalty = round(search.penalty, 2)
-                    if 'search_min_result_penalty' not in qs or \
-                            spenalty < qs['search_min_result_penalty']:
-                        qs['search_min_result_penalty'] = spenalty
-                        qs['search_best_penalty_round'] = i
-                    results[rhash] = result
-                min_ranking = min(min_ranking,
-                                  search.penalty + 0.4,
-                                  result.accuracy + 0.1)
-            log().result_dump('Results', ((r.accuracy, r) for r in lookup_results))
-            prev_penalty = search.penalty
-            if self.timeout.is_elapsed():
-                break
+        min_ranking = searches[0].penalty + MAX_PENALTY_RANGE
+
+        def _is_needed(idx: int) -> bool:
+            penalty = searches[idx].penalty
+            prev_penalty = searches[idx - 1].penalty if idx > 0 else 0.0
+            return not (penalty > prev_penalty
+                        and (penalty > min_ranking or idx >= MAX_SEARCH_ROUNDS))
+
+        num_speculative = 0 if log().is_active() \
+            else self.conn.config.get_int('API_SPECULATIVE_SEARCHES')
+
+        async with _SpeculativeLookups(self.conn, self.params, searches,
+                                       num_speculative) as lookups:
+            for i, search in enumerate(searches):
+                if not _is_needed(i):
+                    break
+                for j in range(i + 1, min(i + 1 + num_speculative, len(searches))):
+                    if not _is_needed(j):
+                        break
+                    await lookups.start(j)
+                log().table_dump(f"{i + 1}. Search", _dump_searches([search], query))
+                log().var_dump('Params', self.params)
+                round_start = time.perf_counter()
+                lookup_results = await lookups.get(i)
+                round_time = time.perf_counter() - round_start
+                qs.add_time('search', round_time)
+                qs.add_time(f'search_round_{i}', round_time)
+                for result in lookup_results:
+                    rhash = (result.source_table, result.place_id,
+                             result.housenumber, result.country_code)
+                    prevresult = results.get(rhash)
+                    if prevresult:
+                        prevresult.accuracy = min(prevresult.accuracy, result.accuracy)
+                    else:
+                        if not results:
+                            qs['search_first_result_round'] = i
+                        spenalty = round(search.penalty, 2)
+                        if 'search_min_result_penalty' not in qs or \
+                                spenalty < qs['search_min_result_penalty']:
+                            qs['search_min_result_penalty'] = spenalty
+                            qs['search_best_penalty_round'] = i
+                        results[rhash] = result
+                    min_ranking = min(min_ranking,
+                                      search.penalty + 0.4,
+                                      result.accuracy + 0.1)
+                log().result_dump('Results', ((r.accuracy, r) for r in lookup_results))
+                lookups.cancel_unless(_is_needed)
+                if self.timeout.is_elapsed():
+                    break
 
         qs['search_rounds'] = i + 1
         return SearchResults(results.values())
@@ -316,6 +405,113 @@ class ForwardGeocoder:
 
         return results
 
+    async def lookup_prefix(self, phrases: List[Phrase]) -> SearchResults:
+        """ Look up a free-text query, whose last word is still being typed.
+            The last word is completed with the most frequent words that
+            start with it and the searches for all completions are run
+            together.
+        """
+        log().function('forward_lookup_prefix', phrases=phrases, params=self.params)
+        results = SearchResults()
+
+        if self.params.is_impossible():
+            return results
+
+        await self._resolve_excluded_osm_ids()
+
+        queries, searches = await self.build_prefix_searches(phrases)
+
+        if searches:
+            results = await self.execute_searches(queries[0], searches[:50])
+            results = self.pre_filter_results(results)
+            await add_result_details(self.conn, results, self.params)
+            log().result_dump('Preliminary Results', ((r.accuracy, r) for r in results))
+            # Reranking by query is not possible because the
+            # last word of the query is incomplete.
+            if len(results) > 1:
+                results = self.sort_and_cut_results(results)
+            log().result_dump('Final Results', ((r.accuracy, r) for r in results))
+
+        return results
+
+
+class _SpeculativeLookups:
+    """ Runs the lookups for a list of searches. Lookups may be started
+        ahead of time, in which case they run concurrently on additional
+        connections from the connection pool.
+    """
+
+    def __init__(self, conn: SearchConnection, params: SearchDetails,
+                 searches: List[AbstractSearch], max_parallel: int) -> None:
+        self.conn = conn
+        self.params = params
+        self.searches = searches
+        self.max_parallel = max_parallel
+        self.tasks: Dict[int, 'asyncio.Task[SearchResults]'] = {}
+        self.cancelled: List['asyncio.Task[SearchResults]'] = []
+        self.free_conns: List[SearchConnection] = []
+        self.num_conns = 0
+        self.pool_exhausted = False
+        self.exit_stack = contextlib.AsyncExitStack()
+
+    async def __aenter__(self) -> '_SpeculativeLookups':
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        for task in self.tasks.values():
+            task.cancel()
+        self.cancelled.extend(self.tasks.values())
+        self.tasks.clear()
+        await asyncio.gather(*self.cancelled, return_exceptions=True)
+        await self.exit_stack.aclose()
+
+    async def start(self, idx: int) -> None:
+        """ Start the lookup for the search with the given index in
+            the background, if a connection is available for it.
+        """
+        if idx in self.tasks:
+            return
+
+        if self.free_conns:
+            conn = self.free_conns.pop()
+        elif self.num_conns < self.max_parallel and not self.pool_exhausted:
+            forked = await self.exit_stack.enter_async_context(self.conn.fork())
+            if forked is None:
+                # Leave the remaining connections to other requests.
+                self.pool_exhausted = True
+                return
+            conn = forked
+            self.num_conns += 1
+        else:
+            return
+
+        self.tasks[idx] = asyncio.create_task(self._lookup(self.searches[idx], conn))
+
+    async def _lookup(self, search: AbstractSearch, conn: SearchConnection) -> SearchResults:
+        results = await search.lookup(conn, self.params)
+        # Only connections that finished their query cleanly may be reused.
+        self.free_conns.append(conn)
+        return results
+
+    async def get(self, idx: int) -> SearchResults:
+        """ Return the results for the search with the given index.
+            Runs the search on the main connection, if it has not been
+            started in advance.
+        """
+        task = self.tasks.pop(idx, None)
+        if task is not None:
+            return await task
+
+        return await self.searches[idx].lookup(self.conn, self.params)
+
+    def cancel_unless(self, is_needed: Callable[[int], bool]) -> None:
+        """ Cancel all started lookups that are no longer needed.
+        """
+        for idx in [i for i in self.tasks if not is_needed(i)]:
+            task = self.tasks.pop(idx)
+            task.cancel()
+            self.cancelled.append(task)
+
 
 def _dump_searches(searches: List[AbstractSearch], query: QueryStruct,
                    start: int = 0) -> Iterator[Optional[List[Any]]]:
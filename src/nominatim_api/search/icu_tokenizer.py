@@ -7,7 +7,7 @@
 """
 Implementation of query analysis for the ICU tokenizer.
 """
-from typing import Tuple, Dict, List, Optional, Iterator, Any, cast
+from typing import Tuple, Dict, List, Optional, Iterator, Iterable, Any, Sequence, Set, cast
 import dataclasses
 import difflib
 import re
@@ -21,9 +21,12 @@ from ..typing import SaRow
 from ..sql.sqlalchemy_types import Json
 from ..connection import SearchConnection
 from ..logging import log
+from ..types import current_query_stats
+from ..utils.cache import LRUCache
 from . import query as qmod
 from .query_analyzer_factory import AbstractQueryAnalyzer
 from .postcode_parser import PostcodeParser
+from .word_dictionary import WordDictionary
 
 
 DB_TO_TOKEN_TYPE = {
@@ -44,6 +47,15 @@ PENALTY_BREAK = {
      qmod.BREAK_TOKEN: 0.4
 }
 
+# Keys in the info field of the word table with the frequencies of
+# word pairs for the different token counts.
+PAIR_INFO_KEYS = {'count': 'pairs', 'addr_count': 'addr_pairs'}
+
+# Extra penalty for tokens of a word completed by a prefix query.
+PENALTY_COMPLETION = 0.1
+# Minimum length of the last word of a prefix query to be completed.
+MIN_COMPLETION_LENGTH = 3
+
 
 @dataclasses.dataclass
 class ICUToken(qmod.Token):
@@ -60,6 +72,14 @@ class ICUToken(qmod.Token):
         assert self.info
         return cast(str, self.info.get('cc', ''))
 
+    def get_pair_count(self, other: int, count_column: str) -> Optional[int]:
+        if self.info is None:
+            return None
+        pairs = self.info.get(PAIR_INFO_KEYS.get(count_column, ''))
+        if pairs is None:
+            return None
+        return cast(Optional[int], pairs.get(str(other)))
+
     def match_penalty(self, norm: str) -> float:
         """ Check how well the token matches the given normalized string
             and add a penalty, if necessary.
@@ -114,21 +134,69 @@ class ICUToken(qmod.Token):
                         addr_count=max(1, addr_count))
 
 
+WordCache = LRUCache[str, Tuple[SaRow, ...]]
+QueryCache = LRUCache[Tuple[Tuple[qmod.PhraseType, str], ...], qmod.QueryStruct]
+
+
+class CachedTransliterator:
+    """ Wrapper around an ICU transliterator that memorizes the
+        results for the most recently used strings.
+    """
+
+    def __init__(self, transliterator: Transliterator, cache: LRUCache[str, str]) -> None:
+        self.transliterator = transliterator
+        self.cache = cache
+
+    def transliterate(self, text: str) -> str:
+        """ Return the transliteration of the given text.
+        """
+        result = self.cache.get(text)
+        if result is None:
+            result = cast(str, self.transliterator.transliterate(text))
+            self.cache.put(text, result)
+
+        return result
+
+
 @dataclasses.dataclass
 class ICUAnalyzerConfig:
     postcode_parser: PostcodeParser
-    normalizer: Transliterator
-    transliterator: Transliterator
+    normalizer: CachedTransliterator
+    transliterator: CachedTransliterator
+    word_cache: WordCache
+    query_cache: QueryCache
+    word_dictionary: Optional[WordDictionary] = None
 
     @staticmethod
     async def create(conn: SearchConnection) -> 'ICUAnalyzerConfig':
+        async def _make_trans_cache() -> LRUCache[str, str]:
+            return LRUCache(conn.config.get_int('API_TRANSLITERATION_CACHE_SIZE'))
+
         rules = await conn.get_property('tokenizer_import_normalisation')
-        normalizer = Transliterator.createFromRules("normalization", rules)
+        normalizer = CachedTransliterator(
+            Transliterator.createFromRules("normalization", rules),
+            await conn.get_cached_value('CACHE', 'normalization', _make_trans_cache))
 
         rules = await conn.get_property('tokenizer_import_transliteration')
-        transliterator = Transliterator.createFromRules("transliteration", rules)
+        transliterator = CachedTransliterator(
+            Transliterator.createFromRules("transliteration", rules),
+            await conn.get_cached_value('CACHE', 'transliteration', _make_trans_cache))
+
+        async def _make_word_cache() -> WordCache:
+            return LRUCache(conn.config.get_int('API_WORD_CACHE_SIZE'))
+
+        word_cache = await conn.get_cached_value('CACHE', 'words', _make_word_cache)
+
+        async def _make_query_cache() -> QueryCache:
+            return LRUCache(conn.config.get_int('API_QUERY_CACHE_SIZE'))
+
+        query_cache = await conn.get_cached_value('CACHE', 'queries', _make_query_cache)
+
+        dict_file = conn.config.get_path('API_WORD_DICTIONARY')
 
-        return ICUAnalyzerConfig(PostcodeParser(conn.config), normalizer, transliterator)
+        return ICUAnalyzerConfig(PostcodeParser(conn.config), normalizer, transliterator,
+                                 word_cache, query_cache,
+                                 WordDictionary(dict_file) if dict_file else None)
 
 
 class ICUQueryAnalyzer(AbstractQueryAnalyzer):
@@ -140,30 +208,162 @@ class ICUQueryAnalyzer(AbstractQueryAnalyzer):
         self.postcode_parser = config.postcode_parser
         self.normalizer = config.normalizer
         self.transliterator = config.transliterator
+        self.word_cache = config.word_cache
+        self.query_cache = config.query_cache
+        self.word_dictionary = config.word_dictionary
+        self.prefetched: Dict[str, List[SaRow]] = {}
 
     async def analyze_query(self, phrases: List[qmod.Phrase]) -> qmod.QueryStruct:
         """ Analyze the given list of phrases and return the
             tokenized query.
+
+            Analyzed queries are kept in the query cache with the
+            normalized phrases as key. Each caller receives its own
+            copy of the cached query.
         """
         log().section('Analyze query (using ICU tokenizer)')
-        phrases = list(filter(lambda p: p.text,
-                              (qmod.Phrase(p.ptype, self.normalize_text(p.text))
-                               for p in phrases)))
-        query = qmod.QueryStruct(phrases)
+        qs = current_query_stats()
+        with qs.timer('normalize'):
+            phrases = list(filter(lambda p: p.text,
+                                  (qmod.Phrase(p.ptype, self.normalize_text(p.text))
+                                   for p in phrases)))
+
+        log().var_dump('Normalized query', phrases)
+        if not phrases:
+            return qmod.QueryStruct(phrases)
+
+        cache = self.query_cache
+        if cache.maxsize <= 0:
+            return await self._analyze_normalized(phrases)
+
+        cache.set_version(await self.conn.get_data_version())
+
+        key = tuple((p.ptype, p.text) for p in phrases)
+        query = cache.get(key)
+        if query is None:
+            query = await self._analyze_normalized(phrases)
+            cache.put(key, query.clone())
+        else:
+            log().comment('Tokenized query found in query cache')
+            log().table_dump('Word tokens', _dump_word_tokens(query))
+            query = query.clone()
+
+        return query
+
+    async def analyze_prefix_query(self, phrases: List[qmod.Phrase],
+                                   limit: int) -> List[qmod.QueryStruct]:
+        """ Analyze the given list of phrases, where the last word may
+            be incomplete. The last word is replaced with the most
+            frequent partial words that start with it.
+        """
+        log().section('Analyze prefix query (using ICU tokenizer)')
+        qs = current_query_stats()
+        with qs.timer('normalize'):
+            phrases = list(filter(lambda p: p.text,
+                                  (qmod.Phrase(p.ptype, self.normalize_text(p.text))
+                                   for p in phrases)))
+
+        log().var_dump('Normalized query', phrases)
+        if not phrases:
+            return [qmod.QueryStruct(phrases)]
+
+        base = self._split_normalized(phrases)
+        term = base.nodes[-1].term_lookup
+        completions = []
+        if len(term) >= MIN_COMPLETION_LENGTH and not term.isdigit():
+            with qs.timer('word_lookup'):
+                completions = await self.complete_term(term, limit)
+                if term not in completions and \
+                        any(r.type == 'w' for r in await self.lookup_in_db([term])):
+                    completions = [term] + completions[:limit - 1]
+        log().var_dump('Completions', completions)
+
+        if not completions:
+            words = base.extract_words()
+            with qs.timer('word_lookup'):
+                self._add_tokens(base, words, await self.lookup_in_db(list(words)))
+            return [base]
+
+        queries = []
+        for completion in completions:
+            query = base.clone()
+            query.nodes[-1].term_lookup = completion
+            query.nodes[-1].term_normalized = completion
+            queries.append(query)
+
+        all_words = [q.extract_words() for q in queries]
+        with qs.timer('word_lookup'):
+            rows = await self.lookup_in_db(list(set(w for words in all_words for w in words)))
+
+        for query, words in zip(queries, all_words):
+            self._add_tokens(query, words, rows)
+            if query.nodes[-1].term_lookup != term:
+                last = query.num_token_slots()
+                partial = query.nodes[last - 1].partial
+                if partial is not None:
+                    partial.penalty += PENALTY_COMPLETION
+                for node in query.nodes:
+                    for tlist in node.starting:
+                        if tlist.end == last:
+                            tlist.add_penalty(PENALTY_COMPLETION)
+
+        return queries
+
+    async def complete_term(self, term: str, limit: int) -> List[str]:
+        """ Return up to 'limit' partial words that start with the given
+            term. The most frequent words come first.
+        """
+        if self.word_dictionary is not None \
+           and self.word_dictionary.is_current(await self.conn.get_data_version()):
+            return self.word_dictionary.complete(term, limit)
 
-        log().var_dump('Normalized query', query.source)
-        if not query.source:
-            return query
+        t = self.conn.t.meta.tables['word']
+        sql = sa.select(t.c.word_token)\
+                .where(t.c.type == 'w')\
+                .where(t.c.word_token.startswith(term, autoescape=True))\
+                .order_by(sa.func.coalesce(t.c.info['count'].as_integer(), 1).desc(),
+                          t.c.word_token)\
+                .limit(limit)
+
+        return [r.word_token for r in await self.conn.execute(sql)]
+
+    def _split_normalized(self, phrases: List[qmod.Phrase]) -> qmod.QueryStruct:
+        """ Create a query without tokens from the given list of
+            normalized, non-empty phrases.
+        """
+        query = qmod.QueryStruct(phrases)
 
-        self.split_query(query)
+        with current_query_stats().timer('transliterate'):
+            self.split_query(query)
         log().var_dump('Transliterated query',
                        lambda: ''.join(f"{n.term_lookup}{n.btype}" for n in query.nodes)
                                + ' / '
                                + ''.join(f"{n.term_normalized}{n.btype}" for n in query.nodes))
+
+        return query
+
+    async def _analyze_normalized(self, phrases: List[qmod.Phrase]) -> qmod.QueryStruct:
+        """ Tokenize the given list of normalized, non-empty phrases.
+        """
+        query = self._split_normalized(phrases)
         words = query.extract_words()
 
-        for row in await self.lookup_in_db(list(words.keys())):
-            for trange in words[row.word_token]:
+        with current_query_stats().timer('word_lookup'):
+            rows = await self.lookup_in_db(list(words.keys()))
+
+        self._add_tokens(query, words, rows)
+
+        return query
+
+    def _add_tokens(self, query: qmod.QueryStruct, words: Dict[str, List[qmod.TokenRange]],
+                    rows: Iterable[SaRow]) -> None:
+        """ Add the tokens for the rows of the word table and the
+            tokens computed from the query itself to the query.
+            'words' maps the terms of the query to their positions.
+            Rows for terms that are not in the query are ignored.
+        """
+        for row in rows:
+            for trange in words.get(row.word_token, ()):
                 # Create a new token for each position because the token
                 # penalty can vary depending on the position in the query.
                 # (See rerank_tokens() below.)
@@ -193,14 +393,12 @@ class ICUQueryAnalyzer(AbstractQueryAnalyzer):
 
         log().table_dump('Word tokens', _dump_word_tokens(query))
 
-        return query
-
     def normalize_text(self, text: str) -> str:
         """ Bring the given text into a normalized form. That is the
             standardized form search will work with. All information removed
             at this stage is inevitably lost.
         """
-        return cast(str, self.normalizer.transliterate(text)).strip('-: ')
+        return self.normalizer.transliterate(text).strip('-: ')
 
     def split_transliteration(self, trans: str, word: str) -> list[tuple[str, str]]:
         """ Split the given transliteration string into sub-words and
@@ -211,22 +409,20 @@ class ICUQueryAnalyzer(AbstractQueryAnalyzer):
         if len(subwords) == 1:
             return [(trans, word)]
 
+        # The parts of the word are transliterated without the shared cache,
+        # so that they do not push out the entries for complete words.
+        transliterator = self.transliterator.transliterator
+
         tlist = []
-        titer = filter(None, subwords)
-        current_trans: Optional[str] = next(titer)
-        assert current_trans
-        current_word = ''
-        for letter in word:
-            current_word += letter
-            if self.transliterator.transliterate(current_word).rstrip() == current_trans:
-                tlist.append((current_trans, current_word))
-                current_trans = next(titer, None)
-                if current_trans is None:
-                    return tlist
-                current_word = ''
-
-        if current_word:
-            tlist.append((current_trans, current_word))
+        start = 0
+        for subword in filter(None, subwords):
+            end = _find_subword_end(transliterator, word, start, subword)
+            if end is None:
+                if start < len(word):
+                    tlist.append((subword, word[start:]))
+                break
+            tlist.append((subword, word[start:end]))
+            start = end
 
         return tlist
 
@@ -251,12 +447,82 @@ class ICUQueryAnalyzer(AbstractQueryAnalyzer):
 
         query.nodes[-1].btype = qmod.BREAK_END
 
-    async def lookup_in_db(self, words: List[str]) -> 'sa.Result[Any]':
+    async def prefetch_words(self, queries: Sequence[List[qmod.Phrase]]) -> None:
+        """ Look up the word tokens for all the given queries at once.
+            The rows are kept for subsequent calls to analyze_query()
+            until prefetch_words() is called again.
+        """
+        words: Set[str] = set()
+        for phrases in queries:
+            normalized = (qmod.Phrase(p.ptype, self.normalize_text(p.text)) for p in phrases)
+            query = qmod.QueryStruct([p for p in normalized if p.text])
+            if query.source:
+                self.split_query(query)
+                words.update(query.extract_words().keys())
+
+        self.prefetched = {}
+        prefetched: Dict[str, List[SaRow]] = {w: [] for w in words}
+        if words:
+            for row in await self.lookup_in_db(list(words)):
+                prefetched[row.word_token].append(row)
+        self.prefetched = prefetched
+
+    async def lookup_in_db(self, words: List[str]) -> List[SaRow]:
         """ Return the token information from the database for the
             given word tokens.
 
-            This function excludes postcode tokens
+            This function excludes postcode tokens. Rows are taken from
+            the prefetched words or the word cache where possible.
+            Only missing words are looked up in the word dictionary or
+            the database and then added to the cache, including the words
+            that have no entry in the word table at all.
         """
+        rows: List[SaRow] = []
+        if self.prefetched:
+            remaining = []
+            for word in words:
+                word_rows = self.prefetched.get(word)
+                if word_rows is None:
+                    remaining.append(word)
+                else:
+                    rows.extend(word_rows)
+            if not remaining:
+                return rows
+            words = remaining
+
+        cache = self.word_cache
+        if cache.maxsize <= 0:
+            rows.extend(await self._query_word_table(words))
+            return rows
+
+        cache.set_version(await self.conn.get_data_version())
+
+        missing: Dict[str, List[SaRow]] = {}
+        for word in words:
+            cached = cache.get(word)
+            if cached is None:
+                missing[word] = []
+            else:
+                rows.extend(cached)
+
+        log().var_dump('Word cache', f"{len(words) - len(missing)} hits, {len(missing)} misses")
+
+        if missing:
+            for row in await self._query_word_table(list(missing)):
+                missing[row.word_token].append(row)
+            for word, word_rows in missing.items():
+                cache.put(word, tuple(word_rows))
+                rows.extend(word_rows)
+
+        return rows
+
+    async def _query_word_table(self, words: List[str]) -> Iterable[SaRow]:
+        if self.word_dictionary is not None:
+            if self.word_dictionary.is_current(await self.conn.get_data_version()):
+                log().comment('Words taken from word dictionary')
+                return cast(List[SaRow], self.word_dictionary.lookup(words))
+            log().comment('Word dictionary is outdated. Using word table.')
+
         t = self.conn.t.meta.tables['word']
         return await self.conn.execute(t.select()
                                         .where(t.c.word_token.in_(words))
@@ -325,6 +591,58 @@ class ICUQueryAnalyzer(AbstractQueryAnalyzer):
             node.penalty = PENALTY_BREAK[node.btype]
 
 
+def _find_subword_end(transliterator: Transliterator, word: str,
+                      start: int, subword: str) -> Optional[int]:
+    """ Find the shortest part of 'word' beginning at 'start' which
+        transliterates to 'subword'. Returns the end of the part or None,
+        if there is no such part.
+
+        Transliteration rules may depend on the context of a letter, so
+        the parts cannot be transliterated letter by letter. Instead, the
+        part is grown exponentially for as long as its transliteration is
+        still the beginning of the sub-word. A binary search then finds
+        the shortest part that goes beyond. This needs a logarithmic
+        number of transliterations per sub-word. When the result does not
+        match, all parts are checked one by one.
+    """
+    transliterated: Dict[int, str] = {}
+
+    def _trans(end: int) -> str:
+        if end not in transliterated:
+            transliterated[end] = cast(str, transliterator.transliterate(word[start:end])).rstrip()
+        return transliterated[end]
+
+    def _is_complete(end: int) -> bool:
+        part = _trans(end)
+        return part == subword or not subword.startswith(part)
+
+    size = len(word) - start
+    lower, upper, step = 0, None, 1
+    while lower < size:
+        candidate = min(lower + step, size)
+        if _is_complete(start + candidate):
+            upper = candidate
+            break
+        lower = candidate
+        step *= 2
+
+    if upper is not None:
+        while upper - lower > 1:
+            middle = (lower + upper) // 2
+            if _is_complete(start + middle):
+                upper = middle
+            else:
+                lower = middle
+        if _trans(start + upper) == subword:
+            return start + upper
+
+    for end in range(start + 1, len(word) + 1):
+        if _trans(end) == subword:
+            return end
+
+    return None
+
+
 def _dump_word_tokens(query: qmod.QueryStruct) -> Iterator[List[Any]]:
     yield ['type', 'from', 'to', 'token', 'word_token', 'lookup_word', 'penalty', 'count', 'info']
     for i, node in enumerate(query.nodes):
@@ -10,6 +10,7 @@ Datastructures for a tokenized query.
 from typing import Dict, List, Tuple, Optional, Iterator
 from abc import ABC, abstractmethod
 from collections import defaultdict
+import copy
 import dataclasses
 
 # Precomputed denominator for the computation of the linear regression slope
@@ -133,6 +134,15 @@ class Token(ABC):
             (currently for country tokens only).
         """
 
+    def get_pair_count(self, other: int, count_column: str) -> Optional[int]:
+        """ Return how often this token appears together with the token
+            with the ID 'other'. 'count_column' names the attribute with
+            the frequency of the token for the kind of lookup, i.e. 'count'
+            for names and 'addr_count' for addresses. Returns None when
+            no statistics are available for the pair.
+        """
+        return None
+
 
 @dataclasses.dataclass
 class TokenRange:
@@ -292,6 +302,21 @@ class QueryStruct:
             [QueryNode(BREAK_START, source[0].ptype if source else PHRASE_ANY,
                        0.0, '', '')]
 
+    def clone(self) -> 'QueryStruct':
+        """ Return a copy of the query, which can be changed without
+            affecting the original. Nodes, token lists and tokens are
+            copied. The content of the tokens is shared.
+        """
+        query = QueryStruct(list(self.source))
+        query.dir_penalty = self.dir_penalty
+        query.nodes = [QueryNode(n.btype, n.ptype, n.penalty, n.term_lookup, n.term_normalized,
+                                 [TokenList(tl.end, tl.ttype, [copy.copy(t) for t in tl.tokens])
+                                  for tl in n.starting],
+                                 copy.copy(n.partial))
+                       for n in self.nodes]
+
+        return query
+
     def num_token_slots(self) -> int:
         """ Return the length of the query in vertice steps.
         """
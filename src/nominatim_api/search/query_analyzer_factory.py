@@ -7,7 +7,7 @@
 """
 Factory for creating a query analyzer for the configured tokenizer.
 """
-from typing import List, cast, TYPE_CHECKING
+from typing import List, Sequence, cast, TYPE_CHECKING
 from abc import ABC, abstractmethod
 from pathlib import Path
 import importlib
@@ -37,6 +37,22 @@ class AbstractQueryAnalyzer(ABC):
             at this stage is inevitably lost.
         """
 
+    async def analyze_prefix_query(self, phrases: List['Phrase'],
+                                   limit: int) -> List['QueryStruct']:
+        """ Analyze the given phrases, where the last word may be the
+            beginning of a word only. Return one tokenized query for each
+            of up to 'limit' words, with which the last word may be
+            completed. The default implementation does not complete the
+            last word.
+        """
+        return [await self.analyze_query(phrases)]
+
+    async def prefetch_words(self, queries: Sequence[List['Phrase']]) -> None:
+        """ Prepare the analyzer for analysing all of the given queries.
+            Analyzers may use this to retrieve information needed for
+            the queries in bulk. The default implementation does nothing.
+        """
+
 
 async def make_query_analyzer(conn: SearchConnection) -> AbstractQueryAnalyzer:
     """ Create a query analyzer for the tokenizer used by the database.
@@ -10,6 +10,7 @@ Query preprocessing manager
 
 from ..errors import UsageError
 from ..config import Configuration
+from ..connection import SearchConnection
 from ..query_preprocessing.base import QueryProcessingFunc
 from ..query_preprocessing.config import QueryConfig
 from ..search.query import Phrase
@@ -51,3 +52,13 @@ class QueryPreprocessor:
             phrases = proc(phrases)
 
         return phrases
+
+
+async def make_query_preprocessor(conn: SearchConnection) -> QueryPreprocessor:
+    """ Return the query preprocessing chain for the database.
+        The chain is only set up once and then shared between requests.
+    """
+    async def _create() -> QueryPreprocessor:
+        return QueryPreprocessor(conn.config)
+
+    return await conn.get_cached_value('QUERY', 'preprocessor', _create)
@@ -8,8 +8,10 @@
 Create query interpretations where each vertice in the query is assigned
 a specific function (expressed as a token type).
 """
-from typing import Optional, List, Iterator
+from typing import Optional, List, Iterator, Tuple, Union, Callable
 import dataclasses
+import heapq
+import itertools
 
 from ..logging import log
 from . import query as qmod
@@ -408,33 +410,51 @@ def yield_token_assignments(query: qmod.QueryStruct) -> Iterator[TokenAssignment
         The result includes the penalty for transitions from one word type to
         another. It does not include penalties for transitions within a
         type.
+
+        Assignments are yielded in order of increasing penalty. The
+        enumeration is best-first: partial sequences are extended in
+        the order of their penalty, so that the caller may stop consuming
+        the iterator once the penalty gets too high without the remaining
+        sequences ever being computed. This works because penalties only
+        ever grow while a sequence is extended and turned into assignments.
     """
-    todo = [_TokenSequence([], direction=0 if query.source[0].ptype == qmod.PHRASE_ANY else 1)]
+    counter = itertools.count()
+    todo: List[Tuple[float, int, Union[_TokenSequence, TokenAssignment]]] = []
+
+    def _push(item: Union[_TokenSequence, TokenAssignment]) -> None:
+        heapq.heappush(todo, (item.penalty, next(counter), item))
+
+    _push(_TokenSequence([], direction=0 if query.source[0].ptype == qmod.PHRASE_ANY else 1))
 
     while todo:
-        state = todo.pop()
+        _, _, item = heapq.heappop(todo)
+        if isinstance(item, TokenAssignment):
+            yield item
+            continue
+
+        state = item
         node = query.nodes[state.end_pos]
 
         for tlist in node.starting:
-            yield from _append_state_to_todo(
-                query, todo,
-                state.advance(tlist.ttype, tlist.end,
-                              True, node.word_break_penalty))
+            _add_state(query, _push,
+                       state.advance(tlist.ttype, tlist.end,
+                                     True, node.word_break_penalty))
 
         if node.partial is not None:
-            yield from _append_state_to_todo(
-                query, todo,
-                state.advance(qmod.TOKEN_PARTIAL, state.end_pos + 1,
-                              node.btype == qmod.BREAK_PHRASE,
-                              node.word_break_penalty))
+            _add_state(query, _push,
+                       state.advance(qmod.TOKEN_PARTIAL, state.end_pos + 1,
+                                     node.btype == qmod.BREAK_PHRASE,
+                                     node.word_break_penalty))
 
 
-def _append_state_to_todo(query: qmod.QueryStruct, todo: List[_TokenSequence],
-                          newstate: Optional[_TokenSequence]) -> Iterator[TokenAssignment]:
+def _add_state(query: qmod.QueryStruct,
+               push: Callable[[Union[_TokenSequence, TokenAssignment]], None],
+               newstate: Optional[_TokenSequence]) -> None:
     if newstate is not None:
         if newstate.end_pos == query.num_token_slots():
             if newstate.recheck_sequence():
                 log().var_dump('Assignment', newstate)
-                yield from newstate.get_assignments(query)
+                for assignment in newstate.get_assignments(query):
+                    push(assignment)
         elif not newstate.is_final():
-            todo.append(newstate)
+            push(newstate)
@@ -0,0 +1,342 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of Nominatim. (https://nominatim.org)
+#
+# Copyright (C) 2026 by the Nominatim developer community.
+# For a full list of authors see the git log.
+"""
+Read-only copy of the word table in a memory-mapped file.
+
+The dictionary allows the ICU query analyzer to look up search terms
+without querying the database. All worker processes map the same file,
+so that the operating system keeps only a single copy in memory.
+
+The dictionary also serves as a prefix index over the partial words.
+Partial words with the same prefix follow each other in the sorted
+rows. For prefixes shared by many partial words, the most frequent
+partial words are precomputed in the completion table. This is
+a pruned trie, which only keeps the nodes that are too expensive to
+evaluate at query time.
+
+The file uses the native byte order and has the following layout:
+
+    header       magic, format version, byte order mark, number of rows N,
+                 number of partial words P, number of prefixes M,
+                 length of the data version string
+    version      ISO date of the data the dictionary was created from
+    offsets      int64[3N + 1], start of token, word and info of each row
+                 in the string section
+    word_ids     int64[N], -1 for rows without an ID
+    partials     int64[P], rows of the partial words in token order
+    counts       int64[P], frequency of each partial word
+    prefixes     int64[2M], start and end of each prefix in the string
+                 section, sorted by prefix
+    completions  int64[M * COMPLETION_TABLE_SIZE], index into partials
+                 of the most frequent partial words for each prefix,
+                 padded with -1
+    types        one ASCII character per row
+    strings      UTF-8 encoded tokens, words and JSON-encoded info,
+                 followed by the prefixes
+
+Sections start at multiples of 8 bytes. Rows are sorted by the UTF-8
+encoding of their token.
+"""
+from typing import Any, Dict, Iterable, List, Optional, IO, Tuple
+from array import array
+from pathlib import Path
+import datetime as dt
+import heapq
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+from ..errors import UsageError
+
+MAGIC = b'NOMWORDS'
+FORMAT_VERSION = 2
+BYTE_ORDER_MARK = 0x01020304
+
+# Number of completions stored for each prefix in the completion table.
+COMPLETION_TABLE_SIZE = 10
+# Prefixes shared by more partial words are added to the completion table.
+MAX_PREFIX_SCAN = 1000
+
+_HEADER = struct.Struct('=8sIIQQQI4x')
+
+
+def _padding(size: int) -> int:
+    return -size % 8
+
+
+class WordRow:
+    """ A row of the word dictionary. It has the same fields as
+        a row of the word table. The info field is decoded on access.
+    """
+
+    def __init__(self, word_id: Optional[int], word_token: str, wtype: str,
+                 word: Optional[str], info: bytes) -> None:
+        self.word_id = word_id
+        self.word_token = word_token
+        self.type = wtype
+        self.word = word
+        self._raw_info = info
+        self._info: Optional[Dict[str, Any]] = None
+
+    @property
+    def info(self) -> Optional[Dict[str, Any]]:
+        """ Additional information about the word, if any.
+        """
+        if self._info is None and self._raw_info:
+            self._info = json.loads(self._raw_info)
+        return self._info
+
+
+class WordDictionary:
+    """ Memory-mapped word dictionary created by
+        'nominatim refresh --word-dictionary'.
+    """
+
+    def __init__(self, filename: Path) -> None:
+        try:
+            with open(filename, 'rb') as fd:
+                self.mmap = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as exc:
+            raise UsageError(f"Cannot open word dictionary '{filename}'.") from exc
+
+        if len(self.mmap) < _HEADER.size:
+            raise UsageError(f"Word dictionary '{filename}' is truncated.")
+
+        magic, version, bom, nrows, npartials, nprefixes, vlen = \
+            _HEADER.unpack_from(self.mmap)
+        if magic != MAGIC or version != FORMAT_VERSION or bom != BYTE_ORDER_MARK:
+            raise UsageError(f"Word dictionary '{filename}' has an unknown format. "
+                             "Run 'nominatim refresh --word-dictionary' to recreate it.")
+
+        sections = []
+        pos = _HEADER.size + vlen + _padding(vlen)
+        for size in (3 * nrows + 1, nrows, npartials, npartials,
+                     2 * nprefixes, COMPLETION_TABLE_SIZE * nprefixes):
+            sections.append((pos, pos + 8 * size))
+            pos += 8 * size
+        spos = pos + nrows + _padding(nrows)
+        if len(self.mmap) < spos:
+            raise UsageError(f"Word dictionary '{filename}' is truncated.")
+
+        data = memoryview(self.mmap)
+        self.data_version = bytes(data[_HEADER.size:_HEADER.size + vlen]).decode('utf-8')
+        self.offsets, self.word_ids, self.partials, self.counts, \
+            self.prefixes, self.completions = (data[s:e].cast('q') for s, e in sections)
+        self.types = data[pos:pos + nrows]
+        self.strings = data[spos:]
+
+        if len(self.strings) < (self.prefixes[-1] if nprefixes else self.offsets[-1]):
+            raise UsageError(f"Word dictionary '{filename}' is truncated.")
+
+        self._version_date = dt.datetime.fromisoformat(self.data_version) \
+            if self.data_version else None
+
+    def __len__(self) -> int:
+        return len(self.word_ids)
+
+    def is_current(self, data_version: Any) -> bool:
+        """ Check if the dictionary was created from the data
+            with the given version.
+        """
+        return bool(data_version == self._version_date)
+
+    def _string(self, pos: int) -> bytes:
+        return bytes(self.strings[self.offsets[pos]:self.offsets[pos + 1]])
+
+    def _partial(self, idx: int) -> bytes:
+        return self._string(3 * self.partials[idx])
+
+    def _prefix(self, idx: int) -> bytes:
+        return bytes(self.strings[self.prefixes[2 * idx]:self.prefixes[2 * idx + 1]])
+
+    def find(self, word_token: str) -> List[WordRow]:
+        """ Return all rows for the given token.
+        """
+        key = word_token.encode('utf-8')
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._string(3 * mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        rows = []
+        while lo < len(self) and self._string(3 * lo) == key:
+            word = self._string(3 * lo + 1)
+            word_id = self.word_ids[lo]
+            rows.append(WordRow(None if word_id < 0 else word_id, word_token,
+                                chr(self.types[lo]),
+                                word.decode('utf-8') if word else None,
+                                self._string(3 * lo + 2)))
+            lo += 1
+
+        return rows
+
+    def lookup(self, words: Iterable[str]) -> List[WordRow]:
+        """ Return the rows for all the given tokens.
+        """
+        return [row for word in words for row in self.find(word)]
+
+    def complete(self, prefix: str, limit: int) -> List[str]:
+        """ Return up to 'limit' partial words that start with the
+            given prefix. The most frequent words come first.
+        """
+        key = prefix.encode('utf-8')
+
+        num_prefixes = len(self.prefixes) // 2
+        lo, hi = 0, num_prefixes
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._prefix(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        if lo < num_prefixes and self._prefix(lo) == key:
+            start = COMPLETION_TABLE_SIZE * lo
+            end = start + min(limit, COMPLETION_TABLE_SIZE)
+            best = [i for i in self.completions[start:end] if i >= 0]
+        else:
+            lo, hi = 0, len(self.partials)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self._partial(mid) < key:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            candidates = []
+            while lo < len(self.partials) and self._partial(lo).startswith(key):
+                candidates.append((self.counts[lo], -lo))
+                lo += 1
+            best = [-i for _, i in heapq.nlargest(limit, candidates)]
+
+        return [self._partial(i).decode('utf-8') for i in best]
+
+
+class _PrefixState:
+    """ Partial words sharing a prefix, collected while building
+        the dictionary.
+    """
+
+    def __init__(self, prefix: str) -> None:
+        self.prefix = prefix
+        self.num_words = 0
+        self.best: List[Tuple[int, int]] = []
+
+    def add(self, count: int, idx: int) -> None:
+        """ Count the partial word with the given index and frequency.
+        """
+        self.num_words += 1
+        if len(self.best) < COMPLETION_TABLE_SIZE:
+            heapq.heappush(self.best, (count, -idx))
+        else:
+            heapq.heappushpop(self.best, (count, -idx))
+
+
+class WordDictionaryBuilder:
+    """ Creates the file for a word dictionary. Rows must be added
+        in the order of the UTF-8 encoding of their tokens.
+    """
+
+    def __init__(self) -> None:
+        self.offsets = array('q', [0])
+        self.word_ids = array('q')
+        self.partials = array('q')
+        self.counts = array('q')
+        self.types = bytearray()
+        self.strings: IO[bytes] = tempfile.TemporaryFile()
+        self.size = 0
+        self.last_token = b''
+        self.open_prefixes: List[_PrefixState] = []
+        self.completions: List[Tuple[bytes, List[int]]] = []
+
+    def _add_string(self, value: bytes) -> None:
+        self.strings.write(value)
+        self.size += len(value)
+        self.offsets.append(self.size)
+
+    def _close_prefixes(self, keep: int) -> None:
+        while len(self.open_prefixes) > keep:
+            state = self.open_prefixes.pop()
+            if state.num_words > MAX_PREFIX_SCAN:
+                self.completions.append((state.prefix.encode('utf-8'),
+                                         [-i for _, i in sorted(state.best, reverse=True)]))
+
+    def _add_partial(self, word_token: str, count: int) -> None:
+        idx = len(self.partials)
+        self.partials.append(len(self.word_ids) - 1)
+        self.counts.append(count)
+
+        common = 0
+        for state in self.open_prefixes:
+            if not word_token.startswith(state.prefix):
+                break
+            common += 1
+        self._close_prefixes(common)
+
+        for i in range(common + 1, len(word_token) + 1):
+            self.open_prefixes.append(_PrefixState(word_token[:i]))
+
+        for state in self.open_prefixes:
+            state.add(count, idx)
+
+    def add(self, word_id: Optional[int], word_token: str, wtype: str,
+            word: Optional[str], info: Optional[Dict[str, Any]]) -> None:
+        """ Add a row of the word table to the dictionary.
+        """
+        token = word_token.encode('utf-8')
+        if token < self.last_token:
+            raise ValueError('Rows of the word dictionary must be sorted by token.')
+        self.last_token = token
+
+        self.word_ids.append(-1 if word_id is None else word_id)
+        self.types.extend(wtype.encode('ascii'))
+        self._add_string(token)
+        self._add_string(word.encode('utf-8') if word else b'')
+        self._add_string(json.dumps(info).encode('utf-8') if info else b'')
+
+        if wtype == 'w':
+            self._add_partial(word_token, 1 if info is None else info.get('count', 1))
+
+    def write(self, filename: Path, data_version: Any) -> None:
+        """ Write the dictionary to the given file. 'data_version' is
+            the date of the data the dictionary was created from.
+            The file is replaced atomically.
+        """
+        version = data_version.isoformat().encode('utf-8') \
+            if isinstance(data_version, dt.datetime) else b''
+
+        self._close_prefixes(0)
+        self.completions.sort()
+        prefixes = array('q')
+        completions = array('q')
+        for prefix, best in self.completions:
+            prefixes.append(self.size)
+            self.strings.write(prefix)
+            self.size += len(prefix)
+            prefixes.append(self.size)
+            completions.extend(best + [-1] * (COMPLETION_TABLE_SIZE - len(best)))
+
+        tmpname = filename.with_name(filename.name + '.tmp')
+        with open(tmpname, 'wb') as fd:
+            fd.write(_HEADER.pack(MAGIC, FORMAT_VERSION, BYTE_ORDER_MARK,
+                                  len(self.word_ids), len(self.partials),
+                                  len(self.completions), len(version)))
+            fd.write(version + bytes(_padding(len(version))))
+            for section in (self.offsets, self.word_ids, self.partials, self.counts,
+                            prefixes, completions):
+                fd.write(section.tobytes())
+            fd.write(self.types + bytes(_padding(len(self.types))))
+            self.strings.seek(0)
+            while chunk := self.strings.read(1 << 20):
+                fd.write(chunk)
+
+        os.replace(tmpname, filename)
+        self.strings.close()
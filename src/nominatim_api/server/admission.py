@@ -0,0 +1,145 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of Nominatim. (https://nominatim.org)
+#
+# Copyright (C) 2026 by the Nominatim developer community.
+# For a full list of authors see the git log.
+"""
+Admission control for the ASGI servers.
+
+Requests to each endpoint are limited to a maximum number of requests
+processed concurrently. Excess requests wait in a bounded queue for
+a limited time. Requests that find the queue full or that time out
+while waiting are rejected immediately, so that they do not pile up
+in front of the database connection pool.
+"""
+from typing import Optional, Dict, Deque, List, Tuple
+from collections import deque
+import asyncio
+
+from ..config import Configuration
+from ..errors import UsageError
+
+
+class EndpointLimiter:
+    """ Limits the number of concurrently running requests for
+        a single endpoint.
+    """
+
+    def __init__(self, max_running: int, max_queued: int, max_wait: float) -> None:
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.max_wait = max_wait
+        self.running = 0
+        self.rejected = 0
+        self.waiters: Deque['asyncio.Future[None]'] = deque()
+
+    async def acquire(self) -> bool:
+        """ Wait for a free slot to process a request. Returns False,
+            when the request was not admitted. Every successful call
+            must be followed by a call to release().
+        """
+        if self.running < self.max_running and not self.waiters:
+            self.running += 1
+            return True
+
+        if len(self.waiters) >= self.max_queued:
+            self.rejected += 1
+            return False
+
+        fut = asyncio.get_running_loop().create_future()
+        self.waiters.append(fut)
+        try:
+            await asyncio.wait((fut, ), timeout=self.max_wait)
+        except asyncio.CancelledError:
+            if not self._withdraw(fut):
+                self.release()
+            raise
+
+        if self._withdraw(fut):
+            self.rejected += 1
+            return False
+
+        return True
+
+    def release(self) -> None:
+        """ Free the slot of a finished request. The slot is handed
+            directly to the next waiting request, if there is one.
+        """
+        if self.waiters:
+            self.waiters.popleft().set_result(None)
+        else:
+            self.running -= 1
+
+    def _withdraw(self, fut: 'asyncio.Future[None]') -> bool:
+        """ Remove a request from the queue, if it has not been
+            handed a slot yet. Returns True, if it was removed.
+        """
+        if fut in self.waiters:
+            self.waiters.remove(fut)
+            fut.cancel()
+            return True
+
+        return False
+
+
+class AdmissionController:
+    """ Collection of limiters for all endpoints of the API.
+    """
+
+    def __init__(self, limits: Dict[str, EndpointLimiter],
+                 default: Optional[EndpointLimiter] = None) -> None:
+        self.limits = limits
+        self.default = default
+
+    @classmethod
+    def from_config(cls, config: Configuration) -> Optional['AdmissionController']:
+        """ Create the admission controller from the settings in the
+            configuration. Returns None, when no limits are configured.
+        """
+        entries = config.get_str_list('API_ADMISSION_LIMITS')
+        if not entries:
+            return None
+
+        queue_size = config.get_int('API_ADMISSION_QUEUE_SIZE')
+        max_wait = config.get_int('API_ADMISSION_QUEUE_TIMEOUT') / 1000.0
+
+        limits: Dict[str, EndpointLimiter] = {}
+        for entry in entries:
+            parts = entry.split(':')
+            try:
+                if len(parts) not in (2, 3) or not parts[0]:
+                    raise ValueError()
+                max_running = int(parts[1])
+                max_queued = int(parts[2]) if len(parts) == 3 else queue_size
+                if max_running < 1 or max_queued < 0:
+                    raise ValueError()
+            except ValueError as exc:
+                raise UsageError(f"Invalid entry '{entry}' in NOMINATIM_API_ADMISSION_LIMITS. "
+                                 "Expected '<endpoint>:<max running>[:<max queued>]'.") from exc
+            limits[parts[0]] = EndpointLimiter(max_running, max_queued, max_wait)
+
+        return cls(limits, limits.pop('*', None))
+
+    def rejected(self) -> List[Tuple[str, int]]:
+        """ Return the number of rejected requests for each limit.
+            The default limit for all other endpoints is named '*'.
+        """
+        out = [(name, limiter.rejected) for name, limiter in self.limits.items()]
+        if self.default is not None:
+            out.append(('*', self.default.rejected))
+
+        return sorted(out)
+
+    def get(self, endpoint: str) -> Optional[EndpointLimiter]:
+        """ Return the limiter for the given endpoint or None, if
+            requests to the endpoint are not limited.
+
+            The default limit does not apply to the status endpoint,
+            so that health checks still get an answer while the server
+            is overloaded.
+        """
+        if endpoint == 'status':
+            return self.limits.get(endpoint)
+
+        return self.limits.get(endpoint, self.default)
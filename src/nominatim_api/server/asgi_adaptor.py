@@ -7,8 +7,11 @@
 """
 Base abstraction for implementing based on different ASGI frameworks.
 """
-from typing import Optional, Any, NoReturn, Callable
+from typing import Optional, Any, NoReturn, Callable, ContextManager, Iterable, \
+                   AsyncIterator
 import abc
+import asyncio
+import contextlib
 import math
 
 from ..config import Configuration
@@ -54,6 +57,18 @@ class ASGIAdaptor(abc.ABC):
             body of the response to 'output'.
         """
 
+    def create_stream_response(self, status: int, output: Iterable[str],
+                               num_results: int) -> Any:
+        """ Create a response like create_response() but with a body
+            that is sent in pieces. 'output' produces the pieces of the body
+            only when it is iterated over, so that the beginning of
+            the response can be sent while the rest is still being produced.
+
+            The default implementation collects the complete output
+            and returns the result of create_response().
+        """
+        return self.create_response(status, ''.join(output), num_results)
+
     @abc.abstractmethod
     def base_uri(self) -> str:
         """ Return the URI of the original request.
@@ -75,6 +90,20 @@ class ASGIAdaptor(abc.ABC):
             no statistics are required.
         """
 
+    def timer(self, stage: str) -> ContextManager[None]:
+        """ Return a context manager that adds the time spent in the
+            enclosed code block to the query statistics for the given
+            processing stage, if statistics are collected.
+        """
+        qs = self.query_stats()
+        return contextlib.nullcontext() if qs is None else qs.timer(stage)
+
+    async def get_body(self) -> bytes:
+        """ Return the raw body of the request. Returns an empty
+            byte string when the request has no body.
+        """
+        return b''
+
     def get_int(self, name: str, default: Optional[int] = None) -> int:
         """ Return an input parameter as an int. Raises an exception if
             the parameter is given but not in an integer format.
@@ -151,4 +180,28 @@ class ASGIAdaptor(abc.ABC):
                          status)
 
 
+async def encode_chunks(output: Iterable[str]) -> AsyncIterator[bytes]:
+    """ Convert the pieces of a streamed response body into
+        UTF-8 encoded chunks for the ASGI server.
+    """
+    for chunk in output:
+        if chunk:
+            yield chunk.encode('utf-8')
+
+
+def start_warm_up(api: NominatimAPIAsync) -> 'Optional[asyncio.Task[None]]':
+    """ Start the warm-up of the API object in the background, when
+        enabled in the configuration. Returns the task of the warm-up.
+    """
+    if not api.config.get_bool('API_WARM_UP'):
+        return None
+
+    task = asyncio.create_task(api.warm_up(api.config.get_path('API_WARM_UP_QUERIES')))
+    # Errors, like a database that is not available yet, are reported
+    # by the status endpoint and the first requests.
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    return task
+
+
 EndpointFunc = Callable[[NominatimAPIAsync, ASGIAdaptor], Any]
@@ -12,3 +12,4 @@ CONTENT_TEXT = 'text/plain; charset=utf-8'
 CONTENT_XML = 'text/xml; charset=utf-8'
 CONTENT_HTML = 'text/html; charset=utf-8'
 CONTENT_JSON = 'application/json; charset=utf-8'
+CONTENT_METRICS = 'text/plain; version=0.0.4; charset=utf-8'
@@ -9,7 +9,7 @@ Server implementation using the falcon webserver framework.
 """
 from __future__ import annotations
 
-from typing import Optional, Mapping, Any, List, cast
+from typing import Optional, Mapping, Any, List, Iterable, AsyncIterator, cast
 from pathlib import Path
 import asyncio
 import datetime as dt
@@ -22,7 +22,11 @@ from ...types import QueryStatistics
 from ... import v1 as api_impl
 from ...result_formatting import FormatDispatcher, load_format_dispatcher
 from ... import logging as loglib
-from ..asgi_adaptor import ASGIAdaptor, EndpointFunc
+from ..asgi_adaptor import ASGIAdaptor, EndpointFunc, encode_chunks, start_warm_up
+from ..content_types import CONTENT_METRICS, CONTENT_TEXT
+from ..metrics import MetricsCollector
+from ..admission import AdmissionController, EndpointLimiter
+from ..http_cache import HttpCacheControl
 
 
 class HTTPNominatimError(Exception):
@@ -80,6 +84,9 @@ class ParamWrapper(ASGIAdaptor):
     def get_header(self, name: str, default: Optional[str] = None) -> Optional[str]:
         return self.request.get_header(name, default=default)
 
+    async def get_body(self) -> bytes:
+        return await self.request.stream.read()
+
     def error(self, msg: str, status: int = 400) -> HTTPNominatimError:
         return HTTPNominatimError(msg, status, self.content_type)
 
@@ -89,6 +96,13 @@ class ParamWrapper(ASGIAdaptor):
         self.response.text = output
         self.response.content_type = self.content_type
 
+    def create_stream_response(self, status: int, output: Iterable[str],
+                               num_results: int) -> None:
+        self.response.context.num_results = num_results
+        self.response.status = status
+        self.response.stream = encode_chunks(output)
+        self.response.content_type = self.content_type
+
     def base_uri(self) -> str:
         return self.request.forwarded_prefix
 
@@ -119,6 +133,11 @@ class EndpointWrapper:
         await self.func(self.api, ParamWrapper(req, resp, self.api.config,
                                                self.formatter))
 
+    async def on_post_body(self, req: Request, resp: Response) -> None:
+        """ Implementation of the endpoints that expect a POST request.
+        """
+        await self.on_get(req, resp)
+
 
 class FileLoggingMiddleware:
     """ Middleware to log selected requests into a file.
@@ -157,6 +176,155 @@ class FileLoggingMiddleware:
         self.fd.write(self.logstr.format_map(qs))
 
 
+class _ReleasingStream:
+    """ Wrapper for a streamed response body which frees the admission
+        slot of the request, when falcon closes the stream after sending.
+    """
+
+    def __init__(self, stream: AsyncIterator[bytes], limiter: EndpointLimiter) -> None:
+        self.stream = stream
+        self.limiter: Optional[EndpointLimiter] = limiter
+
+    def __aiter__(self) -> '_ReleasingStream':
+        return self
+
+    async def __anext__(self) -> bytes:
+        return await self.stream.__anext__()
+
+    async def close(self) -> None:
+        """ Free the admission slot. Called by falcon when the body has
+            been sent or sending has failed.
+        """
+        if self.limiter is not None:
+            self.limiter.release()
+            self.limiter = None
+
+
+class AdmissionMiddleware:
+    """ Middleware to limit the number of requests processed concurrently.
+    """
+
+    def __init__(self, controller: AdmissionController) -> None:
+        self.controller = controller
+
+    async def process_resource(self, req: Request, resp: Response,
+                               resource: Any, _: Any) -> None:
+        """ Callback before the request is handed to the endpoint,
+            which waits for the request to be admitted.
+        """
+        if not isinstance(resource, EndpointWrapper):
+            return
+
+        limiter = self.controller.get(resource.name)
+        if limiter is None:
+            return
+
+        if not await limiter.acquire():
+            resp.set_header('Retry-After', '1')
+            raise HTTPNominatimError('Server is overloaded. Please try again later.',
+                                     503, CONTENT_TEXT)
+
+        req.context.admission = limiter
+
+    async def process_response(self, req: Request, resp: Response,
+                               resource: Any, req_succeeded: bool) -> None:
+        """ Callback after requests which frees the slot of the request.
+            For streamed responses, the slot is only freed once the
+            body has been sent.
+        """
+        limiter = getattr(req.context, 'admission', None)
+        if limiter is not None:
+            req.context.admission = None
+            if resp.stream is not None:
+                resp.stream = _ReleasingStream(cast(AsyncIterator[bytes], resp.stream),
+                                               limiter)
+            else:
+                limiter.release()
+
+
+class HttpCacheMiddleware:
+    """ Middleware to add HTTP caching headers to API responses and
+        to answer conditional requests.
+    """
+
+    def __init__(self, control: HttpCacheControl, api: NominatimAPIAsync) -> None:
+        self.control = control
+        self.api = api
+
+    async def process_resource(self, req: Request, resp: Response,
+                               resource: Any, _: Any) -> None:
+        """ Callback before the request is handed to the endpoint,
+            which ends the request early, when the client already
+            has the current response.
+        """
+        if not isinstance(resource, EndpointWrapper) or req.method != 'GET':
+            return
+
+        validators = self.control.validators(self.api, resource.name,
+                                             req.scope['query_string'],
+                                             req.get_header('Accept-Language'))
+        if validators is None:
+            return
+
+        req.context.cache_validators = validators
+
+        if validators.is_not_modified(req.get_header('If-None-Match'),
+                                      req.get_header('If-Modified-Since')):
+            resp.status = 304
+            resp.complete = True
+
+    async def process_response(self, req: Request, resp: Response,
+                               resource: Any, req_succeeded: bool) -> None:
+        """ Callback after requests which adds the caching headers
+            to successful responses.
+        """
+        validators = getattr(req.context, 'cache_validators', None)
+        if validators is not None and req_succeeded and resp.status in (200, 304):
+            resp.set_headers(validators.headers())
+
+
+class MetricsMiddleware:
+    """ Middleware to collect latency metrics for all API requests.
+    """
+
+    def __init__(self, collector: MetricsCollector) -> None:
+        self.collector = collector
+
+    async def process_request(self, req: Request, _: Response) -> None:
+        """ Callback before the request starts timing.
+        """
+        req.context.query_stats = QueryStatistics()
+
+    async def process_response(self, req: Request, resp: Response,
+                               resource: Optional[EndpointWrapper],
+                               req_succeeded: bool) -> None:
+        """ Callback after requests which adds the timings of
+            successful API requests to the metrics.
+        """
+        qs = getattr(req.context, 'query_stats', None)
+
+        if qs is None or 'start' not in qs or resource is None:
+            return
+
+        self.collector.count_cancelled(resource.name, qs)
+        if req_succeeded and resp.status == 200:
+            self.collector.observe(resource.name, qs)
+
+
+class MetricsResource:
+    """ Falcon request handler for the /metrics endpoint.
+    """
+
+    def __init__(self, collector: MetricsCollector) -> None:
+        self.collector = collector
+
+    async def on_get(self, req: Request, resp: Response) -> None:
+        """ Return the collected metrics.
+        """
+        resp.text = self.collector.render()
+        resp.content_type = CONTENT_METRICS
+
+
 class APIMiddleware:
     """ Middleware managing the Nominatim database connection.
     """
@@ -164,6 +332,7 @@ class APIMiddleware:
     def __init__(self, project_dir: Path, environ: Optional[Mapping[str, str]]) -> None:
         self.api = NominatimAPIAsync(project_dir, environ)
         self.app: Optional[App[Request, Response]] = None
+        self.warm_up: Optional[asyncio.Task[None]] = None
 
     @property
     def config(self) -> Configuration:
@@ -188,13 +357,18 @@ class APIMiddleware:
             # so it can replace wrapper.func dynamically
             if hasattr(func, 'set_wrapper'):
                 func.set_wrapper(endpoint)
-            self.app.add_route(f"/{name}", endpoint)
+            suffix = 'body' if name in api_impl.POST_ROUTES else None
+            self.app.add_route(f"/{name}", endpoint, suffix=suffix)
             if legacy_urls:
-                self.app.add_route(f"/{name}.php", endpoint)
+                self.app.add_route(f"/{name}.php", endpoint, suffix=suffix)
+
+        self.warm_up = start_warm_up(self.api)
 
     async def process_shutdown(self, *_: Any) -> None:
         """Process the ASGI lifespan shutdown event.
         """
+        if self.warm_up is not None:
+            self.warm_up.cancel()
         await self.api.close()
 
 
@@ -205,6 +379,16 @@ def get_application(project_dir: Path,
     apimw = APIMiddleware(project_dir, environ)
 
     middleware: List[Any] = [apimw]
+    http_cache = HttpCacheControl.from_config(apimw.config)
+    if http_cache is not None:
+        middleware.append(HttpCacheMiddleware(http_cache, apimw.api))
+    admission = AdmissionController.from_config(apimw.config)
+    if admission is not None:
+        middleware.append(AdmissionMiddleware(admission))
+    metrics = None
+    if apimw.config.get_bool('API_METRICS'):
+        metrics = MetricsCollector(admission)
+        middleware.append(MetricsMiddleware(metrics))
     log_file = apimw.config.LOG_FILE
     if log_file:
         middleware.append(FileLoggingMiddleware(log_file, apimw.config.LOG_FORMAT))
@@ -212,6 +396,9 @@ def get_application(project_dir: Path,
     app = App(cors_enable=apimw.config.get_bool('CORS_NOACCESSCONTROL'),
               middleware=middleware)
 
+    if metrics is not None:
+        app.add_route('/metrics', MetricsResource(metrics))
+
     apimw.set_app(app)
     app.add_error_handler(HTTPNominatimError, nominatim_error_handler)
     app.add_error_handler(TimeoutError, timeout_error_handler)
@@ -0,0 +1,142 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of Nominatim. (https://nominatim.org)
+#
+# Copyright (C) 2026 by the Nominatim developer community.
+# For a full list of authors see the git log.
+"""
+HTTP caching support for the ASGI servers.
+
+Responses of the API only change when the data in the database changes.
+The validators for conditional requests are therefore derived from the
+date of the last import or update: the Last-Modified header is the date
+itself and the ETag is a hash over the date and the request parameters.
+Conditional requests with matching validators are answered with
+'304 Not Modified' before any work is done for the request.
+"""
+from typing import Optional, Dict
+from email.utils import format_datetime, parsedate_to_datetime
+from urllib.parse import parse_qsl
+import datetime as dt
+import hashlib
+
+from ..config import Configuration
+from ..core import NominatimAPIAsync
+from ..errors import UsageError
+
+# Endpoints that always need to report the current state of the server.
+UNCACHED_ENDPOINTS = ('status', 'metrics')
+
+
+class CacheValidators:
+    """ ETag and Last-Modified date for the response to a request.
+    """
+
+    def __init__(self, etag: str, last_modified: dt.datetime, max_age: int) -> None:
+        self.etag = etag
+        self.last_modified = last_modified.astimezone(dt.timezone.utc).replace(microsecond=0)
+        self.max_age = max_age
+
+    def is_not_modified(self, if_none_match: Optional[str],
+                        if_modified_since: Optional[str]) -> bool:
+        """ Check if the client already has the current response, given
+            the values of the If-None-Match and If-Modified-Since headers
+            of the request. If-Modified-Since is ignored, when the
+            request has an If-None-Match header.
+        """
+        if if_none_match is not None:
+            for tag in if_none_match.split(','):
+                tag = tag.strip()
+                if tag == '*' or tag.removeprefix('W/') == self.etag:
+                    return True
+            return False
+
+        if if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=dt.timezone.utc)
+            return self.last_modified <= since
+
+        return False
+
+    def headers(self) -> Dict[str, str]:
+        """ Return the caching headers to add to the response.
+        """
+        return {'ETag': self.etag,
+                'Last-Modified': format_datetime(self.last_modified, usegmt=True),
+                'Cache-Control': f'public, max-age={self.max_age}',
+                'Vary': 'Accept-Language'}
+
+
+class HttpCacheControl:
+    """ Configuration of HTTP caching for the endpoints of the API.
+    """
+
+    def __init__(self, max_ages: Dict[str, int], default: Optional[int] = None) -> None:
+        self.max_ages = max_ages
+        self.default = default
+
+    @classmethod
+    def from_config(cls, config: Configuration) -> Optional['HttpCacheControl']:
+        """ Create the cache control from the settings in the
+            configuration. Returns None, when HTTP caching is disabled.
+        """
+        entries = config.get_str_list('API_HTTP_CACHE_MAX_AGE')
+        if not entries:
+            return None
+
+        max_ages: Dict[str, int] = {}
+        for entry in entries:
+            parts = entry.split(':')
+            try:
+                if len(parts) != 2 or not parts[0]:
+                    raise ValueError()
+                max_age = int(parts[1])
+                if max_age < 0:
+                    raise ValueError()
+            except ValueError as exc:
+                raise UsageError(f"Invalid entry '{entry}' in NOMINATIM_API_HTTP_CACHE_MAX_AGE. "
+                                 "Expected '<endpoint>:<max age>'.") from exc
+            max_ages[parts[0]] = max_age
+
+        return cls(max_ages, max_ages.pop('*', None))
+
+    def get(self, endpoint: str) -> Optional[int]:
+        """ Return the maximum age in seconds for responses of the given
+            endpoint or None, if the responses should not be cached.
+        """
+        if endpoint in UNCACHED_ENDPOINTS:
+            return None
+
+        return self.max_ages.get(endpoint, self.default)
+
+    def validators(self, api: NominatimAPIAsync, endpoint: str, query_string: bytes,
+                   accept_language: Optional[str]) -> Optional[CacheValidators]:
+        """ Compute the validators for a GET request to the given endpoint.
+            Returns None, when responses of the endpoint are not cached
+            or the import date is not known.
+
+            The function never waits for the database. It uses the import
+            date last read by the API, which is refreshed in the background
+            every API_CACHE_CHECK_INTERVAL seconds.
+        """
+        max_age = self.get(endpoint)
+        if max_age is None:
+            return None
+
+        data_version = api.peek_data_version()
+
+        if not isinstance(data_version, dt.datetime):
+            return None
+        if data_version.tzinfo is None:
+            data_version = data_version.replace(tzinfo=dt.timezone.utc)
+
+        params = sorted(parse_qsl(query_string.decode('latin-1'), keep_blank_values=True))
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(data_version.isoformat().encode('utf-8'))
+        digest.update(repr((endpoint, params, accept_language)).encode('utf-8'))
+
+        return CacheValidators(f'"{digest.hexdigest()}"', data_version, max_age)
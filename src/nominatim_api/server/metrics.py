@@ -0,0 +1,110 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of Nominatim. (https://nominatim.org)
+#
+# Copyright (C) 2026 by the Nominatim developer community.
+# For a full list of authors see the git log.
+"""
+Collection of request latency metrics for the ASGI servers.
+"""
+from typing import Dict, List, Mapping, Any, Tuple, Optional
+
+from .admission import AdmissionController
+
+# Upper bounds of the histogram buckets in seconds.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Processing stages recorded in the query statistics as 'time_<stage>'.
+STAGES = ('preprocess', 'normalize', 'transliterate', 'word_lookup', 'token_assignment',
+          'search', 'result_details', 'localize', 'format')
+
+
+class Histogram:
+    """ Cumulative histogram of observed durations.
+    """
+
+    def __init__(self) -> None:
+        self.counts: List[int] = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """ Add a new observation to the histogram.
+        """
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsCollector:
+    """ Aggregates the query statistics of requests into latency
+        histograms per endpoint and processing stage.
+    """
+
+    def __init__(self, admission: Optional[AdmissionController] = None) -> None:
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.cancelled: Dict[str, int] = {}
+        self.admission = admission
+
+    def _observe(self, endpoint: str, stage: str, value: float) -> None:
+        hist = self.histograms.get((endpoint, stage))
+        if hist is None:
+            hist = self.histograms[(endpoint, stage)] = Histogram()
+        hist.observe(value)
+
+    def observe(self, endpoint: str, stats: Mapping[str, Any]) -> None:
+        """ Record the timings of a finished request to the given endpoint.
+            The total request time and the time waiting for a database
+            connection are always recorded, the processing stages only
+            when the request went through them.
+        """
+        for stage, key in (('total', 'total_time'), ('wait', 'wait_time')):
+            value = stats.get(key)
+            if isinstance(value, float):
+                self._observe(endpoint, stage, value)
+
+        for stage in STAGES:
+            value = stats.get(f'time_{stage}')
+            if isinstance(value, float):
+                self._observe(endpoint, stage, value)
+
+    def count_cancelled(self, endpoint: str, stats: Mapping[str, Any]) -> None:
+        """ Record the number of database statements that were cancelled
+            because a request to the given endpoint ran out of time.
+            This needs to be called for failed requests as well.
+        """
+        value = stats.get('cancelled_statements')
+        if isinstance(value, int) and value > 0:
+            self.cancelled[endpoint] = self.cancelled.get(endpoint, 0) + value
+
+    def render(self) -> str:
+        """ Return the collected metrics in the Prometheus text format.
+        """
+        name = 'nominatim_request_duration_seconds'
+        lines = [f'# HELP {name} Time spent processing requests by endpoint and stage.',
+                 f'# TYPE {name} histogram']
+
+        for (endpoint, stage), hist in sorted(self.histograms.items()):
+            labels = f'endpoint="{endpoint}",stage="{stage}"'
+            for bound, count in zip(BUCKETS, hist.counts):
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist.count}')
+            lines.append(f'{name}_sum{{{labels}}} {hist.total}')
+            lines.append(f'{name}_count{{{labels}}} {hist.count}')
+
+        name = 'nominatim_cancelled_statements_total'
+        lines.extend((f'# HELP {name} Database statements cancelled because of timeouts.',
+                      f'# TYPE {name} counter'))
+        for endpoint, count in sorted(self.cancelled.items()):
+            lines.append(f'{name}{{endpoint="{endpoint}"}} {count}')
+
+        if self.admission is not None:
+            name = 'nominatim_admission_rejected_total'
+            lines.extend((f'# HELP {name} Requests rejected by the admission control.',
+                          f'# TYPE {name} counter'))
+            for endpoint, count in self.admission.rejected():
+                lines.append(f'{name}{{endpoint="{endpoint}"}} {count}')
+
+        return '\n'.join(lines) + '\n'
@@ -8,7 +8,7 @@
 Server implementation using the starlette webserver framework.
 """
 from typing import Any, Optional, Mapping, Callable, cast, Coroutine, Dict, \
-                   Awaitable, AsyncIterator
+                   Awaitable, AsyncIterator, Iterable
 from pathlib import Path
 import asyncio
 import contextlib
@@ -17,18 +17,24 @@ import datetime as dt
 from starlette.applications import Starlette
 from starlette.routing import Route
 from starlette.exceptions import HTTPException
-from starlette.responses import Response, PlainTextResponse, HTMLResponse
+from starlette.responses import Response, PlainTextResponse, HTMLResponse, \
+                                StreamingResponse
 from starlette.requests import Request
 from starlette.middleware import Middleware
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp, Scope, Receive, Send
 
 from ...config import Configuration
 from ...core import NominatimAPIAsync
 from ...types import QueryStatistics
 from ... import v1 as api_impl
 from ...result_formatting import FormatDispatcher, load_format_dispatcher
-from ..asgi_adaptor import ASGIAdaptor, EndpointFunc
+from ..asgi_adaptor import ASGIAdaptor, EndpointFunc, encode_chunks, start_warm_up
+from ..content_types import CONTENT_METRICS
+from ..metrics import MetricsCollector
+from ..admission import AdmissionController
+from ..http_cache import HttpCacheControl
 from ... import logging as loglib
 
 
@@ -45,6 +51,9 @@ class ParamWrapper(ASGIAdaptor):
     def get_header(self, name: str, default: Optional[str] = None) -> Optional[str]:
         return self.request.headers.get(name, default)
 
+    async def get_body(self) -> bytes:
+        return await self.request.body()
+
     def error(self, msg: str, status: int = 400) -> HTTPException:
         return HTTPException(status, detail=msg,
                              headers={'content-type': self.content_type})
@@ -53,6 +62,12 @@ class ParamWrapper(ASGIAdaptor):
         setattr(self.request.state, 'num_results', num_results)
         return Response(output, status_code=status, media_type=self.content_type)
 
+    def create_stream_response(self, status: int, output: Iterable[str],
+                               num_results: int) -> Response:
+        setattr(self.request.state, 'num_results', num_results)
+        return StreamingResponse(encode_chunks(output), status_code=status,
+                                 media_type=self.content_type)
+
     def base_uri(self) -> str:
         scheme = self.request.url.scheme
         host = self.request.url.hostname
@@ -120,6 +135,120 @@ class FileLoggingMiddleware(BaseHTTPMiddleware):
         return response
 
 
+class AdmissionMiddleware:
+    """ Middleware to limit the number of requests processed concurrently.
+
+        This is a plain ASGI middleware, so that the slot of a request is
+        only freed once the response has been sent completely, including
+        a streamed body.
+
+        Only requests to the API endpoints are limited. 'endpoints' maps
+        the paths of the API routes to the name of their endpoint. It is
+        filled once the routes are set up.
+    """
+
+    def __init__(self, app: ASGIApp, controller: Optional[AdmissionController] = None,
+                 endpoints: Optional[Dict[str, str]] = None):
+        assert controller is not None
+        self.app = app
+        self.controller = controller
+        self.endpoints = {} if endpoints is None else endpoints
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        endpoint = self.endpoints.get(scope['path'])
+        limiter = None if endpoint is None else self.controller.get(endpoint)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limiter.acquire():
+            response = PlainTextResponse('Server is overloaded. Please try again later.',
+                                         status_code=503, headers={'Retry-After': '1'})
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+
+class HttpCacheMiddleware(BaseHTTPMiddleware):
+    """ Middleware to add HTTP caching headers to API responses and
+        to answer conditional requests.
+    """
+
+    def __init__(self, app: Starlette, control: Optional[HttpCacheControl] = None):
+        super().__init__(app)
+        assert control is not None
+        self.control = control
+
+    async def dispatch(self, request: Request,
+                       call_next: RequestResponseEndpoint) -> Response:
+        endpoint = request.url.path.lstrip('/').split('/', 1)[0]
+        if endpoint.endswith('.php'):
+            endpoint = endpoint[:-4]
+
+        if request.method != 'GET':
+            return await call_next(request)
+
+        validators = self.control.validators(request.app.state.API, endpoint,
+                                             request.scope['query_string'],
+                                             request.headers.get('accept-language'))
+        if validators is None:
+            return await call_next(request)
+
+        if validators.is_not_modified(request.headers.get('if-none-match'),
+                                      request.headers.get('if-modified-since')):
+            return Response(status_code=304, headers=validators.headers())
+
+        response = await call_next(request)
+        if response.status_code == 200:
+            response.headers.update(validators.headers())
+
+        return response
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    """ Middleware to collect latency metrics for all API requests.
+    """
+
+    def __init__(self, app: Starlette, collector: Optional[MetricsCollector] = None):
+        super().__init__(app)
+        self.collector = collector or MetricsCollector()
+
+    async def dispatch(self, request: Request,
+                       call_next: RequestResponseEndpoint) -> Response:
+        setattr(request.state, 'query_stats', QueryStatistics())
+        response = await call_next(request)
+
+        # The statistics object may have been replaced by inner middleware.
+        qs = getattr(request.state, 'query_stats', None)
+        if qs is None or 'start' not in qs:
+            return response
+
+        endpoint = request.url.path.lstrip('/').split('/', 1)[0]
+        if endpoint.endswith('.php'):
+            endpoint = endpoint[:-4]
+        self.collector.count_cancelled(endpoint, qs)
+        if response.status_code == 200:
+            self.collector.observe(endpoint, qs)
+
+        return response
+
+
+def _metrics_endpoint(collector: MetricsCollector)\
+        -> Callable[[Request], Coroutine[Any, Any, Response]]:
+    async def _callback(_: Request) -> Response:
+        return Response(collector.render(), media_type=CONTENT_METRICS)
+
+    return _callback
+
+
 async def timeout_error(request: Request,
                         _: Exception) -> Response:
     """ Error handler for query timeouts.
@@ -142,11 +271,28 @@ def get_application(project_dir: Path,
 
     middleware = []
     if config.get_bool('CORS_NOACCESSCONTROL'):
+        # The batch search endpoint receives its queries per POST.
         middleware.append(Middleware(CORSMiddleware,
                                      allow_origins=['*'],
-                                     allow_methods=['GET', 'OPTIONS'],
+                                     allow_methods=['GET', 'POST', 'OPTIONS'],
                                      max_age=86400))
 
+    http_cache = HttpCacheControl.from_config(config)
+    if http_cache is not None:
+        middleware.append(Middleware(HttpCacheMiddleware, control=http_cache))  # type: ignore
+
+    api_endpoints: Dict[str, str] = {}
+    admission = AdmissionController.from_config(config)
+    if admission is not None:
+        middleware.append(Middleware(AdmissionMiddleware, controller=admission,
+                                     endpoints=api_endpoints))
+
+    routes = []
+    if config.get_bool('API_METRICS'):
+        metrics = MetricsCollector(admission)
+        middleware.append(Middleware(MetricsMiddleware, collector=metrics))  # type: ignore
+        routes.append(Route('/metrics', endpoint=_metrics_endpoint(metrics)))
+
     log_file = config.LOG_FILE
     if log_file:
         middleware.append(Middleware(FileLoggingMiddleware, file_name=log_file,  # type: ignore
@@ -165,15 +311,22 @@ def get_application(project_dir: Path,
         legacy_urls = config.get_bool('SERVE_LEGACY_URLS')
         for name, func in await api_impl.get_routes(app.state.API):
             endpoint = _wrap_endpoint(func)
-            app.routes.append(Route(f"/{name}", endpoint=endpoint))
+            methods = ['POST'] if name in api_impl.POST_ROUTES else ['GET']
+            app.routes.append(Route(f"/{name}", endpoint=endpoint, methods=methods))
+            api_endpoints[f"/{name}"] = name
             if legacy_urls:
-                app.routes.append(Route(f"/{name}.php", endpoint=endpoint))
+                app.routes.append(Route(f"/{name}.php", endpoint=endpoint, methods=methods))
+                api_endpoints[f"/{name}.php"] = name
+
+        warm_up = start_warm_up(app.state.API)
 
         yield
 
+        if warm_up is not None:
+            warm_up.cancel()
         await app.state.API.close()
 
-    app = Starlette(debug=debug, middleware=middleware,
+    app = Starlette(debug=debug, routes=routes, middleware=middleware,
                     exception_handlers=exceptions,
                     lifespan=lifespan)
 
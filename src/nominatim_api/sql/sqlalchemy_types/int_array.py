@@ -7,31 +7,36 @@
 """
 Custom type for an array of integers.
 """
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Union
 
 import sqlalchemy as sa
 from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.dialects.postgresql import ARRAY
 
 from ...typing import SaDialect, SaColumn
+from ..sqlite_functions import decode_int_array
 
 
 class IntList(sa.types.TypeDecorator[Any]):
     """ A list of integers saved as a text of comma-separated numbers.
+
+        Values that are already binary-encoded with encode_int_array()
+        are saved unchanged. Both formats are decoded when reading.
     """
     impl = sa.types.Unicode
     cache_ok = True
 
-    def process_bind_param(self, value: Optional[Any], dialect: 'sa.Dialect') -> Optional[str]:
-        if value is None:
-            return None
+    def process_bind_param(self, value: Optional[Any],
+                           dialect: 'sa.Dialect') -> Optional[Union[str, bytes]]:
+        if value is None or isinstance(value, bytes):
+            return value
 
         assert isinstance(value, list)
         return ','.join(map(str, value))
 
     def process_result_value(self, value: Optional[Any],
                              dialect: SaDialect) -> Optional[List[int]]:
-        return [int(v) for v in value.split(',')] if value is not None else None
+        return list(decode_int_array(value)) if value is not None else None
 
 
 class IntArray(sa.types.TypeDecorator[Any]):
@@ -91,6 +96,11 @@ def generic_array_contains(element: ArrayContains, compiler: 'sa.Compiled', **kw
 
 @compiles(ArrayContains, 'sqlite')
 def sqlite_array_contains(element: ArrayContains, compiler: 'sa.Compiled', **kw: Any) -> str:
+    arg1, arg2 = list(element.clauses)
+    if isinstance(arg1, ArrayCat):
+        # Avoid creating the concatenated array.
+        return "array_pair_contains(%s, %s)" % (compiler.process(arg1.clauses, **kw),
+                                                compiler.process(arg2, **kw))
     return "array_contains(%s)" % compiler.process(element.clauses, **kw)
 
 
@@ -105,9 +115,3 @@ class ArrayCat(sa.sql.expression.FunctionElement[Any]):
 @compiles(ArrayCat)
 def generic_array_cat(element: ArrayCat, compiler: 'sa.Compiled', **kw: Any) -> str:
     return "array_cat(%s)" % compiler.process(element.clauses, **kw)
-
-
-@compiles(ArrayCat, 'sqlite')
-def sqlite_array_cat(element: ArrayCat, compiler: 'sa.Compiled', **kw: Any) -> str:
-    arg1, arg2 = list(element.clauses)
-    return "(%s || ',' || %s)" % (compiler.process(arg1, **kw), compiler.process(arg2, **kw))
@@ -2,48 +2,128 @@
 #
 # This file is part of Nominatim. (https://nominatim.org)
 #
-# Copyright (C) 2024 by the Nominatim developer community.
+# Copyright (C) 2026 by the Nominatim developer community.
 # For a full list of authors see the git log.
 """
 Custom functions for SQLite.
+
+Integer arrays are either saved as a text of comma-separated numbers
+or in the binary encoding created by encode_int_array(). All functions
+accept both formats. Arrays that are returned for further processing
+in SQL are always comma-separated lists.
 """
-from typing import cast, Optional, Set, Any
+from typing import Optional, Set, Any, Union, Iterable, Tuple, FrozenSet, Sequence
+from array import array
+from bisect import bisect_left
+import functools
 import json
+import sys
+
+IntArrayValue = Union[str, bytes]
+
+# Format markers of the binary encoding. The marker is followed by
+# the array elements as little-endian integers of the given size.
+_BINARY_INT32 = b'\x04'
+_BINARY_INT64 = b'\x08'
+
+
+def encode_int_array(values: Iterable[int]) -> bytes:
+    """ Create the binary encoding of an integer array. The elements
+        are sorted, so that the array can be searched with bisection.
+    """
+    arr = array('q', sorted(values))
+    if not arr or (-2**31 <= arr[0] and arr[-1] < 2**31):
+        arr = array('i', arr)
+        marker = _BINARY_INT32
+    else:
+        marker = _BINARY_INT64
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    return marker + arr.tobytes()
+
+
+def decode_int_array(value: IntArrayValue) -> Sequence[int]:
+    """ Return the elements of an integer array in either encoding.
+    """
+    if isinstance(value, str):
+        return [int(x) for x in value.split(',')] if value else []
+
+    if not value:
+        return []
+
+    arr = array('i' if value[:1] == _BINARY_INT32 else 'q')
+    arr.frombytes(value[1:])
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    return arr
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_constant_array(value: IntArrayValue) -> FrozenSet[int]:
+    """ Parse an array that is the same for every row of a query,
+        like the list of search tokens.
+    """
+    return frozenset(decode_int_array(value))
 
 
-def weigh_search(search_vector: Optional[str], rankings: str, default: float) -> float:
+@functools.lru_cache(maxsize=256)
+def _parse_rankings(rankings: str) -> Tuple[Tuple[float, FrozenSet[int]], ...]:
+    return tuple((rank[0], frozenset(rank[1])) for rank in json.loads(rankings))
+
+
+def weigh_search(search_vector: Optional[IntArrayValue], rankings: str, default: float) -> float:
     """ Custom weight function for search results.
     """
     if search_vector is not None:
-        svec = [int(x) for x in search_vector.split(',')]
-        for rank in json.loads(rankings):
-            if all(r in svec for r in rank[1]):
-                return cast(float, rank[0])
+        svec = set(decode_int_array(search_vector))
+        for penalty, tokens in _parse_rankings(rankings):
+            if tokens <= svec:
+                return penalty
 
     return default
 
 
+def _sorted_intersection(values: Set[int], sorted_array: Sequence[int]) -> Set[int]:
+    """ Return the elements of 'values' that are in the sorted array.
+        Uses bisection, which is faster than building a set over the
+        array when the set of values is comparatively small.
+    """
+    result = set()
+    size = len(sorted_array)
+    for value in values:
+        pos = bisect_left(sorted_array, value)
+        if pos < size and sorted_array[pos] == value:
+            result.add(value)
+    return result
+
+
 class ArrayIntersectFuzzy:
     """ Compute the array of common elements of all input integer arrays.
         Very large input parameters may be ignored to speed up
         computation. Therefore, the result is a superset of common elements.
 
-        Input and output arrays are given as comma-separated lists.
+        Input arrays must be sorted. They should be ordered by size,
+        smallest first. The output array is a comma-separated list.
     """
     def __init__(self) -> None:
-        self.first = ''
+        self.first: Optional[IntArrayValue] = None
         self.values: Optional[Set[int]] = None
 
-    def step(self, value: Optional[str]) -> None:
+    def step(self, value: Optional[IntArrayValue]) -> None:
         """ Add the next array to the intersection.
         """
         if value is not None:
-            if not self.first:
+            if self.first is None:
                 self.first = value
             elif len(value) < 10000000:
                 if self.values is None:
-                    self.values = {int(x) for x in self.first.split(',')}
-                self.values.intersection_update((int(x) for x in value.split(',')))
+                    self.values = set(decode_int_array(self.first))
+                if self.values:
+                    other = decode_int_array(value)
+                    if len(self.values) * 20 < len(other):
+                        self.values = _sorted_intersection(self.values, other)
+                    else:
+                        self.values.intersection_update(other)
 
     def finalize(self) -> str:
         """ Return the final result.
@@ -51,52 +131,73 @@ class ArrayIntersectFuzzy:
         if self.values is not None:
             return ','.join(map(str, self.values))
 
-        return self.first
+        if isinstance(self.first, bytes):
+            return ','.join(map(str, decode_int_array(self.first)))
+
+        return self.first or ''
 
 
 class ArrayUnion:
     """ Compute the set of all elements of the input integer arrays.
 
-        Input and output arrays are given as strings of comma-separated lists.
+        The output array is a comma-separated list.
     """
     def __init__(self) -> None:
-        self.values: Optional[Set[str]] = None
+        self.values: Optional[Set[int]] = None
 
-    def step(self, value: Optional[str]) -> None:
+    def step(self, value: Optional[IntArrayValue]) -> None:
         """ Add the next array to the union.
         """
         if value is not None:
             if self.values is None:
-                self.values = set(value.split(','))
+                self.values = set(decode_int_array(value))
             else:
-                self.values.update(value.split(','))
+                self.values.update(decode_int_array(value))
 
     def finalize(self) -> str:
         """ Return the final result.
         """
-        return '' if self.values is None else ','.join(self.values)
+        return '' if self.values is None else ','.join(map(str, self.values))
 
 
-def array_contains(container: Optional[str], containee: Optional[str]) -> Optional[bool]:
+def array_contains(container: Optional[IntArrayValue],
+                   containee: Optional[IntArrayValue]) -> Optional[bool]:
     """ Is the array 'containee' completely contained in array 'container'.
     """
     if container is None or containee is None:
         return None
 
-    vset = container.split(',')
-    return all(v in vset for v in containee.split(','))
+    return _parse_constant_array(containee).issubset(decode_int_array(container))
 
 
-def array_pair_contains(container1: Optional[str], container2: Optional[str],
-                        containee: Optional[str]) -> Optional[bool]:
+def array_pair_contains(container1: Optional[IntArrayValue],
+                        container2: Optional[IntArrayValue],
+                        containee: Optional[IntArrayValue]) -> Optional[bool]:
     """ Is the array 'containee' completely contained in the union of
         array 'container1' and array 'container2'.
     """
     if container1 is None or container2 is None or containee is None:
         return None
 
-    vset = container1.split(',') + container2.split(',')
-    return all(v in vset for v in containee.split(','))
+    vset = set(decode_int_array(container1))
+    vset.update(decode_int_array(container2))
+    return _parse_constant_array(containee).issubset(vset)
+
+
+def array_cat(array1: Optional[IntArrayValue],
+              array2: Optional[IntArrayValue]) -> Optional[str]:
+    """ Concatenate the two arrays. If one of them is null, the other
+        one is returned.
+    """
+    if array1 is None:
+        array1, array2 = array2, None
+    if array1 is None:
+        return None
+
+    values = list(decode_int_array(array1))
+    if array2 is not None:
+        values.extend(decode_int_array(array2))
+    return ','.join(map(str, values))
 
 
 def install_custom_functions(conn: Any) -> None:
@@ -106,6 +207,7 @@ def install_custom_functions(conn: Any) -> None:
     conn.create_function('weigh_search', 3, weigh_search, deterministic=True)
     conn.create_function('array_contains', 2, array_contains, deterministic=True)
     conn.create_function('array_pair_contains', 3, array_pair_contains, deterministic=True)
+    conn.create_function('array_cat', 2, array_cat, deterministic=True)
     _create_aggregate(conn, 'array_intersect_fuzzy', 1, ArrayIntersectFuzzy)
     _create_aggregate(conn, 'array_union', 1, ArrayUnion)
 
@@ -22,3 +22,12 @@ class Timeout:
         """ Check if the timeout has already passed.
         """
         return (self.abs is not None) and (asyncio.get_running_loop().time() >= self.abs)
+
+    def remaining(self) -> Optional[float]:
+        """ Return the time in seconds that is left until the timeout
+            is reached or None, if there is no timeout.
+        """
+        if self.abs is None:
+            return None
+
+        return max(0.0, self.abs - asyncio.get_running_loop().time())
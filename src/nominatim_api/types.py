@@ -8,13 +8,16 @@
 Complex datatypes used by the Nominatim API.
 """
 from typing import Optional, Union, Tuple, NamedTuple, TypeVar, Type, Dict, \
-                   Any, List, Sequence, TYPE_CHECKING
+                   Any, List, Sequence, Iterator, ContextManager, TYPE_CHECKING
 from collections import abc
+from contextvars import ContextVar, Token
+import contextlib
 import dataclasses
 import datetime as dt
 import enum
 import math
 import re
+import time
 from struct import unpack
 from binascii import unhexlify
 
@@ -407,13 +410,22 @@ class DataLayer(enum.Flag):
 
 class QueryStatistics(dict[str, Any]):
     """ A specialised dictionary for collecting query statistics.
+
+        While the statistics object is active as a context manager,
+        it can be retrieved from anywhere with current_query_stats().
     """
 
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._ctx_tokens: List['Token[Union[QueryStatistics, NoQueryStats]]'] = []
+
     def __enter__(self) -> 'QueryStatistics':
         self.log_time('start')
+        self._ctx_tokens.append(_current_query_stats.set(self))
         return self
 
     def __exit__(self, *_: Any) -> None:
+        _current_query_stats.reset(self._ctx_tokens.pop())
         self.log_time('end')
         self['total_time'] = (self['end'] - self['start']).total_seconds()
         if 'start_query' in self:
@@ -429,6 +441,35 @@ class QueryStatistics(dict[str, Any]):
     def log_time(self, key: str) -> None:
         self[key] = dt.datetime.now(tz=dt.timezone.utc)
 
+    @contextlib.contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """ Measure the time spent in the enclosed code block and add
+            it to the entry 'time_<stage>' (in seconds).
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start)
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        """ Add the given time to the entry 'time_<stage>'.
+        """
+        key = f'time_{stage}'
+        self[key] = self.get(key, 0.0) + seconds
+
+    def add_stats(self, other: Union['QueryStatistics', 'NoQueryStats']) -> None:
+        """ Add the stage timings and the number of cancelled statements
+            collected by a partial call, like a worker of a batch search.
+        """
+        if isinstance(other, QueryStatistics):
+            for key, value in other.items():
+                if key.startswith('time_'):
+                    self.add_time(key[5:], value)
+            if other['cancelled_statements']:
+                self['cancelled_statements'] = (self['cancelled_statements'] or 0) \
+                                               + other['cancelled_statements']
+
 
 class NoQueryStats:
     """ Null object to use, when no query statistics are requested.
@@ -452,6 +493,25 @@ class NoQueryStats:
     def log_time(self, key: str) -> None:
         pass
 
+    def timer(self, stage: str) -> ContextManager[None]:
+        return contextlib.nullcontext()
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        pass
+
+    def add_stats(self, other: Union[QueryStatistics, 'NoQueryStats']) -> None:
+        pass
+
+
+_current_query_stats: ContextVar[Union[QueryStatistics, NoQueryStats]] = \
+    ContextVar('query_stats', default=NoQueryStats())
+
+
+def current_query_stats() -> Union[QueryStatistics, NoQueryStats]:
+    """ Return the statistics object of the API call currently running.
+    """
+    return _current_query_stats.get()
+
 
 def format_country(cc: Any) -> List[str]:
     """ Extract a list of country codes from the input which may be either
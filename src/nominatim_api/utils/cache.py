@@ -0,0 +1,201 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of Nominatim. (https://nominatim.org)
+#
+# Copyright (C) 2026 by the Nominatim developer community.
+# For a full list of authors see the git log.
+"""
+Size-bounded in-process caches used by the frontend.
+"""
+from typing import Any, Dict, Generic, Hashable, Optional, TypeVar, Iterator, Tuple, \
+                   Callable, Awaitable
+from collections import OrderedDict
+import asyncio
+import copy
+import time
+
+KeyT = TypeVar('KeyT', bound=Hashable)
+ValueT = TypeVar('ValueT')
+
+
+class LRUCache(Generic[KeyT, ValueT]):
+    """ A dictionary-like cache with a maximum number of entries.
+        When the cache is full, the least recently used entry is dropped.
+        When a time-to-live (in seconds) is given, then entries also
+        expire after that time.
+
+        The cache may optionally be tied to a data version. Whenever
+        a different version is set, all content is discarded.
+
+        The cache counts hits, misses and evictions, so that
+        its size can be tuned.
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version: Any = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: 'OrderedDict[KeyT, Tuple[float, ValueT]]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: KeyT) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator[KeyT]:
+        return iter(self._data)
+
+    def get(self, key: KeyT) -> Optional[ValueT]:
+        """ Return the value for the given key or None if the key
+            is not in the cache. Counts as a hit or miss respectively.
+        """
+        try:
+            expires, value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return None
+
+        if expires < time.monotonic():
+            del self._data[key]
+            self.evictions += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: KeyT, value: ValueT) -> None:
+        """ Add or replace the value for the given key. Evicts the oldest
+            entries when the cache grows beyond its maximum size.
+        """
+        if self.maxsize <= 0:
+            return
+
+        expires = float('inf') if self.ttl is None else time.monotonic() + self.ttl
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: KeyT) -> Optional[ValueT]:
+        """ Remove the given key from the cache and return its value
+            or None if it was not cached.
+        """
+        entry = self._data.pop(key, None)
+        return None if entry is None else entry[1]
+
+    def clear(self) -> None:
+        """ Remove all entries from the cache. Statistics are kept.
+        """
+        self._data.clear()
+
+    def set_version(self, version: Any) -> None:
+        """ Tie the cache content to the given data version. When the
+            version differs from the previous one, the cache is emptied.
+        """
+        if version != self.version:
+            self._data.clear()
+            self.version = version
+
+    def stats(self) -> Dict[str, int]:
+        """ Return the usage statistics of the cache.
+        """
+        return {'size': len(self._data), 'maxsize': self.maxsize,
+                'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions}
+
+
+class _InFlightCall:
+    """ A call that is currently being executed by a CallCoalescer.
+    """
+
+    def __init__(self) -> None:
+        self.done: 'asyncio.Future[Tuple[bool, Any]]' = \
+            asyncio.get_running_loop().create_future()
+        self.followers = 0
+
+
+class CallCoalescer(Generic[KeyT]):
+    """ Lets concurrent identical calls share a single execution.
+
+        The first call for a key executes the call. Calls with the same
+        key that arrive while it is still running wait for it to finish
+        and receive a copy of its result or the exception it raised.
+        When the executing call is cancelled or runs out of time, the
+        waiting calls execute the call themselves.
+
+        At most 'maxsize' different calls are tracked at the same time.
+        Further calls are executed without coalescing.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._inflight: Dict[KeyT, _InFlightCall] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def run(self, key: KeyT, func: Callable[[], Awaitable[ValueT]],
+                  is_complete: Optional[Callable[[], bool]] = None) -> Tuple[ValueT, bool]:
+        """ Execute 'func' or wait for the result of the identical call
+            already in progress. Returns the result and a flag, if the
+            result came from another call.
+
+            When 'is_complete' is given, it is called after 'func' has
+            finished. If it returns False, the result is not shared and
+            the waiting calls execute the call themselves. The same
+            happens when the executing call times out.
+        """
+        call = self._inflight.get(key)
+        if call is not None:
+            call.followers += 1
+            success, value = await asyncio.shield(call.done)
+            if success:
+                self.hits += 1
+                return copy.deepcopy(value), True
+            if value is not None:
+                raise value
+            return await func(), False
+
+        if len(self._inflight) >= self.maxsize:
+            self.bypassed += 1
+            return await func(), False
+
+        self.misses += 1
+        call = self._inflight[key] = _InFlightCall()
+        try:
+            result = await func()
+        except (asyncio.CancelledError, asyncio.TimeoutError, TimeoutError):
+            call.done.set_result((False, None))
+            raise
+        except Exception as exc:
+            call.done.set_result((False, exc))
+            raise
+        finally:
+            del self._inflight[key]
+
+        if is_complete is not None and not is_complete():
+            call.done.set_result((False, None))
+        else:
+            # The caller may modify the result as soon as it is returned,
+            # so the waiting calls need to get their copies from a pristine one.
+            call.done.set_result((True, copy.deepcopy(result) if call.followers else None))
+
+        return result, False
+
+    def stats(self) -> Dict[str, int]:
+        """ Return the usage statistics. 'hits' counts the calls that
+            received the result of another call.
+        """
+        return {'size': len(self._inflight), 'maxsize': self.maxsize,
+                'hits': self.hits, 'misses': self.misses,
+                'bypassed': self.bypassed}
@@ -137,3 +137,30 @@ class JsonWriter:
             self.value(transform(value) if transform else value)
             self.next()
         return self
+
+
+class ChunkedJsonWriter(JsonWriter):
+    """ JSON encoder that hands out the rendered content in pieces,
+        so that the beginning of the output can be sent while the
+        rest is still being rendered.
+
+        Call 'chunk()' at convenient points during rendering to get
+        the content written so far. Calling the writer object returns
+        the remaining content.
+    """
+
+    def __init__(self, chunk_size: int = 64 * 1024) -> None:
+        super().__init__()
+        self.chunk_size = chunk_size
+
+    def chunk(self) -> Optional[str]:
+        """ Return the content rendered since the last chunk and
+            remove it from the writer, when it has reached the chunk
+            size. Otherwise return None.
+        """
+        if self.data.tell() < self.chunk_size:
+            return None
+
+        content = self.data.getvalue()
+        self.data = io.StringIO()
+        return content
@@ -8,4 +8,4 @@
 Implementation of API version v1 (aka the legacy version).
 """
 
-from .server_glue import get_routes as get_routes
+from .server_glue import get_routes as get_routes, POST_ROUTES as POST_ROUTES
@@ -7,11 +7,11 @@
 """
 Output formatters for API version v1.
 """
-from typing import List, Dict, Mapping, Any
+from typing import List, Dict, Mapping, Any, Iterator
 import collections
 import datetime as dt
 
-from ..utils.json_writer import JsonWriter
+from ..utils.json_writer import JsonWriter, ChunkedJsonWriter
 from ..status import StatusResult
 from ..results import DetailedResult, ReverseResults, SearchResults, \
                       AddressLines, AddressLine
@@ -254,12 +254,24 @@ def _format_search_geojson(results: SearchResults,
     return format_json.format_base_geojson(results, options, False)
 
 
+@dispatch.stream_func(SearchResults, 'geojson')
+def _stream_search_geojson(results: SearchResults,
+                           options: Mapping[str, Any]) -> Iterator[str]:
+    return format_json.stream_base_geojson(results, options, False)
+
+
 @dispatch.format_func(SearchResults, 'geocodejson')
 def _format_search_geocodejson(results: SearchResults,
                                options: Mapping[str, Any]) -> str:
     return format_json.format_base_geocodejson(results, options, False)
 
 
+@dispatch.stream_func(SearchResults, 'geocodejson')
+def _stream_search_geocodejson(results: SearchResults,
+                               options: Mapping[str, Any]) -> Iterator[str]:
+    return format_json.stream_base_geocodejson(results, options, False)
+
+
 @dispatch.format_func(SearchResults, 'json')
 def _format_search_json(results: SearchResults,
                         options: Mapping[str, Any]) -> str:
@@ -267,6 +279,13 @@ def _format_search_json(results: SearchResults,
                                         class_label='class')
 
 
+@dispatch.stream_func(SearchResults, 'json')
+def _stream_search_json(results: SearchResults,
+                        options: Mapping[str, Any]) -> Iterator[str]:
+    return format_json.stream_base_json(results, options, False,
+                                        class_label='class')
+
+
 @dispatch.format_func(SearchResults, 'jsonv2')
 def _format_search_jsonv2(results: SearchResults,
                           options: Mapping[str, Any]) -> str:
@@ -274,9 +293,21 @@ def _format_search_jsonv2(results: SearchResults,
                                         class_label='category')
 
 
+@dispatch.stream_func(SearchResults, 'jsonv2')
+def _stream_search_jsonv2(results: SearchResults,
+                          options: Mapping[str, Any]) -> Iterator[str]:
+    return format_json.stream_base_json(results, options, False,
+                                        class_label='category')
+
+
 @dispatch.format_func(RawDataList, 'json')
-def _format_raw_data_json(results: RawDataList,  _: Mapping[str, Any]) -> str:
-    out = JsonWriter()
+def _format_raw_data_json(results: RawDataList,  options: Mapping[str, Any]) -> str:
+    return ''.join(_stream_raw_data_json(results, options))
+
+
+@dispatch.stream_func(RawDataList, 'json')
+def _stream_raw_data_json(results: RawDataList,  _: Mapping[str, Any]) -> Iterator[str]:
+    out = ChunkedJsonWriter()
     out.start_array()
     for res in results:
         out.start_object()
@@ -287,6 +318,9 @@ def _format_raw_data_json(results: RawDataList,  _: Mapping[str, Any]) -> str:
                 out.keyval(k, v)
         out.end_object().next()
 
+        if (chunk := out.chunk()) is not None:
+            yield chunk
+
     out.end_array()
 
-    return out()
+    yield out()
@@ -7,9 +7,9 @@
 """
 Helper functions for output of results in json formats.
 """
-from typing import Mapping, Any, Optional, Tuple, Union, List
+from typing import Mapping, Any, Optional, Tuple, Union, List, Iterator
 
-from ..utils.json_writer import JsonWriter
+from ..utils.json_writer import JsonWriter, ChunkedJsonWriter
 from ..results import AddressLines, ReverseResults, SearchResults
 from . import classtypes as cl
 from .helpers import _add_admin_level, result_to_exclude_id
@@ -93,12 +93,22 @@ def format_base_json(results: Union[ReverseResults, SearchResults],
                      class_label: str) -> str:
     """ Return the result list as a simple json string in custom Nominatim format.
     """
-    out = JsonWriter()
+    return ''.join(stream_base_json(results, options, simple, class_label))
 
-    if simple:
-        if not results:
-            return '{"error":"Unable to geocode"}'
-    else:
+
+def stream_base_json(results: Union[ReverseResults, SearchResults],
+                     options: Mapping[str, Any], simple: bool,
+                     class_label: str) -> Iterator[str]:
+    """ Return the result list in custom Nominatim json format
+        as a sequence of string chunks.
+    """
+    if simple and not results:
+        yield '{"error":"Unable to geocode"}'
+        return
+
+    out = ChunkedJsonWriter()
+
+    if not simple:
         out.start_array()
 
     for result in results:
@@ -163,13 +173,17 @@ def format_base_json(results: Union[ReverseResults, SearchResults],
         out.end_object()
 
         if simple:
-            return out()
+            break
 
         out.next()
 
-    out.end_array()
+        if (chunk := out.chunk()) is not None:
+            yield chunk
+
+    if not simple:
+        out.end_array()
 
-    return out()
+    yield out()
 
 
 def format_base_geojson(results: Union[ReverseResults, SearchResults],
@@ -177,10 +191,20 @@ def format_base_geojson(results: Union[ReverseResults, SearchResults],
                         simple: bool) -> str:
     """ Return the result list as a geojson string.
     """
+    return ''.join(stream_base_geojson(results, options, simple))
+
+
+def stream_base_geojson(results: Union[ReverseResults, SearchResults],
+                        options: Mapping[str, Any],
+                        simple: bool) -> Iterator[str]:
+    """ Return the result list in geojson format
+        as a sequence of string chunks.
+    """
     if not results and simple:
-        return '{"error":"Unable to geocode"}'
+        yield '{"error":"Unable to geocode"}'
+        return
 
-    out = JsonWriter()
+    out = ChunkedJsonWriter()
 
     out.start_object()\
        .keyval('type', 'FeatureCollection')\
@@ -236,19 +260,31 @@ def format_base_geojson(results: Union[ReverseResults, SearchResults],
 
         out.end_object().next()
 
+        if (chunk := out.chunk()) is not None:
+            yield chunk
+
     out.end_array().next().end_object()
 
-    return out()
+    yield out()
 
 
 def format_base_geocodejson(results: Union[ReverseResults, SearchResults],
                             options: Mapping[str, Any], simple: bool) -> str:
     """ Return the result list as a geocodejson string.
     """
+    return ''.join(stream_base_geocodejson(results, options, simple))
+
+
+def stream_base_geocodejson(results: Union[ReverseResults, SearchResults],
+                            options: Mapping[str, Any], simple: bool) -> Iterator[str]:
+    """ Return the result list in geocodejson format
+        as a sequence of string chunks.
+    """
     if not results and simple:
-        return '{"error":"Unable to geocode"}'
+        yield '{"error":"Unable to geocode"}'
+        return
 
-    out = JsonWriter()
+    out = ChunkedJsonWriter()
 
     out.start_object()\
        .keyval('type', 'FeatureCollection')\
@@ -306,9 +342,12 @@ def format_base_geocodejson(results: Union[ReverseResults, SearchResults],
 
         out.end_object().next()
 
+        if (chunk := out.chunk()) is not None:
+            yield chunk
+
     out.end_array().next().end_object()
 
-    return out()
+    yield out()
 
 
 GEOCODEJSON_RANKS = {
@@ -8,9 +8,11 @@
 Generic part of the server implementation of the v1 API.
 Combine with the scaffolding provided for the various Python ASGI frameworks.
 """
-from typing import Optional, Any, Type, Dict, cast, Sequence, Tuple
+from typing import Optional, Any, Type, Dict, List, Iterator, cast, Sequence, Tuple
 from functools import reduce
 import dataclasses
+import itertools
+import json
 from urllib.parse import urlencode
 import asyncio
 
@@ -30,22 +32,49 @@ from ..server.asgi_adaptor import ASGIAdaptor, EndpointFunc
 from ..sql.async_core_library import PGCORE_ERROR
 
 
+def _get_jsonp_callback(adaptor: ASGIAdaptor) -> Optional[str]:
+    """ Return the name of the JSONP function to wrap around a
+        JSON response or None, if no function was requested.
+        Switches the content type of the response to javascript.
+    """
+    if adaptor.content_type != ct.CONTENT_JSON:
+        return None
+
+    jsonp = adaptor.get('json_callback')
+    if jsonp is not None:
+        if any(not part.isidentifier() for part in jsonp.split('.')):
+            adaptor.raise_error('Invalid json_callback value')
+        adaptor.content_type = 'application/javascript; charset=utf-8'
+
+    return jsonp
+
+
 def build_response(adaptor: ASGIAdaptor, output: str, status: int = 200,
                    num_results: int = 0) -> Any:
     """ Create a response from the given output. Wraps a JSONP function
         around the response, if necessary.
     """
-    if adaptor.content_type == ct.CONTENT_JSON and status == 200:
-        jsonp = adaptor.get('json_callback')
+    if status == 200:
+        jsonp = _get_jsonp_callback(adaptor)
         if jsonp is not None:
-            if any(not part.isidentifier() for part in jsonp.split('.')):
-                adaptor.raise_error('Invalid json_callback value')
             output = f"{jsonp}({output})"
-            adaptor.content_type = 'application/javascript; charset=utf-8'
 
     return adaptor.create_response(status, output, num_results)
 
 
+def build_stream_response(adaptor: ASGIAdaptor, output: Iterator[str],
+                          num_results: int = 0) -> Any:
+    """ Create a successful response which sends the output while
+        it is still being produced. Wraps a JSONP function around
+        the response, if necessary.
+    """
+    jsonp = _get_jsonp_callback(adaptor)
+    if jsonp is not None:
+        output = itertools.chain((f"{jsonp}(", ), output, (")", ))
+
+    return adaptor.create_stream_response(200, output, num_results)
+
+
 def get_accepted_languages(adaptor: ASGIAdaptor) -> str:
     """ Return the accepted languages.
     """
@@ -187,25 +216,81 @@ async def details_endpoint(api: NominatimAPIAsync, params: ASGIAdaptor) -> Any:
 
     locales = Locales.from_accept_languages(get_accepted_languages(params),
                                             params.config().OUTPUT_NAMES)
-    locales.localize_results([result])
-
-    output = params.formatting().format_result(
-        result, fmt,
-        {'locales': locales,
-         'group_hierarchy': params.get_bool('group_hierarchy', False),
-         'icon_base_url': params.config().MAPICON_URL,
-         'entrances': params.get_bool('entrances', False),
-         })
+    with params.timer('localize'):
+        locales.localize_results([result])
+
+    with params.timer('format'):
+        output = params.formatting().format_result(
+            result, fmt,
+            {'locales': locales,
+             'group_hierarchy': params.get_bool('group_hierarchy', False),
+             'icon_base_url': params.config().MAPICON_URL,
+             'entrances': params.get_bool('entrances', False),
+             })
 
     return build_response(params, output, num_results=1)
 
 
+def parse_coordinate_list(adaptor: ASGIAdaptor) -> List[Point]:
+    """ Get and check the list of points from the 'coords' parameter.
+        Points are expected to be separated by semicolon with longitude
+        and latitude separated by comma.
+    """
+    points = []
+    for pair in (adaptor.get('coords') or '').split(';'):
+        try:
+            point = Point.from_param(pair)
+        except UsageError:
+            adaptor.raise_error("Parameter 'coords' must be a list of 'lon,lat' pairs.")
+        points.append(point)
+
+    if len(points) > adaptor.config().get_int('REVERSE_MAX_COUNT'):
+        adaptor.raise_error('Too many coordinates.')
+
+    return points
+
+
+async def _reverse_many(api: NominatimAPIAsync, params: ASGIAdaptor,
+                        fmt: str, details: Dict[str, Any]) -> Any:
+    """ Server glue for the batch variant of /reverse, where the
+        coordinates are given in the 'coords' parameter.
+    """
+    if fmt == 'xml':
+        params.raise_error("Parameter 'coords' can only be used with JSON output formats.")
+
+    debug = setup_debugging(params)
+    coords = parse_coordinate_list(params)
+
+    results = await api.reverse_many(coords, **details)
+    num_results = sum(1 for r in results if r is not None)
+
+    if debug:
+        return build_response(params, loglib.get_and_disable(), num_results=num_results)
+
+    with params.timer('localize'):
+        Locales.from_accept_languages(get_accepted_languages(params),
+                                      params.config().OUTPUT_NAMES)\
+               .localize_results([r for r in results if r is not None])
+
+    fmt_options = {'query': '',
+                   'extratags': params.get_bool('extratags', False),
+                   'namedetails': params.get_bool('namedetails', False),
+                   'entrances': params.get_bool('entrances', False),
+                   'addressdetails': params.get_bool('addressdetails', True)}
+
+    formatting = params.formatting()
+    with params.timer('format'):
+        output = ','.join(formatting.format_result(ReverseResults([r] if r else []),
+                                                   fmt, fmt_options)
+                          for r in results)
+
+    return build_response(params, f"[{output}]", num_results=num_results)
+
+
 async def reverse_endpoint(api: NominatimAPIAsync, params: ASGIAdaptor) -> Any:
     """ Server glue for /reverse endpoint. See API docs for details.
     """
     fmt = parse_format(params, ReverseResults, 'xml')
-    debug = setup_debugging(params)
-    coord = Point(params.get_float('lon'), params.get_float('lat'))
 
     details = parse_geometry_details(params, fmt)
     details['max_rank'] = helpers.zoom_to_rank(params.get_int('zoom', 18))
@@ -213,6 +298,12 @@ async def reverse_endpoint(api: NominatimAPIAsync, params: ASGIAdaptor) -> Any:
     details['query_stats'] = params.query_stats()
     details['entrances'] = params.get_bool('entrances', False)
 
+    if params.get('coords') is not None:
+        return await _reverse_many(api, params, fmt, details)
+
+    debug = setup_debugging(params)
+    coord = Point(params.get_float('lon'), params.get_float('lat'))
+
     result = await api.reverse(coord, **details)
 
     if debug:
@@ -228,8 +319,9 @@ async def reverse_endpoint(api: NominatimAPIAsync, params: ASGIAdaptor) -> Any:
         query = ''
 
     if result:
-        Locales.from_accept_languages(get_accepted_languages(params),
-                                      params.config().OUTPUT_NAMES).localize_results([result])
+        with params.timer('localize'):
+            Locales.from_accept_languages(get_accepted_languages(params),
+                                          params.config().OUTPUT_NAMES).localize_results([result])
 
     fmt_options = {'query': query,
                    'extratags': params.get_bool('extratags', False),
@@ -237,8 +329,9 @@ async def reverse_endpoint(api: NominatimAPIAsync, params: ASGIAdaptor) -> Any:
                    'entrances': params.get_bool('entrances', False),
                    'addressdetails': params.get_bool('addressdetails', True)}
 
-    output = params.formatting().format_result(ReverseResults([result] if result else []),
-                                               fmt, fmt_options)
+    with params.timer('format'):
+        output = params.formatting().format_result(ReverseResults([result] if result else []),
+                                                   fmt, fmt_options)
 
     return build_response(params, output, num_results=1 if result else 0)
 
@@ -269,15 +362,22 @@ async def lookup_endpoint(api: NominatimAPIAsync, params: ASGIAdaptor) -> Any:
     if debug:
         return build_response(params, loglib.get_and_disable(), num_results=len(results))
 
-    Locales.from_accept_languages(get_accepted_languages(params),
-                                  params.config().OUTPUT_NAMES).localize_results(results)
+    with params.timer('localize'):
+        Locales.from_accept_languages(get_accepted_languages(params),
+                                      params.config().OUTPUT_NAMES).localize_results(results)
 
     fmt_options = {'extratags': params.get_bool('extratags', False),
                    'namedetails': params.get_bool('namedetails', False),
                    'entrances': params.get_bool('entrances', False),
                    'addressdetails': params.get_bool('addressdetails', True)}
 
-    output = params.formatting().format_result(results, fmt, fmt_options)
+    if details['geometry_output'] and params.formatting().supports_streaming(SearchResults, fmt):
+        return build_stream_response(params,
+                                     params.formatting().stream_result(results, fmt, fmt_options),
+                                     num_results=len(results))
+
+    with params.timer('format'):
+        output = params.formatting().format_result(results, fmt, fmt_options)
 
     return build_response(params, output, num_results=len(results))
 
@@ -313,11 +413,11 @@ async def _unstructured_search(query: str, api: NominatimAPIAsync,
     return await api.search(query, **details)
 
 
-async def search_endpoint(api: NominatimAPIAsync, params: ASGIAdaptor) -> Any:
-    """ Server glue for /search endpoint. See API docs for details.
+def parse_search_details(params: ASGIAdaptor, fmt: str) -> Tuple[Dict[str, Any], int]:
+    """ Create the details structure for a search from the parameters
+        shared by all kinds of searches. Returns the details and the
+        number of results requested by the user.
     """
-    fmt = parse_format(params, SearchResults, 'jsonv2')
-    debug = setup_debugging(params)
     details = parse_geometry_details(params, fmt)
 
     details['query_stats'] = params.query_stats()
@@ -341,6 +441,16 @@ async def search_endpoint(api: NominatimAPIAsync, params: ASGIAdaptor) -> Any:
     details['locales'] = Locales.from_accept_languages(get_accepted_languages(params),
                                                        params.config().OUTPUT_NAMES)
 
+    return details, max_results
+
+
+async def search_endpoint(api: NominatimAPIAsync, params: ASGIAdaptor) -> Any:
+    """ Server glue for /search endpoint. See API docs for details.
+    """
+    fmt = parse_format(params, SearchResults, 'jsonv2')
+    debug = setup_debugging(params)
+    details, max_results = parse_search_details(params, fmt)
+
     # unstructured query parameters
     query = params.get('q', None)
     # structured query parameters
@@ -365,7 +475,8 @@ async def search_endpoint(api: NominatimAPIAsync, params: ASGIAdaptor) -> Any:
     except UsageError as err:
         params.raise_error(str(err))
 
-    details['locales'].localize_results(results)
+    with params.timer('localize'):
+        details['locales'].localize_results(results)
 
     if details['dedupe'] and len(results) > 1:
         results = helpers.deduplicate_results(results, max_results)
@@ -395,7 +506,120 @@ async def search_endpoint(api: NominatimAPIAsync, params: ASGIAdaptor) -> Any:
                    'entrances': params.get_bool('entrances', False),
                    'addressdetails': params.get_bool('addressdetails', False)}
 
-    output = params.formatting().format_result(results, fmt, fmt_options)
+    if details['geometry_output'] and params.formatting().supports_streaming(SearchResults, fmt):
+        return build_stream_response(params,
+                                     params.formatting().stream_result(results, fmt, fmt_options),
+                                     num_results=len(results))
+
+    with params.timer('format'):
+        output = params.formatting().format_result(results, fmt, fmt_options)
+
+    return build_response(params, output, num_results=len(results))
+
+
+async def parse_query_list(params: ASGIAdaptor) -> List[str]:
+    """ Get and check the list of queries from the body of the request.
+        The body must be a JSON array of strings.
+    """
+    try:
+        queries = json.loads(await params.get_body())
+    except ValueError:
+        queries = None
+
+    if not isinstance(queries, list) or not all(isinstance(q, str) for q in queries):
+        params.raise_error('Request body must be a JSON array of query strings.')
+
+    if len(queries) > params.config().get_int('SEARCH_BATCH_MAX_COUNT'):
+        params.raise_error('Too many queries.')
+
+    return queries
+
+
+def _format_batch_error(params: ASGIAdaptor, error: Exception) -> str:
+    """ Format the error of a single query of a batch search as the
+        entry for the query in the response. Unexpected errors only fail
+        the query they occurred in, not the whole batch.
+    """
+    if isinstance(error, UsageError):
+        return params.formatting().format_error(params.content_type, str(error), 400)
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError)):
+        return params.formatting().format_error(params.content_type,
+                                                'Query took too long to process.', 503)
+    return params.formatting().format_error(params.content_type,
+                                            'Internal error while processing the query.', 500)
+
+
+async def search_batch_endpoint(api: NominatimAPIAsync, params: ASGIAdaptor) -> Any:
+    """ Server glue for /search_batch endpoint. See API docs for details.
+    """
+    fmt = parse_format(params, SearchResults, 'jsonv2')
+    if fmt == 'xml':
+        params.raise_error("Batch search can only be used with JSON output formats.")
+
+    details, max_results = parse_search_details(params, fmt)
+    queries = await parse_query_list(params)
+
+    try:
+        all_results = await api.search_many(queries, **details)
+    except UsageError as err:
+        params.raise_error(str(err))
+
+    fmt_options = {'extratags': params.get_bool('extratags', False),
+                   'namedetails': params.get_bool('namedetails', False),
+                   'entrances': params.get_bool('entrances', False),
+                   'addressdetails': params.get_bool('addressdetails', False)}
+
+    outputs = []
+    num_results = 0
+    for query, results in zip(queries, all_results):
+        if isinstance(results, Exception):
+            outputs.append(_format_batch_error(params, results))
+            continue
+        with params.timer('localize'):
+            details['locales'].localize_results(results)
+        if details['dedupe'] and len(results) > 1:
+            results = helpers.deduplicate_results(results, max_results)
+        num_results += len(results)
+        with params.timer('format'):
+            outputs.append(params.formatting().format_result(results, fmt,
+                                                             {'query': query, **fmt_options}))
+
+    return build_response(params, f"[{','.join(outputs)}]", num_results=num_results)
+
+
+async def autocomplete_endpoint(api: NominatimAPIAsync, params: ASGIAdaptor) -> Any:
+    """ Server glue for /autocomplete endpoint. See API docs for details.
+    """
+    fmt = parse_format(params, SearchResults, 'jsonv2')
+    debug = setup_debugging(params)
+    details, max_results = parse_search_details(params, fmt)
+
+    query = params.get('q', None)
+    if query is None:
+        params.raise_error("Missing parameter 'q'.")
+
+    try:
+        results = await api.autocomplete(query, **details)
+    except UsageError as err:
+        params.raise_error(str(err))
+
+    with params.timer('localize'):
+        details['locales'].localize_results(results)
+
+    if details['dedupe'] and len(results) > 1:
+        results = helpers.deduplicate_results(results, max_results)
+
+    if debug:
+        return build_response(params, loglib.get_and_disable(), num_results=len(results))
+
+    fmt_options = {'query': query, 'more_url': '',
+                   'extratags': params.get_bool('extratags', False),
+                   'namedetails': params.get_bool('namedetails', False),
+                   'entrances': params.get_bool('entrances', False),
+                   'addressdetails': params.get_bool('addressdetails', False)}
+
+    with params.timer('format'):
+        output = params.formatting().format_result(results, fmt, fmt_options)
 
     return build_response(params, output, num_results=len(results))
 
@@ -452,7 +676,7 @@ async def polygons_endpoint(api: NominatimAPIAsync, params: ASGIAdaptor) -> Any:
 
         results = RawDataList(r._asdict() for r in await conn.execute(sql, sql_params))
 
-    return build_response(params, params.formatting().format_result(results, fmt, {}))
+    return build_stream_response(params, params.formatting().stream_result(results, fmt, {}))
 
 
 async def search_unavailable_endpoint(api: NominatimAPIAsync, params: ASGIAdaptor) -> Any:
@@ -510,6 +734,11 @@ class LazySearchEndpoint:
         return await self._delegate(api, params)
 
 
+# Endpoints that receive their input in the body of a POST request.
+# All other endpoints only answer GET requests.
+POST_ROUTES = ('search_batch', )
+
+
 async def get_routes(api: NominatimAPIAsync) -> Sequence[Tuple[str, EndpointFunc]]:
     routes = [
         ('status', status_endpoint),
@@ -524,9 +753,15 @@ async def get_routes(api: NominatimAPIAsync) -> Sequence[Tuple[str, EndpointFunc
         async with api.begin() as conn:
             if await conn.connection.run_sync(has_search_name):
                 routes.append(('search', search_endpoint))
+                routes.append(('search_batch', search_batch_endpoint))
+                routes.append(('autocomplete', autocomplete_endpoint))
             else:
                 routes.append(('search', search_unavailable_endpoint))
+                routes.append(('search_batch', search_unavailable_endpoint))
+                routes.append(('autocomplete', search_unavailable_endpoint))
     except (PGCORE_ERROR, sa.exc.OperationalError, OSError):
         routes.append(('search', LazySearchEndpoint(api, search_endpoint)))
+        routes.append(('search_batch', LazySearchEndpoint(api, search_batch_endpoint)))
+        routes.append(('autocomplete', LazySearchEndpoint(api, autocomplete_endpoint)))
 
     return routes
@@ -11,11 +11,7 @@ from typing import cast
 import argparse
 import logging
 
-import psutil
-
 from .args import NominatimArgs
-from ..db.connection import connect
-from ..tools.freeze import is_frozen
 from ..utils.asyncio_utils import asyncio_run
 
 
@@ -63,7 +59,9 @@ class UpdateAddData:
                             help='Set timeout for file downloads')
 
     def run(self, args: NominatimArgs) -> int:
+        from ..db.connection import connect
         from ..tools import add_osm_data
+        from ..tools.freeze import is_frozen
 
         if args.tiger_data:
             return asyncio_run(self._add_tiger_data(args))
@@ -100,6 +98,7 @@ class UpdateAddData:
         return 0
 
     async def _add_tiger_data(self, args: NominatimArgs) -> int:
+        import psutil
         from ..tokenizer import factory as tokenizer_factory
         from ..tools import tiger_data
 
@@ -12,7 +12,6 @@ import argparse
 import random
 
 from ..errors import UsageError
-from ..db.connection import connect, table_exists
 from .args import NominatimArgs
 
 
@@ -104,6 +103,7 @@ class AdminFuncs:
                                 address_details=True)
 
             if args.target != 'reverse':
+                from ..db.connection import connect, table_exists
                 from ..tokenizer import factory as tokenizer_factory
 
                 tokenizer = tokenizer_factory.get_tokenizer_for_db(args.config)
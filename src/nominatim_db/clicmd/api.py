@@ -16,9 +16,7 @@ import pprint
 from functools import reduce
 
 import nominatim_api as napi
-from nominatim_api.v1.helpers import zoom_to_rank, deduplicate_results
 from nominatim_api.server.content_types import CONTENT_JSON
-import nominatim_api.logging as loglib
 from ..config import Configuration
 from ..errors import UsageError
 from .args import NominatimArgs
@@ -92,7 +90,7 @@ def _get_geometry_output(args: NominatimArgs) -> napi.GeometryFormat:
         raise UsageError(f"Unknown polygon output format '{args.polygon_output}'.") from exp
 
 
-def _get_locales(args: NominatimArgs, config: Configuration) -> napi.Locales:
+def _get_locales(args: NominatimArgs, config: Configuration) -> 'napi.Locales':
     """ Get the locales from the language parameter.
     """
     language = args.lang or config.DEFAULT_LANGUAGE
@@ -114,7 +112,7 @@ def _get_layers(args: NominatimArgs, default: Optional[napi.DataLayer]) -> Optio
                   (napi.DataLayer[s.upper()] for s in args.layers))
 
 
-def _list_formats(formatter: napi.FormatDispatcher, rtype: Type[Any]) -> int:
+def _list_formats(formatter: 'napi.FormatDispatcher', rtype: Type[Any]) -> int:
     for fmt in formatter.list_formats(rtype):
         print(fmt)
     print('debug')
@@ -123,7 +121,7 @@ def _list_formats(formatter: napi.FormatDispatcher, rtype: Type[Any]) -> int:
     return 0
 
 
-def _print_output(formatter: napi.FormatDispatcher, result: Any,
+def _print_output(formatter: 'napi.FormatDispatcher', result: Any,
                   fmt: str, options: Mapping[str, Any]) -> None:
 
     if fmt == 'raw':
@@ -182,6 +180,9 @@ class APISearch:
         _add_list_format(parser)
 
     def run(self, args: NominatimArgs) -> int:
+        import nominatim_api.logging as loglib
+        from nominatim_api.v1.helpers import deduplicate_results
+
         formatter = napi.load_format_dispatcher('v1', args.project_dir)
 
         if args.list_formats:
@@ -268,6 +269,9 @@ class APIReverse:
         _add_list_format(parser)
 
     def run(self, args: NominatimArgs) -> int:
+        import nominatim_api.logging as loglib
+        from nominatim_api.v1.helpers import zoom_to_rank
+
         formatter = napi.load_format_dispatcher('v1', args.project_dir)
 
         if args.list_formats:
@@ -336,6 +340,8 @@ class APILookup:
         _add_list_format(parser)
 
     def run(self, args: NominatimArgs) -> int:
+        import nominatim_api.logging as loglib
+
         formatter = napi.load_format_dispatcher('v1', args.project_dir)
 
         if args.list_formats:
@@ -422,6 +428,8 @@ class APIDetails:
         _add_list_format(parser)
 
     def run(self, args: NominatimArgs) -> int:
+        import nominatim_api.logging as loglib
+
         formatter = napi.load_format_dispatcher('v1', args.project_dir)
 
         if args.list_formats:
@@ -494,6 +502,8 @@ class APIStatus:
         _add_list_format(parser)
 
     def run(self, args: NominatimArgs) -> int:
+        import nominatim_api.logging as loglib
+
         formatter = napi.load_format_dispatcher('v1', args.project_dir)
 
         if args.list_formats:
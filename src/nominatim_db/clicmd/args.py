@@ -104,11 +104,13 @@ class NominatimArgs:
 
     # Arguments to 'convert'
     output: Path
+    bulk: bool
 
     # Arguments to 'refresh'
     postcodes: bool
     word_tokens: bool
     word_counts: bool
+    word_dictionary: bool
     address_levels: bool
     functions: bool
     wiki_data: bool
@@ -75,6 +75,11 @@ class ConvertDB:
                            help='Enable/disable support for search API (default: disabled)')
         group.add_argument('--details', action=WithAction, dest_set=self.options, default=True,
                            help='Enable/disable support for details API (default: enabled)')
+        group = parser.add_argument_group('Export options')
+        group.add_argument('--bulk', action='store_true',
+                           help='Read the tables in parallel (see --threads) and write '
+                                'without journal. The output file is unusable when '
+                                'the conversion is interrupted.')
 
     def run(self, args: NominatimArgs) -> int:
         if args.output.exists():
@@ -82,7 +87,8 @@ class ConvertDB:
 
         if args.format == 'sqlite':
             from ..tools import convert_sqlite
-            asyncio_run(convert_sqlite.convert(args.project_dir, args.output, self.options))
+            asyncio_run(convert_sqlite.convert(args.project_dir, args.output, self.options,
+                                               bulk=args.bulk, threads=args.threads or 1))
             return 0
 
         return 1
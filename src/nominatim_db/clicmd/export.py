@@ -7,22 +7,21 @@
 """
 Implementation of the 'export' subcommand.
 """
-from typing import Optional, List, cast
+from typing import Optional, List, cast, TYPE_CHECKING
 import logging
 import argparse
 import csv
 import sys
 
 import nominatim_api as napi
-from nominatim_api.results import create_from_placex_row, ReverseResult, add_result_details
-from nominatim_api.types import LookupDetails
-
-import sqlalchemy as sa
 
 from ..errors import UsageError
 from .args import NominatimArgs
 from ..utils.asyncio_utils import asyncio_run
 
+if TYPE_CHECKING:
+    from nominatim_api.results import ReverseResult
+
 
 LOG = logging.getLogger()
 
@@ -88,6 +87,8 @@ class QueryExport:
 async def export(args: NominatimArgs) -> int:
     """ The actual export as a asynchronous function.
     """
+    import sqlalchemy as sa
+    from nominatim_api.results import create_from_placex_row, ReverseResult
 
     api = napi.NominatimAPIAsync(args.project_dir)
 
@@ -147,10 +148,13 @@ def init_csv_writer(output_format: str) -> 'csv.DictWriter[str]':
     return writer
 
 
-async def dump_results(conn: napi.SearchConnection,
-                       results: List[ReverseResult],
+async def dump_results(conn: 'napi.SearchConnection',
+                       results: List['ReverseResult'],
                        writer: 'csv.DictWriter[str]',
                        lang: Optional[str]) -> None:
+    from nominatim_api.results import add_result_details
+    from nominatim_api.types import LookupDetails
+
     await add_result_details(conn, results,
                              LookupDetails(address_details=True))
 
@@ -171,11 +175,13 @@ async def dump_results(conn: napi.SearchConnection,
         writer.writerow(data)
 
 
-async def get_parent_id(conn: napi.SearchConnection, node_id: Optional[int],
+async def get_parent_id(conn: 'napi.SearchConnection', node_id: Optional[int],
                         way_id: Optional[int],
                         relation_id: Optional[int]) -> Optional[int]:
     """ Get the place ID for the given OSM object.
     """
+    import sqlalchemy as sa
+
     if node_id is not None:
         osm_type, osm_id = 'N', node_id
     elif way_id is not None:
@@ -9,7 +9,6 @@ Implementation of the 'freeze' subcommand.
 """
 import argparse
 
-from ..db.connection import connect
 from .args import NominatimArgs
 
 
@@ -29,6 +28,7 @@ class SetupFreeze:
         pass  # No options
 
     def run(self, args: NominatimArgs) -> int:
+        from ..db.connection import connect
         from ..tools import freeze
 
         with connect(args.config.get_libpq_dsn()) as conn:
@@ -9,10 +9,6 @@ Implementation of the 'index' subcommand.
 """
 import argparse
 
-import psutil
-
-from ..db import status
-from ..db.connection import connect
 from .args import NominatimArgs
 from ..utils.asyncio_utils import asyncio_run
 
@@ -39,6 +35,9 @@ class UpdateIndex:
                            help='Maximum/finishing rank')
 
     def run(self, args: NominatimArgs) -> int:
+        from ..db import status
+        from ..db.connection import connect
+
         asyncio_run(self._do_index(args))
 
         if not args.no_boundaries and not args.boundaries_only \
@@ -49,6 +48,7 @@ class UpdateIndex:
         return 0
 
     async def _do_index(self, args: NominatimArgs) -> None:
+        import psutil
         from ..tokenizer import factory as tokenizer_factory
         from ..indexer.indexer import Indexer
         from ..data import country_info
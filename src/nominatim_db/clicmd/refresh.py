@@ -7,17 +7,18 @@
 """
 Implementation of 'refresh' subcommand.
 """
-from typing import Tuple, Optional
+from typing import Tuple, Optional, TYPE_CHECKING
 import argparse
 import logging
 from pathlib import Path
 
 from ..config import Configuration
-from ..db.connection import connect, table_exists
-from ..tokenizer.base import AbstractTokenizer
 from .args import NominatimArgs
 from ..utils.asyncio_utils import asyncio_run
 
+if TYPE_CHECKING:
+    from ..tokenizer.base import AbstractTokenizer
+
 
 LOG = logging.getLogger()
 
@@ -45,7 +46,7 @@ class UpdateRefresh:
              commands like 'replication' or 'add-data'.
     """
     def __init__(self) -> None:
-        self.tokenizer: Optional[AbstractTokenizer] = None
+        self.tokenizer: Optional['AbstractTokenizer'] = None
 
     def add_args(self, parser: argparse.ArgumentParser) -> None:
         group = parser.add_argument_group('Data arguments')
@@ -55,6 +56,8 @@ class UpdateRefresh:
                            help='Clean up search terms')
         group.add_argument('--word-counts', action='store_true',
                            help='Compute frequency of full-word search terms')
+        group.add_argument('--word-dictionary', action='store_true',
+                           help='Create the word dictionary file for the search frontend')
         group.add_argument('--address-levels', action='store_true',
                            help='Reimport address level configuration')
         group.add_argument('--functions', action='store_true',
@@ -90,6 +93,7 @@ class UpdateRefresh:
                            help='Recompute the postcodes from scratch instead of updating')
 
     def run(self, args: NominatimArgs) -> int:
+        from ..db.connection import connect, table_exists
         from ..tools import refresh, postcodes
         from ..indexer.indexer import Indexer
         from ..data import country_info
@@ -122,6 +126,15 @@ class UpdateRefresh:
             self._get_tokenizer(args.config).update_statistics(args.config,
                                                                threads=args.threads or 1)
 
+        if args.word_dictionary:
+            dict_file = args.config.get_path('API_WORD_DICTIONARY')
+            if dict_file is None:
+                LOG.fatal('FATAL: NOMINATIM_API_WORD_DICTIONARY is not set.')
+                return 1
+            LOG.warning('Create word dictionary %s', dict_file)
+            num_rows = asyncio_run(refresh.create_word_dictionary(args.project_dir, dict_file))
+            LOG.warning('Word dictionary has %d entries.', num_rows)
+
         if args.address_levels:
             LOG.warning('Updating address levels')
             with connect(args.config.get_libpq_dsn()) as conn:
@@ -184,7 +197,7 @@ class UpdateRefresh:
 
         return 0
 
-    def _get_tokenizer(self, config: Configuration) -> AbstractTokenizer:
+    def _get_tokenizer(self, config: Configuration) -> 'AbstractTokenizer':
         if self.tokenizer is None:
             from ..tokenizer import factory as tokenizer_factory
 
@@ -14,8 +14,6 @@ import logging
 import socket
 import time
 
-from ..db import status
-from ..db.connection import connect
 from ..errors import UsageError
 from .args import NominatimArgs
 from ..utils.asyncio_utils import asyncio_run
@@ -68,6 +66,7 @@ class UpdateReplication:
                            help='Set timeout for file downloads')
 
     def _init_replication(self, args: NominatimArgs) -> int:
+        from ..db.connection import connect
         from ..tools import replication, refresh
 
         LOG.warning("Initialising replication updates")
@@ -80,6 +79,7 @@ class UpdateReplication:
         return 0
 
     def _check_for_updates(self, args: NominatimArgs) -> int:
+        from ..db.connection import connect
         from ..tools import replication
 
         with connect(args.config.get_libpq_dsn()) as conn:
@@ -116,6 +116,8 @@ class UpdateReplication:
         return update_interval
 
     async def _update(self, args: NominatimArgs) -> None:
+        from ..db import status
+        from ..db.connection import connect
         from ..tools import replication
         from ..indexer.indexer import Indexer
         from ..tokenizer import factory as tokenizer_factory
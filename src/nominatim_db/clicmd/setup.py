@@ -7,24 +7,22 @@
 """
 Implementation of the 'import' subcommand.
 """
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 import argparse
 import logging
 from pathlib import Path
 
-import psutil
-
 from ..errors import UsageError
 from ..config import Configuration
-from ..db.connection import connect
-from ..db import status, properties
-from ..tokenizer.base import AbstractTokenizer
 from ..version import NOMINATIM_VERSION
 from .args import NominatimArgs
 from ..utils.asyncio_utils import asyncio_run
 
 import time
 
+if TYPE_CHECKING:
+    from ..tokenizer.base import AbstractTokenizer
+
 LOG = logging.getLogger()
 
 
@@ -83,6 +81,8 @@ class SetupAll:
         return asyncio_run(self.async_run(args))
 
     async def async_run(self, args: NominatimArgs) -> int:
+        import psutil
+        from ..db.connection import connect
         from ..data import country_info
         from ..tools import database_import, postcodes, freeze
         from ..indexer.indexer import Indexer
@@ -188,6 +188,7 @@ class SetupAll:
     def _setup_tables(self, config: Configuration, reverse_only: bool) -> None:
         """ Set up the basic database layout: tables, indexes and functions.
         """
+        from ..db.connection import connect
         from ..tools import database_import, refresh
 
         with connect(config.get_libpq_dsn()) as conn:
@@ -207,7 +208,7 @@ class SetupAll:
             refresh.create_functions(conn, config, False, False)
 
     def _get_tokenizer(self, continue_at: Optional[str],
-                       config: Configuration) -> AbstractTokenizer:
+                       config: Configuration) -> 'AbstractTokenizer':
         """ Set up a new tokenizer or load an already initialised one.
         """
         from ..tokenizer import factory as tokenizer_factory
@@ -222,6 +223,9 @@ class SetupAll:
     def _finalize_database(self, dsn: str, offline: bool) -> None:
         """ Determine the database date and set the status accordingly.
         """
+        from ..db.connection import connect
+        from ..db import status, properties
+
         with connect(dsn) as conn:
             properties.set_property(conn, 'database_version', str(NOMINATIM_VERSION))
 
@@ -7,17 +7,17 @@
 """
     Implementation of the 'special-phrases' command.
 """
+from typing import TYPE_CHECKING
 import argparse
 import logging
 from pathlib import Path
 
 from ..errors import UsageError
-from ..db.connection import connect
-from ..tools.special_phrases.sp_importer import SPImporter, SpecialPhraseLoader
-from ..tools.special_phrases.sp_wiki_loader import SPWikiLoader
-from ..tools.special_phrases.sp_csv_loader import SPCsvLoader
 from .args import NominatimArgs
 
+if TYPE_CHECKING:
+    from ..tools.special_phrases.sp_importer import SpecialPhraseLoader
+
 
 LOG = logging.getLogger()
 
@@ -62,6 +62,8 @@ class ImportSpecialPhrases:
                            help='Restrict special phrases by minimum occurance')
 
     def run(self, args: NominatimArgs) -> int:
+        from ..tools.special_phrases.sp_wiki_loader import SPWikiLoader
+        from ..tools.special_phrases.sp_csv_loader import SPCsvLoader
 
         if args.import_from_wiki:
             self.start_import(args, SPWikiLoader(args.config))
@@ -75,11 +77,13 @@ class ImportSpecialPhrases:
 
         return 0
 
-    def start_import(self, args: NominatimArgs, loader: SpecialPhraseLoader) -> None:
+    def start_import(self, args: NominatimArgs, loader: 'SpecialPhraseLoader') -> None:
         """
             Create the SPImporter object containing the right
             sp loader and then start the import of special phrases.
         """
+        from ..db.connection import connect
+        from ..tools.special_phrases.sp_importer import SPImporter
         from ..tokenizer import factory as tokenizer_factory
 
         tokenizer = tokenizer_factory.get_tokenizer_for_db(args.config)
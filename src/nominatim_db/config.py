@@ -7,7 +7,7 @@
 """
 Nominatim configuration accessor.
 """
-from typing import Union, Dict, Any, List, Mapping, Optional
+from typing import Union, Dict, Any, List, Mapping, Optional, TYPE_CHECKING
 import importlib.util
 import logging
 import os
@@ -15,16 +15,16 @@ import sys
 import re
 from pathlib import Path
 import json
-import yaml
 
 from dotenv import dotenv_values
 
-from psycopg.conninfo import conninfo_to_dict
-
 from .typing import StrPath
 from .errors import UsageError
 from . import paths
 
+if TYPE_CHECKING:
+    import yaml
+
 LOG = logging.getLogger()
 CONFIG_CACHE: Dict[str, Any] = {}
 
@@ -202,6 +202,8 @@ class Configuration:
         if dsn.startswith('pgsql:'):
             return dict((p.split('=', 1) for p in dsn[6:].split(';')))
 
+        from psycopg.conninfo import conninfo_to_dict
+
         return conninfo_to_dict(dsn)
 
     def get_import_style_file(self) -> Path:
@@ -351,11 +353,13 @@ class Configuration:
         """ Load a YAML configuration file. This installs a special handler that
             allows to include other YAML files using the '!include' operator.
         """
+        import yaml
+
         yaml.add_constructor('!include', self._yaml_include_representer,
                              Loader=yaml.SafeLoader)
         return yaml.safe_load(cfgfile.read_text(encoding='utf-8'))
 
-    def _yaml_include_representer(self, loader: Any, node: yaml.Node) -> Any:
+    def _yaml_include_representer(self, loader: Any, node: 'yaml.Node') -> Any:
         """ Handler for the '!include' operator in YAML files.
 
             When the filename is relative, then the file is first searched in the
@@ -373,4 +377,6 @@ class Configuration:
                       configfile)
             raise UsageError("Cannot handle config file format.")
 
+        import yaml
+
         return yaml.safe_load(configfile.read_text(encoding='utf-8'))
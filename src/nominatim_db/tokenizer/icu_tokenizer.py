@@ -28,6 +28,18 @@ from . import icu_types as itype
 
 LOG = logging.getLogger()
 
+# Partial words appearing in at least this many places get statistics
+# about the other frequent partial words they appear together with.
+PAIR_MIN_WORD_COUNT = 10000
+# Minimum number of places a pair of partial words must share to be recorded.
+PAIR_MIN_COUNT = 500
+# Maximum number of pairs recorded for each partial word.
+PAIR_MAX_PER_WORD = 100
+# Number of rows of search_name sampled for computing the pair statistics.
+PAIR_SAMPLE_SIZE = 1000000
+# Maximum number of frequent partial words per sampled row taken into account.
+PAIR_MAX_WORDS_PER_ROW = 10
+
 
 def create(dsn: str) -> 'ICUTokenizer':
     """ Create a new instance of the tokenizer provided by this module.
@@ -125,6 +137,12 @@ class ICUTokenizer(AbstractTokenizer):
                   FROM word_freq w FULL JOIN addr_freq a ON a.id = w.id;
                   """)
                 cur.execute('CREATE UNIQUE INDEX ON word_frequencies(id) INCLUDE(info)')
+                LOG.info('Computing frequencies of frequent word pairs')
+                scale = self._sample_search_name(cur)
+                self._add_pair_frequencies(cur, 'name_vector', 'count', 'pairs', scale)
+                self._add_pair_frequencies(cur, 'nameaddress_vector', 'addr_count',
+                                           'addr_pairs', scale)
+                drop_tables(conn, 'tmp_pair_sample', 'tmp_pair_words')
                 cur.execute('ANALYSE word_frequencies')
                 LOG.info('Update word table with recomputed frequencies')
                 drop_tables(conn, 'tmp_word')
@@ -132,7 +150,8 @@ class ICUTokenizer(AbstractTokenizer):
                 cur.execute("""INSERT INTO tmp_word
                                 SELECT word_id, word_token, type, word,
                                        coalesce(word.info, '{}'::jsonb)
-                                       - 'count' - 'addr_count' ||
+                                       - 'count' - 'addr_count'
+                                       - 'pairs' - 'addr_pairs' ||
                                        coalesce(wf.info, '{}'::jsonb)
                                        as info
                                 FROM word LEFT JOIN word_frequencies wf
@@ -151,6 +170,80 @@ class ICUTokenizer(AbstractTokenizer):
         self._create_lookup_indices(config, 'tmp_word')
         self._move_temporary_word_table('tmp_word')
 
+    def _sample_search_name(self, cur: Cursor) -> float:
+        """ Copy a random sample of about PAIR_SAMPLE_SIZE rows of the
+            search_name table into the temporary table 'tmp_pair_sample'.
+            Returns the factor by which counts over the sample need to be
+            multiplied to estimate the counts over the full table.
+        """
+        cur.execute("SELECT reltuples FROM pg_class WHERE oid = 'search_name'::regclass")
+        row = cur.fetchone()
+        total = max(row[0] if row is not None else 0, 1)
+        percent = min(100.0, 100.0 * PAIR_SAMPLE_SIZE / total)
+
+        cur.execute('DROP TABLE IF EXISTS tmp_pair_sample')
+        cur.execute(pysql.SQL("""CREATE TEMP TABLE tmp_pair_sample AS
+                                   SELECT name_vector, nameaddress_vector
+                                     FROM search_name
+                                          TABLESAMPLE BERNOULLI ({}) REPEATABLE (0)
+                              """).format(pysql.Literal(percent)))
+
+        return 100.0 / percent
+
+    def _add_pair_frequencies(self, cur: Cursor, column: str,
+                              count_key: str, pair_key: str, scale: float) -> None:
+        """ Estimate how often the frequent partial words appear together
+            in the given column of the search_name table. The pairs are
+            counted over the sample in 'tmp_pair_sample' and scaled up by
+            'scale'. Only the first PAIR_MAX_WORDS_PER_ROW frequent words
+            of each row are taken into account. The counts of the most
+            frequent pairs are added to the info of each word in the
+            word_frequencies table under the key 'pair_key'.
+        """
+        cur.execute('DROP TABLE IF EXISTS tmp_pair_words')
+        cur.execute(pysql.SQL("""CREATE TEMP TABLE tmp_pair_words AS
+                                   SELECT wf.id FROM word_frequencies wf
+                                    WHERE (wf.info->>{})::int >= %s
+                                          AND EXISTS(SELECT * FROM word
+                                                     WHERE word_id = wf.id and type = 'w')
+                              """).format(pysql.Literal(count_key)),
+                    (PAIR_MIN_WORD_COUNT, ))
+        if cur.rowcount < 2:
+            return
+        cur.execute('ALTER TABLE tmp_pair_words ADD PRIMARY KEY (id)')
+        cur.execute('ANALYSE tmp_pair_words')
+
+        sql = pysql.SQL("""
+            WITH sample_words AS (
+                   SELECT array(SELECT v.id
+                                  FROM unnest(s.{column}) WITH ORDINALITY v(id, pos)
+                                 WHERE EXISTS(SELECT * FROM tmp_pair_words f WHERE f.id = v.id)
+                                 ORDER BY v.pos
+                                 LIMIT %(max_words)s) as ids
+                     FROM tmp_pair_sample s
+                    WHERE cardinality(s.{column}) > 1),
+                 pair_counts AS (
+                   SELECT w1, w2, round(count(*) * %(scale)s)::int as count
+                     FROM sample_words s, unnest(s.ids) as w1, unnest(s.ids) as w2
+                    WHERE w1 != w2
+                    GROUP BY w1, w2)
+            UPDATE word_frequencies wf
+               SET info = wf.info || jsonb_build_object({pair_key}, p.pairs)
+              FROM (SELECT w1 as id, jsonb_object_agg(w2, count) as pairs
+                      FROM (SELECT w1, w2, count,
+                                   row_number() OVER (PARTITION BY w1
+                                                      ORDER BY count DESC, w2) as rank
+                              FROM pair_counts
+                             WHERE count >= %(min_count)s) r
+                     WHERE rank <= %(max_pairs)s
+                     GROUP BY w1) p
+             WHERE wf.id = p.id
+            """)
+        cur.execute(sql.format(pair_key=pysql.Literal(pair_key),
+                               column=pysql.Identifier(column)),
+                    {'scale': scale, 'max_words': PAIR_MAX_WORDS_PER_ROW,
+                     'min_count': PAIR_MIN_COUNT, 'max_pairs': PAIR_MAX_PER_WORD})
+
     def _cleanup_housenumbers(self) -> None:
         """ Remove unused house numbers.
         """
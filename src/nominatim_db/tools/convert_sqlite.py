@@ -7,9 +7,12 @@
 """
 Exporting a Nominatim database to SQlite.
 """
-from typing import Set, Any, Optional, Union
+from typing import Set, Any, Optional, Union, List, Tuple, Callable, Sequence
+import asyncio
+import contextlib
 import datetime as dt
 import logging
+import time
 from pathlib import Path
 
 import sqlalchemy as sa
@@ -18,16 +21,35 @@ import nominatim_api as napi
 from nominatim_api.search.query_analyzer_factory import make_query_analyzer
 from nominatim_api.typing import SaSelect, SaRow
 from nominatim_api.sql.sqlalchemy_types import Geometry, IntArray
+from nominatim_api.sql.sqlite_functions import encode_int_array
 
 LOG = logging.getLogger()
 
+# Settings for the output database in bulk mode. The database file
+# is unusable, when the export is interrupted.
+BULK_PRAGMAS = ('PRAGMA journal_mode = OFF',
+                'PRAGMA synchronous = OFF',
+                'PRAGMA cache_size = -1048576')  # 1GB
+
+# Number of rows read from the source and inserted in a single call in bulk mode.
+BULK_PARTITION_SIZE = 50000
+
+# Interval in seconds in which to report progress in bulk mode.
+PROGRESS_INTERVAL = 10
+
 
 async def convert(project_dir: Optional[Union[str, Path]],
-                  outfile: Path, options: Set[str]) -> None:
+                  outfile: Path, options: Set[str],
+                  bulk: bool = False, threads: int = 1) -> None:
     """ Export an existing database to sqlite. The resulting database
         will be usable against the Python frontend of Nominatim.
+
+        In bulk mode, the tables are read with 'threads' parallel
+        connections and written with raw inserts without a journal.
     """
-    api = napi.NominatimAPIAsync(project_dir)
+    threads = max(threads, 1) if bulk else 1
+    api = napi.NominatimAPIAsync(project_dir, {'NOMINATIM_API_POOL_SIZE': str(threads)}
+                                 if threads > 1 else None)
 
     try:
         outapi = napi.NominatimAPIAsync(project_dir,
@@ -35,8 +57,14 @@ async def convert(project_dir: Optional[Union[str, Path]],
                                          'NOMINATIM_DATABASE_RW': '1'})
 
         try:
-            async with api.begin() as src, outapi.begin() as dest:
-                writer = SqliteWriter(src, dest, options)
+            async with contextlib.AsyncExitStack() as stack:
+                src = await stack.enter_async_context(api.begin())
+                dest = await stack.enter_async_context(outapi.begin())
+                readers = [src]
+                for _ in range(threads - 1):
+                    readers.append(await stack.enter_async_context(api.begin()))
+
+                writer = SqliteWriter(src, dest, options, readers if bulk else None)
                 await writer.write()
         finally:
             await outapi.close()
@@ -46,27 +74,58 @@ async def convert(project_dir: Optional[Union[str, Path]],
 
 class SqliteWriter:
     """ Worker class which creates a new SQLite database.
+
+        When a list of reader connections to the source database is
+        given, the data is copied in bulk mode.
     """
 
     def __init__(self, src: napi.SearchConnection,
-                 dest: napi.SearchConnection, options: Set[str]) -> None:
+                 dest: napi.SearchConnection, options: Set[str],
+                 bulk_readers: Optional[List[napi.SearchConnection]] = None) -> None:
         self.src = src
         self.dest = dest
         self.options = options
+        self.bulk_readers = bulk_readers
 
     async def write(self) -> None:
         """ Create the database structure and copy the data from
             the source database to the destination.
         """
+        if self.bulk_readers:
+            await self.share_snapshot(self.bulk_readers)
+            for pragma in BULK_PRAGMAS:
+                await self.dest.connection.exec_driver_sql(pragma)
+
         LOG.warning('Setting up spatialite')
         await self.dest.execute(sa.select(sa.func.InitSpatialMetaData(True, 'WGS84')))
 
         await self.create_tables()
-        await self.copy_data()
+        if self.bulk_readers:
+            await self.copy_data_bulk(self.bulk_readers)
+        else:
+            await self.copy_data()
         if 'search' in self.options:
             await self.create_word_table()
         await self.create_indexes()
 
+    async def share_snapshot(self, readers: List[napi.SearchConnection]) -> None:
+        """ Make all reader connections see the same state of the source
+            database, so that the tables copied in parallel are consistent
+            with each other. Must be called before any other query is run
+            on the readers.
+        """
+        if len(readers) < 2:
+            return
+
+        for conn in readers:
+            await conn.connection.exec_driver_sql(
+                'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+
+        snapshot = await readers[0].scalar(sa.select(sa.func.pg_export_snapshot()))
+
+        for conn in readers[1:]:
+            await conn.connection.exec_driver_sql(f"SET TRANSACTION SNAPSHOT '{snapshot}'")
+
     async def create_tables(self) -> None:
         """ Set up the database tables.
         """
@@ -122,24 +181,78 @@ class SqliteWriter:
     async def copy_data(self) -> None:
         """ Copy data for all registered tables.
         """
-        def _getfield(row: SaRow, key: str) -> Any:
+        def _getfield(row: SaRow, key: str, arrays: Set[str]) -> Any:
             value = getattr(row, key)
             if isinstance(value, dt.datetime):
                 if value.tzinfo is not None:
                     value = value.astimezone(dt.timezone.utc)
+            elif key in arrays and value is not None:
+                value = encode_int_array(value)
             return value
 
         for table in self.dest.t.meta.sorted_tables:
             LOG.warning("Copying '%s'", table.name)
+            arrays = {c.name for c in table.c if isinstance(c.type, IntArray)}
             async_result = await self.src.connection.stream(self.select_from(table.name))
 
             async for partition in async_result.partitions(10000):
-                data = [{('class_' if k == 'class' else k): _getfield(r, k)
+                data = [{('class_' if k == 'class' else k): _getfield(r, k, arrays)
                          for k in r._fields}
                         for r in partition]
                 await self.dest.execute(table.insert(), data)
 
-        # Set up a minimal copy of pg_tables used to look up the class tables later.
+        await self.create_pg_tables()
+
+    async def copy_data_bulk(self, readers: List[napi.SearchConnection]) -> None:
+        """ Copy data for all registered tables in bulk mode. The tables
+            are read in parallel with the given connections. The rows are
+            written with prepared statements, bypassing the SQL expression
+            layer of SQLAlchemy.
+        """
+        queue: 'asyncio.Queue[Tuple[str, List[Tuple[Any, ...]]]]' = \
+            asyncio.Queue(maxsize=2 * len(readers))
+        tables = list(reversed(self.dest.t.meta.sorted_tables))
+        dialect = self.dest.connection.dialect
+
+        async def _read(src: napi.SearchConnection) -> None:
+            while tables:
+                table = tables.pop()
+                LOG.warning("Copying '%s'", table.name)
+                async_result = await src.connection.stream(self.select_from(table.name))
+                insert: Optional[_BulkInsert] = None
+                async for partition in async_result.partitions(BULK_PARTITION_SIZE):
+                    if insert is None:
+                        insert = _BulkInsert(table, partition[0]._fields, dialect)
+                    await queue.put((insert.sql, insert.convert(partition)))
+
+        tasks = [asyncio.create_task(_read(src)) for src in readers]
+        all_read = asyncio.gather(*tasks)
+        progress = _BulkProgress()
+
+        try:
+            while not (all_read.done() and queue.empty()):
+                next_rows = asyncio.ensure_future(queue.get())
+                await asyncio.wait((next_rows, all_read), return_when=asyncio.FIRST_COMPLETED)
+                if not next_rows.done():
+                    next_rows.cancel()
+                    all_read.result()  # raises errors from the readers
+                    continue
+
+                sql, rows = next_rows.result()
+                await self.dest.connection.exec_driver_sql(sql, rows)
+                progress.add(len(rows))
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        progress.done()
+
+        await self.create_pg_tables()
+
+    async def create_pg_tables(self) -> None:
+        """ Set up a minimal copy of pg_tables used to look up the class tables later.
+        """
         pg_tables = sa.Table('pg_tables', self.dest.t.meta,
                              sa.Column('schemaname', sa.Text, default='public'),
                              sa.Column('tablename', sa.Text))
@@ -223,12 +336,10 @@ class SqliteWriter:
 
             async_result = await self.src.connection.stream(sql)
             async for partition in async_result.partitions(100):
-                data = []
-                for row in partition:
-                    row.places.sort()
-                    data.append({'word': row.word,
-                                 'column': column,
-                                 'places': row.places})
+                data = [{'word': row.word,
+                         'column': column,
+                         'places': encode_int_array(row.places)}
+                        for row in partition]
                 await self.dest.execute(rsn.insert(), data)
 
         await self.dest.connection.run_sync(
@@ -255,3 +366,77 @@ class SqliteWriter:
                         if isinstance(c.type, Geometry) else c for c in columns))
 
         return sql
+
+
+class _BulkInsert:
+    """ Prepared insert statement for copying rows of a source table
+        into the SQLite table in bulk mode.
+    """
+
+    def __init__(self, table: sa.Table, fields: Sequence[str], dialect: 'sa.Dialect') -> None:
+        columns = {}
+        for i, field in enumerate(fields):
+            column = table.c['class_' if field == 'class' else field]
+            columns[column.key] = (i, column)
+        stmt = table.insert().values({k: sa.bindparam(k, type_=c.type)
+                                      for k, (_, c) in columns.items()})
+        compiled = stmt.compile(dialect=dialect)
+        self.sql = str(compiled)
+        # The compiled statement lists the columns in the order of the
+        # table, which differs from the order of the fields in the source.
+        assert compiled.positiontup is not None
+        self.positions = [columns[k][0] for k in compiled.positiontup]
+        self.converters = [_make_converter(columns[k][1], dialect)
+                           for k in compiled.positiontup]
+
+    def convert(self, rows: Sequence[SaRow]) -> List[Tuple[Any, ...]]:
+        """ Convert the source rows into parameters for the insert statement.
+        """
+        return [tuple(conv(row[i]) for conv, i in zip(self.converters, self.positions))
+                for row in rows]
+
+
+def _make_converter(column: 'sa.Column[Any]', dialect: 'sa.Dialect') -> Callable[[Any], Any]:
+    """ Return a function that converts a value from the source database
+        into the parameter for the given column of the SQLite database.
+    """
+    if isinstance(column.type, IntArray):
+        return lambda v: None if v is None else encode_int_array(v)
+
+    process = column.type.dialect_impl(dialect).bind_processor(dialect)
+
+    if isinstance(column.type, sa.DateTime):
+        def _convert_date(value: Any) -> Any:
+            if isinstance(value, dt.datetime) and value.tzinfo is not None:
+                value = value.astimezone(dt.timezone.utc)
+            return value if process is None else process(value)
+        return _convert_date
+
+    return process or (lambda v: v)
+
+
+class _BulkProgress:
+    """ Reports the number of copied rows per second in bulk mode.
+    """
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.start_time = time.monotonic()
+        self.next_report = self.start_time + PROGRESS_INTERVAL
+
+    def add(self, num: int) -> None:
+        """ Count 'num' newly copied rows.
+        """
+        self.total += num
+        now = time.monotonic()
+        if now >= self.next_report:
+            LOG.warning("Copied %d rows (%.0f rows/s)", self.total,
+                        self.total / (now - self.start_time))
+            self.next_report = now + PROGRESS_INTERVAL
+
+    def done(self) -> None:
+        """ Print the final statistics.
+        """
+        elapsed = time.monotonic() - self.start_time
+        LOG.warning("Copied %d rows in %.0fs (%.0f rows/s)", self.total, elapsed,
+                    self.total / elapsed if elapsed > 0 else self.total)
@@ -248,3 +248,37 @@ def invalidate_osm_object(osm_type: str, osm_id: int, conn: Connection,
                      WHERE osm_type = %s and osm_id = %s"""
 
         cur.execute(sql, (osm_type, osm_id))
+
+
+async def create_word_dictionary(project_dir: Path, filename: Path) -> int:
+    """ Write the content of the word table into a word dictionary file
+        for the search frontend. Returns the number of rows written.
+    """
+    import sqlalchemy as sa
+    import nominatim_api as napi
+    from nominatim_api.search.query_analyzer_factory import make_query_analyzer
+    from nominatim_api.search.word_dictionary import WordDictionaryBuilder
+
+    api = napi.NominatimAPIAsync(project_dir)
+    try:
+        async with api.begin() as conn:
+            await make_query_analyzer(conn)
+            t = conn.t.meta.tables['word']
+            token: sa.ColumnElement[Any] = t.c.word_token
+            if conn.connection.dialect.name == 'postgresql':
+                # Rows must come in the byte order of the tokens.
+                token = token.collate('C')
+
+            builder = WordDictionaryBuilder()
+            sql = sa.select(t.c.word_id, t.c.word_token, t.c.type, t.c.word, t.c.info)\
+                    .where(t.c.type != 'P').order_by(token)
+            async_result = await conn.connection.stream(sql)
+            async for partition in async_result.partitions(10000):
+                for row in partition:
+                    builder.add(row.word_id, row.word_token, row.type, row.word, row.info)
+
+            builder.write(filename, await conn.get_data_version())
+    finally:
+        await api.close()
+
+    return len(builder.word_ids)
@@ -29,9 +29,10 @@ FakeResponse = namedtuple('FakeResponse', ['status', 'output', 'content_type'])
 
 class FakeAdaptor(glue.ASGIAdaptor):
 
-    def __init__(self, params=None, headers=None, config=None):
+    def __init__(self, params=None, headers=None, config=None, body=b''):
         self.params = params or {}
         self.headers = headers or {}
+        self.body = body
         self._config = config or Configuration(None)
 
     def get(self, name, default=None):
@@ -40,6 +41,9 @@ class FakeAdaptor(glue.ASGIAdaptor):
     def get_header(self, name, default=None):
         return self.headers.get(name, default)
 
+    async def get_body(self):
+        return self.body
+
     def error(self, msg, status=400):
         return FakeError(msg, status)
 
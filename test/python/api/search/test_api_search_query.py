@@ -135,3 +135,27 @@ def test_query_struct_amenity_two_words():
     assert q.nodes[1].partial.token == 1
     assert len(q.get_tokens(query.TokenRange(1, 2), query.TOKEN_NEAR_ITEM)) == 0
     assert len(q.get_tokens(query.TokenRange(1, 2), query.TOKEN_QUALIFIER)) == 1
+
+
+def test_query_struct_clone_is_independent():
+    q = query.QueryStruct([query.Phrase(query.PHRASE_ANY, 'foo bar')])
+    q.add_node(query.BREAK_WORD, query.PHRASE_ANY)
+    q.add_node(query.BREAK_END, query.PHRASE_ANY)
+    q.add_token(query.TokenRange(0, 1), query.TOKEN_PARTIAL, mktoken(1))
+    q.add_token(query.TokenRange(0, 2), query.TOKEN_WORD, mktoken(2))
+    q.dir_penalty = 0.5
+
+    clone = q.clone()
+
+    assert clone.dir_penalty == 0.5
+    assert clone.num_token_slots() == 2
+    assert clone.nodes[0].partial.token == 1
+    assert clone.get_tokens(query.TokenRange(0, 2), query.TOKEN_WORD)[0].token == 2
+
+    clone.nodes[0].partial.penalty += 1.0
+    clone.nodes[0].starting[0].add_penalty(1.0)
+    clone.add_token(query.TokenRange(1, 2), query.TOKEN_WORD, mktoken(3))
+
+    assert q.nodes[0].partial.penalty == 3.0
+    assert q.get_tokens(query.TokenRange(0, 2), query.TOKEN_WORD)[0].penalty == 3.0
+    assert not q.get_tokens(query.TokenRange(1, 2), query.TOKEN_WORD)
@@ -0,0 +1,98 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of Nominatim. (https://nominatim.org)
+#
+# Copyright (C) 2026 by the Nominatim developer community.
+# For a full list of authors see the git log.
+"""
+Comparison of search on the PostgreSQL and the SQLite backend.
+
+The same queries are run against the test database and its SQLite
+export. The tests check that both backends return the same places.
+The benchmark additionally records the time spent in each backend
+as test properties. It only runs with '--run-benchmarks'.
+"""
+import time
+
+import pytest
+
+import nominatim_api as napi
+import nominatim_api.logging as loglib
+from nominatim_db.tools import convert_sqlite
+
+BENCHMARK_PLACES = 500
+REPEAT = 5
+
+QUERIES = ['main street', 'main street, berlin', 'hill main street', 'paris', 'hill, paris']
+
+
+def _add_places(apiobj, num_places):
+    apiobj.add_data('properties',
+                    [{'property': 'tokenizer', 'value': 'icu'},
+                     {'property': 'tokenizer_import_normalisation', 'value': ':: lower();'},
+                     {'property': 'tokenizer_import_transliteration',
+                      'value': "'1' > '/1/'; 'ä' > 'ä '"}])
+    apiobj.add_word_table([(1, 'main', 'w', 'main', {'count': num_places}),
+                           (2, 'street', 'w', 'street', {'count': num_places}),
+                           (3, 'hill', 'w', 'hill', {'count': num_places // 10}),
+                           (10, 'berlin', 'w', 'berlin', {'count': num_places // 2}),
+                           (11, 'paris', 'w', 'paris', {'count': num_places // 2}),
+                           (20, 'main street', 'W', 'main street', None),
+                           (21, 'berlin', 'W', 'berlin', None),
+                           (22, 'paris', 'W', 'paris', None)])
+
+    for place_id in range(1000, 1000 + num_places):
+        town = [10, 21] if place_id % 2 else [11, 22]
+        names = [1, 2, 20] + ([3] if place_id % 10 == 0 else [])
+        centroid = (10.0 + place_id / 1000, 50.0)
+        apiobj.add_placex(place_id=place_id, osm_id=place_id,
+                          class_='highway', type='residential',
+                          name='main street', rank_search=26, rank_address=26,
+                          importance=place_id / 100000, centroid=centroid)
+        apiobj.add_search_name(place_id, names=names, address=town,
+                               importance=place_id / 100000, search_rank=26,
+                               address_rank=26, centroid=centroid)
+
+
+def _sqlite_api(apiobj, tmp_path):
+    db = tmp_path / 'export.sqlite'
+    apiobj.async_to_sync(convert_sqlite.convert(None, db, {'search'}))
+    # Debug output would dominate the timings.
+    loglib.get_and_disable()
+
+    return napi.NominatimAPI(environ={'NOMINATIM_DATABASE_DSN': f"sqlite:dbname={db}"})
+
+
+def _run_queries(api, repeat=1):
+    results = {}
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in QUERIES:
+            results[query] = {r.place_id for r in api.search(query, max_results=50)}
+
+    return results, time.perf_counter() - start
+
+
+def test_backends_return_same_places(apiobj, tmp_path):
+    _add_places(apiobj, 20)
+
+    with _sqlite_api(apiobj, tmp_path) as sqlite_api:
+        pg_results, _ = _run_queries(apiobj.api)
+        sqlite_results, _ = _run_queries(sqlite_api)
+
+    assert pg_results == sqlite_results
+    assert pg_results['main street']
+
+
+@pytest.mark.benchmark
+def test_compare_backends(apiobj, tmp_path, record_property):
+    _add_places(apiobj, BENCHMARK_PLACES)
+
+    with _sqlite_api(apiobj, tmp_path) as sqlite_api:
+        pg_results, pg_time = _run_queries(apiobj.api, REPEAT)
+        sqlite_results, sqlite_time = _run_queries(sqlite_api, REPEAT)
+
+    record_property('postgresql_seconds', pg_time)
+    record_property('sqlite_seconds', sqlite_time)
+
+    assert pg_results == sqlite_results
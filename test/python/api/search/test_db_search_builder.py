@@ -467,3 +467,54 @@ def test_too_frequent_partials_in_name_and_address():
 
     assert set((s.column, s.lookup_type.__name__) for s in searches[0].lookups) == \
         {('name_vector', 'LookupAny'), ('nameaddress_vector', 'Restrict')}
+
+
+@dataclasses.dataclass
+class PairToken(MyToken):
+    pairs: Optional[dict] = None
+
+    def get_pair_count(self, other, count_column):
+        return (self.pairs or {}).get(other)
+
+
+def make_frequent_name_searches(pairs):
+    q = QueryStruct([Phrase(qmod.PHRASE_ANY, '')])
+    for _ in range(3):
+        q.add_node(qmod.BREAK_WORD, qmod.PHRASE_ANY)
+    q.add_node(qmod.BREAK_END, qmod.PHRASE_ANY)
+
+    for i in range(3):
+        q.add_token(TokenRange(i, i + 1), qmod.TOKEN_PARTIAL,
+                    PairToken(0.5, i + 1, 40000 + i, 1, f'part{i}',
+                              pairs=pairs.get(i + 1)))
+
+    builder = SearchBuilder(q, SearchDetails())
+
+    return list(builder.build(TokenAssignment(name=TokenRange(0, 3))))
+
+
+def test_frequent_partials_without_pair_statistics():
+    searches = make_frequent_name_searches({})
+
+    assert len(searches) == 1
+    lookup = searches[0].lookups[0]
+    assert lookup.lookup_type.__name__ == 'LookupAll'
+    assert lookup.tokens == [1, 2]
+
+
+def test_frequent_partials_use_most_restrictive_pair():
+    searches = make_frequent_name_searches({1: {2: 39000, 3: 35000}, 2: {3: 500}})
+
+    assert len(searches) == 1
+    lookup = searches[0].lookups[0]
+    assert lookup.lookup_type.__name__ == 'LookupAll'
+    assert lookup.tokens == [2, 3]
+    assert searches[0].expected_count == 100
+
+
+def test_frequent_partials_with_frequent_pairs():
+    searches = make_frequent_name_searches({1: {2: 39000, 3: 39000}, 2: {3: 39000}})
+
+    assert len(searches) == 1
+    lookup = searches[0].lookups[0]
+    assert lookup.tokens == [1, 2, 3]
@@ -7,14 +7,18 @@
 """
 Tests for query analyzer for ICU tokenizer.
 """
+import datetime as dt
+
 import pytest
 import pytest_asyncio
+from icu import Transliterator
 
 from nominatim_api import NominatimAPIAsync
 from nominatim_api.search.query import Phrase
 import nominatim_api.search.query as qmod
 import nominatim_api.search.icu_tokenizer as tok
 from nominatim_api.logging import set_log_output, get_and_disable
+from nominatim_api.utils.cache import LRUCache
 
 
 async def add_word(conn, word_id, word_token, wtype, word, info=None):
@@ -30,6 +34,22 @@ def make_phrase(query):
     return [Phrase(qmod.PHRASE_ANY, s) for s in query.split(',')]
 
 
+class CountingTransliterator:
+    """ Transliterator that counts the calls and the number of
+        characters transliterated.
+    """
+
+    def __init__(self, rules):
+        self.trans = Transliterator.createFromRules("test", rules)
+        self.calls = 0
+        self.chars = 0
+
+    def transliterate(self, text):
+        self.calls += 1
+        self.chars += len(text)
+        return self.trans.transliterate(text)
+
+
 @pytest_asyncio.fixture
 async def conn(table_factory):
     """ Create an asynchronous SQLAlchemy engine for the test DB.
@@ -40,6 +60,10 @@ async def conn(table_factory):
                            ('tokenizer_import_transliteration', "'1' > '/1/'; 'ä' > 'ä '")))
     table_factory('word',
                   definition='word_id INT, word_token TEXT, type TEXT, word TEXT, info JSONB')
+    table_factory('import_status',
+                  definition='lastimportdate timestamp with time zone, sequence_id integer,'
+                             ' indexed boolean',
+                  content=((dt.datetime(2022, 12, 7, tzinfo=dt.timezone.utc), None, True),))
 
     async with NominatimAPIAsync() as api:
         async with api.begin() as conn:
@@ -102,6 +126,28 @@ async def test_splitting_in_transliteration(conn):
     assert query.nodes[1].btype == qmod.BREAK_TOKEN
 
 
+@pytest.mark.asyncio
+async def test_repeated_query_taken_from_cache(conn):
+    ana = await tok.create_query_analyzer(conn)
+
+    await add_word(conn, 1, 'foo', 'w', 'FOO')
+
+    query1 = await ana.analyze_query(make_phrase('foo'))
+    await add_word(conn, 2, 'foo', 'W', 'FOO')
+    query2 = await ana.analyze_query(make_phrase('FOO'))
+
+    assert query2 is not query1
+    assert query2.num_token_slots() == 1
+    assert query2.nodes[0].partial.token == 1
+    assert not query2.nodes[0].starting
+    assert ana.query_cache.stats()['hits'] == 1
+
+    query2.nodes[0].partial.penalty += 1.0
+    query3 = await ana.analyze_query(make_phrase('foo'))
+
+    assert query3.nodes[0].partial.penalty == query1.nodes[0].partial.penalty
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize('term,order', [('23456', ['P', 'H', 'W']),
                                         ('3', ['H', 'W'])])
@@ -200,3 +246,237 @@ async def test_log_output(conn, logtype):
     await ana.analyze_query(make_phrase('foo'))
 
     assert get_and_disable()
+
+
+@pytest.mark.asyncio
+async def test_word_cache_serves_repeated_lookups(conn):
+    ana = await tok.create_query_analyzer(conn)
+
+    await add_word(conn, 1, 'foo', 'w', 'FOO')
+
+    await ana.analyze_query(make_phrase('foo bar'))
+    stats = ana.word_cache.stats()
+    assert stats['hits'] == 0
+    assert stats['misses'] == 2
+
+    query = await ana.analyze_query(make_phrase('foo bar'))
+    stats = ana.word_cache.stats()
+    assert stats['hits'] == 2
+    assert stats['misses'] == 2
+
+    assert query.nodes[0].partial.token == 1
+    assert query.nodes[1].partial is None
+
+
+@pytest.mark.asyncio
+async def test_word_cache_invalidated_on_data_update(conn, monkeypatch):
+    monkeypatch.setenv('NOMINATIM_API_CACHE_CHECK_INTERVAL', '0')
+    ana = await tok.create_query_analyzer(conn)
+
+    query = await ana.analyze_query(make_phrase('foo'))
+    assert query.nodes[0].partial is None
+
+    await add_word(conn, 1, 'foo', 'w', 'FOO')
+
+    query = await ana.analyze_query(make_phrase('foo'))
+    assert query.nodes[0].partial is None
+
+    t = conn.t.import_status
+    await conn.execute(t.update().values(
+        lastimportdate=dt.datetime(2023, 1, 1, tzinfo=dt.timezone.utc)))
+
+    query = await ana.analyze_query(make_phrase('foo'))
+    assert query.nodes[0].partial.token == 1
+
+
+@pytest.mark.asyncio
+async def test_word_cache_disabled(conn, monkeypatch):
+    monkeypatch.setenv('NOMINATIM_API_WORD_CACHE_SIZE', '0')
+    ana = await tok.create_query_analyzer(conn)
+
+    await ana.analyze_query(make_phrase('foo'))
+    await add_word(conn, 1, 'foo', 'w', 'FOO')
+    query = await ana.analyze_query(make_phrase('foo'))
+
+    assert query.nodes[0].partial.token == 1
+    assert len(ana.word_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_prefetch_words(conn, monkeypatch):
+    monkeypatch.setenv('NOMINATIM_API_WORD_CACHE_SIZE', '0')
+    ana = await tok.create_query_analyzer(conn)
+
+    await add_word(conn, 1, 'foo', 'w', 'FOO')
+    await add_word(conn, 2, 'bar', 'w', 'BAR')
+
+    await ana.prefetch_words([make_phrase('foo'), make_phrase('bar baz')])
+
+    assert set(ana.prefetched) == {'foo', 'bar', 'baz', 'bar baz'}
+
+    async def _no_db(*args):
+        raise AssertionError('Word table must not be queried.')
+
+    monkeypatch.setattr(ana, '_query_word_table', _no_db)
+
+    query = await ana.analyze_query(make_phrase('bar'))
+    assert query.nodes[0].partial.token == 2
+
+
+@pytest.mark.asyncio
+async def test_prefix_query_completes_last_word(conn):
+    ana = await tok.create_query_analyzer(conn)
+
+    await add_word(conn, 1, 'foo', 'w', 'foo')
+    await add_word(conn, 2, 'barcelona', 'w', 'barcelona', {'count': 10})
+    await add_word(conn, 3, 'barmbek', 'w', 'barmbek', {'count': 100})
+    await add_word(conn, 4, 'baz', 'w', 'baz')
+
+    queries = await ana.analyze_prefix_query(make_phrase('foo bar'), 5)
+
+    assert [q.nodes[1].term_lookup for q in queries] == ['barmbek', 'barcelona']
+    for query in queries:
+        assert query.num_token_slots() == 2
+        assert query.nodes[0].partial.token == 1
+        assert query.nodes[1].partial.penalty >= tok.PENALTY_COMPLETION
+
+
+@pytest.mark.asyncio
+async def test_prefix_query_keeps_known_word(conn):
+    ana = await tok.create_query_analyzer(conn)
+
+    await add_word(conn, 1, 'bar', 'w', 'bar')
+    await add_word(conn, 2, 'barmbek', 'w', 'barmbek', {'count': 100})
+
+    queries = await ana.analyze_prefix_query(make_phrase('bar'), 1)
+
+    assert [q.nodes[0].term_lookup for q in queries] == ['bar']
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('term', ['ba', '123'])
+async def test_prefix_query_short_terms_not_completed(conn, term):
+    ana = await tok.create_query_analyzer(conn)
+
+    await add_word(conn, 1, 'bar', 'w', 'bar')
+    await add_word(conn, 2, '1234', 'w', '1234')
+
+    queries = await ana.analyze_prefix_query(make_phrase(term), 5)
+
+    assert len(queries) == 1
+    assert queries[0].nodes[0].term_lookup == term
+
+
+def make_analyzer(rules, cache_size=100):
+    trans = CountingTransliterator(rules)
+    config = tok.ICUAnalyzerConfig(
+        postcode_parser=None,
+        normalizer=tok.CachedTransliterator(CountingTransliterator(':: lower();'),
+                                            LRUCache(cache_size)),
+        transliterator=tok.CachedTransliterator(trans, LRUCache(cache_size)),
+        word_cache=LRUCache(0),
+        query_cache=LRUCache(0))
+    return tok.ICUQueryAnalyzer(None, config), trans
+
+
+def split_by_prefixes(trans, text, word):
+    """ Reference implementation that transliterates every prefix.
+    """
+    subwords = list(filter(None, text.split(' ')))
+    if len(subwords) == 1:
+        return [(text, word)]
+
+    tlist = []
+    current_word = ''
+    for letter in word:
+        current_word += letter
+        if trans.transliterate(current_word).rstrip() == subwords[0]:
+            tlist.append((subwords.pop(0), current_word))
+            if not subwords:
+                return tlist
+            current_word = ''
+
+    if current_word:
+        tlist.append((subwords[0], current_word))
+
+    return tlist
+
+
+ICU_RULES = "'ц' > 'ц '; :: Any-Latin; :: Latin-ASCII; :: Lower();"
+
+
+@pytest.mark.parametrize('rules,word', [(ICU_RULES, '北京市朝阳区'),
+                                        (ICU_RULES, '東京都新宿区'),
+                                        (ICU_RULES, 'улицаЛенина'),
+                                        (ICU_RULES, 'Царицыно'),
+                                        (ICU_RULES, 'проспект'),
+                                        (ICU_RULES, 'mäfo'),
+                                        ("'ab' > 'x '; 'a' > 'y'; 'b' > 'z';", 'abba'),
+                                        ("'ab' > 'xy '; 'a' > 'x'; 'b' > ;", 'aabab'),
+                                        ("'c' > 'c '; 'b' > ;", 'abcbbcab')])
+def test_split_transliteration_same_as_prefix_check(rules, word):
+    ana, _ = make_analyzer(rules)
+    ref = Transliterator.createFromRules("ref", rules)
+    trans = ana.transliterator.transliterate(word)
+
+    assert ana.split_transliteration(trans, word) == split_by_prefixes(ref, trans, word)
+
+
+def test_split_transliteration_context_sensitive_rules():
+    # 'ab' is transliterated differently than its letters on their own.
+    ana, _ = make_analyzer("'ab' > 'x '; 'a' > 'y'; 'b' > 'z';")
+    trans = ana.transliterator.transliterate('abab')
+
+    assert ana.split_transliteration(trans, 'abab') == [('x', 'ab'), ('x', 'ab')]
+
+
+def test_split_transliteration_match_hidden_by_letter_rules():
+    # The transliteration of 'a' is the beginning of the sub-word 'xy',
+    # the sub-word is only complete with 'ab'.
+    ana, _ = make_analyzer("'ab' > 'xy '; 'a' > 'x'; 'b' > ;")
+    trans = ana.transliterator.transliterate('abab')
+
+    assert ana.split_transliteration(trans, 'abab') == [('xy', 'ab'), ('xy', 'ab')]
+
+
+def test_split_transliteration_one_letter_subwords():
+    word = '北京市朝阳区' * 10
+    ana, trans = make_analyzer(ICU_RULES, cache_size=1000)
+
+    parts = ana.split_transliteration(ana.transliterator.transliterate(word), word)
+
+    assert ''.join(p[1] for p in parts) == word
+    assert len(parts) == len(word)
+    # one call for the whole word and one for each sub-word
+    assert trans.calls == 1 + len(word)
+
+
+def test_split_transliteration_long_subwords_not_quadratic():
+    def _split_cost(size):
+        # transliterates to two sub-words with 'size' letters each
+        word = 'а' * size + 'ц' + 'б' * size
+        ana, trans = make_analyzer(ICU_RULES)
+        parts = ana.split_transliteration(ana.transliterator.transliterate(word), word)
+        assert parts == [('a' * size + 'c', 'а' * size + 'ц'), ('b' * size, 'б' * size)]
+        return trans.chars
+
+    # Checking every prefix would quadruple the work when doubling the size.
+    assert _split_cost(400) < 3 * _split_cost(200)
+
+
+def test_split_transliteration_keeps_shared_cache():
+    word = 'улицаЛенина'
+    ana, _ = make_analyzer(ICU_RULES)
+
+    ana.split_transliteration(ana.transliterator.transliterate(word), word)
+
+    assert len(ana.transliterator.cache) == 1
+
+
+def test_transliteration_cache():
+    ana, trans = make_analyzer(ICU_RULES)
+
+    assert ana.transliterator.transliterate('Москва') == 'moskva'
+    assert ana.transliterator.transliterate('Москва') == 'moskva'
+    assert trans.calls == 1
+    assert ana.transliterator.cache.stats()['hits'] == 1
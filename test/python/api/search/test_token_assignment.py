@@ -354,3 +354,18 @@ def test_qualifier_in_middle_of_phrase():
                    (qmod.BREAK_PHRASE, qmod.PHRASE_ANY, [(5, qmod.TOKEN_PARTIAL)]))
 
     check_assignments(yield_token_assignments(q))
+
+
+def test_assignments_ordered_by_penalty():
+    q = make_query((qmod.BREAK_START, qmod.PHRASE_ANY, [(1, qmod.TOKEN_PARTIAL),
+                                                        (1, qmod.TOKEN_HOUSENUMBER)]),
+                   (qmod.BREAK_WORD, qmod.PHRASE_ANY, [(2, qmod.TOKEN_PARTIAL),
+                                                       (2, qmod.TOKEN_POSTCODE)]),
+                   (qmod.BREAK_PART, qmod.PHRASE_ANY, [(3, qmod.TOKEN_PARTIAL)]),
+                   (qmod.BREAK_WORD, qmod.PHRASE_ANY, [(4, qmod.TOKEN_PARTIAL),
+                                                       (4, qmod.TOKEN_COUNTRY)]))
+
+    penalties = [a.penalty for a in yield_token_assignments(q)]
+
+    assert len(penalties) > 5
+    assert penalties == sorted(penalties)
@@ -0,0 +1,149 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of Nominatim. (https://nominatim.org)
+#
+# Copyright (C) 2026 by the Nominatim developer community.
+# For a full list of authors see the git log.
+"""
+Tests for the memory-mapped word dictionary.
+"""
+import datetime as dt
+
+import pytest
+
+from nominatim_api.errors import UsageError
+from nominatim_api.search import word_dictionary
+from nominatim_api.search.word_dictionary import WordDictionary, WordDictionaryBuilder
+
+IMPORT_DATE = dt.datetime(2024, 3, 1, 12, 0, tzinfo=dt.timezone.utc)
+
+
+@pytest.fixture
+def dictionary(tmp_path):
+    builder = WordDictionaryBuilder()
+    builder.add(1, 'bar', 'w', 'bar', {'count': 3})
+    builder.add(2, 'foo', 'W', 'foo', {'count': 12, 'addr_count': 4})
+    builder.add(3, 'foo', 'w', 'foo', None)
+    builder.add(None, 'ködig', 'C', None, {'cc': 'de'})
+    builder.add(4, '北京', 'W', '北京', None)
+    builder.write(tmp_path / 'words.bin', IMPORT_DATE)
+
+    return WordDictionary(tmp_path / 'words.bin')
+
+
+def test_lookup_single_row(dictionary):
+    rows = dictionary.find('bar')
+
+    assert len(rows) == 1
+    assert rows[0].word_id == 1
+    assert rows[0].word_token == 'bar'
+    assert rows[0].type == 'w'
+    assert rows[0].word == 'bar'
+    assert rows[0].info == {'count': 3}
+
+
+def test_lookup_multiple_rows(dictionary):
+    rows = dictionary.find('foo')
+
+    assert [(r.word_id, r.type) for r in rows] == [(2, 'W'), (3, 'w')]
+    assert rows[0].info == {'count': 12, 'addr_count': 4}
+    assert rows[1].info is None
+
+
+def test_lookup_empty_fields(dictionary):
+    rows = dictionary.find('ködig')
+
+    assert len(rows) == 1
+    assert rows[0].word_id is None
+    assert rows[0].word is None
+    assert rows[0].info == {'cc': 'de'}
+
+
+@pytest.mark.parametrize('word', ['', 'a', 'bax', 'fo', 'fooo', 'zzz', '北'])
+def test_lookup_missing_word(dictionary, word):
+    assert dictionary.find(word) == []
+
+
+def test_lookup_many(dictionary):
+    rows = dictionary.lookup(['北京', 'xx', 'bar'])
+
+    assert [r.word_id for r in rows] == [4, 1]
+
+
+def test_data_version(dictionary):
+    assert dictionary.is_current(IMPORT_DATE)
+    assert dictionary.is_current(IMPORT_DATE.astimezone(dt.timezone(dt.timedelta(hours=2))))
+    assert not dictionary.is_current(IMPORT_DATE + dt.timedelta(seconds=1))
+    assert not dictionary.is_current(None)
+
+
+def test_unsorted_rows_rejected():
+    builder = WordDictionaryBuilder()
+    builder.add(1, 'b', 'w', 'b', None)
+
+    with pytest.raises(ValueError):
+        builder.add(2, 'a', 'w', 'a', None)
+
+
+def test_empty_dictionary(tmp_path):
+    WordDictionaryBuilder().write(tmp_path / 'words.bin', None)
+
+    dictionary = WordDictionary(tmp_path / 'words.bin')
+
+    assert len(dictionary) == 0
+    assert dictionary.find('foo') == []
+    assert dictionary.is_current(None)
+
+
+@pytest.mark.parametrize('content', [b'', b'NOMWORDS', b'x' * 100])
+def test_invalid_file(tmp_path, content):
+    (tmp_path / 'words.bin').write_bytes(content)
+
+    with pytest.raises(UsageError):
+        WordDictionary(tmp_path / 'words.bin')
+
+
+@pytest.mark.parametrize('size', [10, 50, -1])
+def test_truncated_file(dictionary, tmp_path, size):
+    content = (tmp_path / 'words.bin').read_bytes()
+    (tmp_path / 'short.bin').write_bytes(content[:size])
+
+    with pytest.raises(UsageError):
+        WordDictionary(tmp_path / 'short.bin')
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(UsageError):
+        WordDictionary(tmp_path / 'words.bin')
+
+
+@pytest.fixture
+def partials(tmp_path, monkeypatch):
+    monkeypatch.setattr(word_dictionary, 'MAX_PREFIX_SCAN', 2)
+
+    builder = WordDictionaryBuilder()
+    for i, (token, wtype, count) in enumerate((('ba', 'w', 5), ('bar', 'W', 100),
+                                               ('bar', 'w', 8), ('barn', 'w', 3),
+                                               ('bas', 'w', 20), ('bb', 'w', 1),
+                                               ('ca', 'w', 9), ('cb', 'w', 9))):
+        builder.add(i, token, wtype, token, {'count': count})
+    builder.write(tmp_path / 'words.bin', IMPORT_DATE)
+
+    return WordDictionary(tmp_path / 'words.bin')
+
+
+@pytest.mark.parametrize('prefix,limit,result',
+                         [('b', 10, ['bas', 'bar', 'ba', 'barn', 'bb']),
+                          ('b', 2, ['bas', 'bar']),
+                          ('ba', 10, ['bas', 'bar', 'ba', 'barn']),
+                          ('bar', 10, ['bar', 'barn']),
+                          ('barn', 1, ['barn']),
+                          ('c', 10, ['ca', 'cb']),
+                          ('bx', 10, []), ('d', 10, [])])
+def test_complete_prefix(partials, prefix, limit, result):
+    assert partials.complete(prefix, limit) == result
+
+
+def test_complete_uses_completion_table(partials):
+    assert len(partials.prefixes) == 4
+    assert partials.complete('b', 10) == ['bas', 'bar', 'ba', 'barn', 'bb']
@@ -7,9 +7,17 @@
 """
 Tests for enhanced connection class for API functions.
 """
+import asyncio
+
 import pytest
 
 import sqlalchemy as sa
+import sqlalchemy.ext.asyncio as sa_asyncio
+
+from nominatim_api import connection
+from nominatim_api.connection import SearchConnection, ForkingConnectionPool
+from nominatim_api.timeout import Timeout
+from nominatim_api.types import QueryStatistics
 
 
 @pytest.mark.asyncio
@@ -79,3 +87,136 @@ async def test_get_db_property_bad_name(api):
     async with api.begin() as conn:
         with pytest.raises(ValueError):
             await conn.get_db_property('dfkgjd.rijg')
+
+
+@pytest.mark.asyncio
+async def test_statement_timeout_cancels_query(api):
+    async with api.begin() as conn:
+        conn.set_query_timeout(1, Timeout(0.2))
+        with QueryStatistics() as qs:
+            with pytest.raises(TimeoutError):
+                await conn.scalar(sa.text('SELECT pg_sleep(5)'))
+
+    assert qs['cancelled_statements'] == 1
+
+
+@pytest.mark.asyncio
+async def test_statement_timeout_follows_request_budget(api):
+    async with api.begin() as conn:
+        conn.set_query_timeout(10, Timeout(2))
+        await conn.scalar(sa.text('SELECT 1'))
+
+        setting = await conn.scalar(sa.text('SHOW statement_timeout'))
+        assert setting != '0'
+
+
+class _FakeDialect:
+    name = 'postgresql'
+
+
+class _FakeConnection:
+    dialect = _FakeDialect()
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, sql):
+        self.statements.append(str(sql))
+
+
+@pytest.mark.asyncio
+async def test_reused_statement_timeout_waits_for_database(monkeypatch):
+    conn = SearchConnection(_FakeConnection(), None, {}, None)
+    conn.set_query_timeout(1)
+    # Left over from a previous statement and still close enough to be reused.
+    conn._statement_timeout = 1900
+
+    deadlines = []
+
+    async def _wait_for(coro, timeout):
+        deadlines.append(timeout)
+        return await coro
+
+    monkeypatch.setattr(asyncio, 'wait_for', _wait_for)
+
+    async def _statement():
+        return 1
+
+    assert await conn._run_with_timeout(_statement) == 1
+
+    assert not conn.connection.statements
+    assert deadlines[0] == pytest.approx(1.9 + connection.STATEMENT_GRACE_TIME)
+
+
+class _QueryCanceled(Exception):
+    sqlstate = '57014'
+
+
+class _AdaptedError(Exception):
+    pass
+
+
+def _asyncpg_cancel_error():
+    # The asyncpg adapter of SQLAlchemy hides the original exception
+    # with the SQL state behind its own error class.
+    try:
+        try:
+            raise _QueryCanceled()
+        except _QueryCanceled as exc:
+            raise _AdaptedError() from exc
+    except _AdaptedError as exc:
+        return sa.exc.DBAPIError('SELECT 1', None, exc)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('error', [sa.exc.OperationalError('SELECT 1', None, _QueryCanceled()),
+                                   _asyncpg_cancel_error()])
+async def test_database_cancel_becomes_timeout(error):
+    conn = SearchConnection(None, None, {}, None)
+
+    async def _fail():
+        raise error
+
+    with QueryStatistics() as qs:
+        with pytest.raises(TimeoutError):
+            await conn._run_with_timeout(_fail)
+
+    assert qs['cancelled_statements'] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_task_is_not_counted():
+    conn = SearchConnection(None, None, {}, None)
+
+    async def _cancel():
+        raise asyncio.CancelledError()
+
+    with QueryStatistics() as qs:
+        with pytest.raises(asyncio.CancelledError):
+            await conn._run_with_timeout(_cancel)
+
+    assert not qs['cancelled_statements']
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('pool_size,forked', [(1, False), (2, True)])
+async def test_fork_does_not_wait_for_connection(tmp_path, pool_size, forked):
+    pytest.importorskip('aiosqlite')
+    engine = sa_asyncio.create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}",
+                                            poolclass=ForkingConnectionPool,
+                                            pool_size=pool_size, max_overflow=0,
+                                            pool_timeout=10)
+    try:
+        async def _fork(sconn):
+            async with sconn.fork() as fconn:
+                assert (fconn is not None) == forked
+                if forked:
+                    assert await fconn.scalar(sa.text('SELECT 1')) == 1
+
+        async with engine.begin() as conn:
+            await asyncio.wait_for(_fork(SearchConnection(conn, None, {}, None)), 1)
+
+        # All connections are back in the pool.
+        assert engine.sync_engine.pool.checkedout() == 0
+    finally:
+        await engine.dispose()
@@ -181,6 +181,36 @@ def test_lookup_placex_with_address_details(apiobj, frontend):
            ]
 
 
+@pytest.mark.parametrize('cache_size', ['0', '10'])
+def test_lookup_placex_with_cached_address_details(apiobj, monkeypatch, cache_size):
+    monkeypatch.setenv('NOMINATIM_API_ADDRESS_CACHE_SIZE', cache_size)
+    for place_id in (332, 333):
+        apiobj.add_placex(place_id=place_id, osm_type='W', osm_id=place_id,
+                          class_='highway', type='residential', name='Street',
+                          country_code='pl', rank_search=27, rank_address=26)
+        apiobj.add_address_placex(place_id, fromarea=True, isaddress=True,
+                                  place_id=1001, osm_type='N', osm_id=3334,
+                                  class_='place', type='city', name='Bigplace',
+                                  extratags={'linked_place': 'city'},
+                                  country_code='pl',
+                                  rank_search=17, rank_address=16)
+
+    results = [apiobj.api.details(napi.PlaceID(pid), address_details=True)
+               for pid in (332, 333)]
+
+    for result in results:
+        city = [r for r in result.address_rows if r.place_id == 1001]
+        assert city == [napi.AddressLine(place_id=1001, osm_object=('N', 3334),
+                                         category=('place', 'city'),
+                                         names={'name': 'Bigplace'},
+                                         extratags={'linked_place': 'city', 'place': 'city'},
+                                         admin_level=15, fromarea=True, isaddress=True,
+                                         rank_address=16, distance=0.0)]
+
+    if cache_size != '0':
+        assert apiobj.api.cache_statistics()['address_places']['hits'] == 1
+
+
 def test_lookup_place_with_linked_places_none_existing(apiobj, frontend):
     apiobj.add_placex(place_id=332, osm_type='W', osm_id=4,
                       class_='highway', type='residential',  name='Street',
@@ -108,6 +108,33 @@ def test_lookup_multiple_places(apiobj, frontend):
     assert set(r.place_id for r in result) == {332, 4924}
 
 
+def test_lookup_multiple_places_with_details(apiobj, frontend):
+    for place_id, osm_id in ((332, 4), (333, 5)):
+        apiobj.add_placex(place_id=place_id, osm_type='W', osm_id=osm_id,
+                          class_='highway', type='residential', name='Street',
+                          country_code='pl', rank_search=27, rank_address=26)
+    apiobj.add_placex(place_id=1001, osm_type='N', osm_id=5,
+                      class_='place', type='house', housenumber='23',
+                      country_code='pl', parent_place_id=333,
+                      rank_search=30, rank_address=30)
+    apiobj.add_placex(place_id=1002, osm_type='W', osm_id=6,
+                      class_='highway', type='residential', name='Street',
+                      country_code='pl', linked_place_id=332,
+                      rank_search=27, rank_address=26)
+
+    api = frontend(apiobj, options={'details'})
+    result = api.lookup((napi.PlaceID(332), napi.PlaceID(333)),
+                        linked_places=True, parented_places=True, address_details=True)
+
+    assert [r.place_id for r in result] == [332, 333]
+    assert [r.place_id for r in result[0].linked_rows] == [1002]
+    assert result[0].parented_rows == []
+    assert result[1].linked_rows == []
+    assert [r.place_id for r in result[1].parented_rows] == [1001]
+    for res in result:
+        assert res.address_rows[0].place_id == res.place_id
+
+
 @pytest.mark.parametrize('gtype', list(napi.GeometryFormat))
 def test_simple_place_with_geometry(apiobj, frontend, gtype):
     apiobj.add_placex(place_id=332, osm_type='W', osm_id=4,
@@ -15,6 +15,8 @@ import json
 import pytest
 
 import nominatim_api as napi
+from nominatim_api.result_cache import reverse_reuse_distance
+from nominatim_api.reverse import ReverseGeocoder
 
 API_OPTIONS = {'reverse'}
 
@@ -45,6 +47,119 @@ def test_reverse_street(apiobj, frontend, country):
     assert api.reverse((9.995, 10)).place_id == 990
 
 
+def test_reverse_cache(apiobj, monkeypatch):
+    monkeypatch.setenv('NOMINATIM_API_REVERSE_CACHE_SIZE', '10')
+    monkeypatch.setenv('NOMINATIM_API_REVERSE_CACHE_PRECISION', '3')
+    apiobj.add_placex(place_id=223, class_='place', type='house',
+                      housenumber='1',
+                      centroid=(1.3, 0.7),
+                      geometry='POINT(1.3 0.7)')
+
+    qs1 = napi.QueryStatistics()
+    result1 = apiobj.api.reverse((1.3002, 0.7), query_stats=qs1)
+    qs2 = napi.QueryStatistics()
+    result2 = apiobj.api.reverse((1.30019, 0.7), query_stats=qs2)
+
+    assert qs1['reverse_cache_hit'] == 0
+    assert qs2['reverse_cache_hit'] == 1
+    assert result2.place_id == 223
+    assert result2 is not result1
+    assert result1.distance is not None
+    assert result2.distance is None
+    assert apiobj.api.cache_statistics()['reverse']['hits'] == 1
+
+
+def test_reverse_cache_reuse_depends_on_result_distance(apiobj, monkeypatch):
+    monkeypatch.setenv('NOMINATIM_API_REVERSE_CACHE_SIZE', '10')
+    monkeypatch.setenv('NOMINATIM_API_REVERSE_CACHE_PRECISION', '3')
+    apiobj.add_placex(place_id=223, class_='place', type='house',
+                      housenumber='1',
+                      centroid=(1.3, 0.7),
+                      geometry='POINT(1.3 0.7)')
+
+    # Same grid cell but too far away in relation to the distance of the result.
+    qs = napi.QueryStatistics()
+    apiobj.api.reverse((1.3002, 0.7))
+    apiobj.api.reverse((1.3001, 0.7), query_stats=qs)
+
+    assert qs['reverse_cache_hit'] == 0
+
+
+@pytest.mark.parametrize('distance,expected', [(None, 0.0), (0.0, 0.0),
+                                               (0.0002, 0.00002), (1.0, 0.001)])
+def test_reverse_reuse_distance(distance, expected):
+    result = napi.ReverseResult(napi.SourceTable.PLACEX, ('place', 'house'),
+                                napi.Point(1.0, 2.0), distance=distance)
+
+    assert reverse_reuse_distance(result, 0.001) == pytest.approx(expected)
+    assert reverse_reuse_distance(None, 0.001) == 0.001
+
+
+def test_reverse_cache_distinguishes_parameters(apiobj, monkeypatch):
+    monkeypatch.setenv('NOMINATIM_API_REVERSE_CACHE_SIZE', '10')
+    apiobj.add_placex(place_id=223, class_='place', type='house',
+                      housenumber='1',
+                      centroid=(1.3, 0.7),
+                      geometry='POINT(1.3 0.7)')
+
+    assert apiobj.api.reverse((1.3, 0.7)).place_id == 223
+    assert apiobj.api.reverse((1.3, 0.7), max_rank=4) is None
+
+
+def test_reverse_cache_respects_distance_threshold(apiobj, monkeypatch):
+    monkeypatch.setenv('NOMINATIM_API_REVERSE_CACHE_SIZE', '10')
+    monkeypatch.setenv('NOMINATIM_API_REVERSE_CACHE_PRECISION', '1')
+    apiobj.add_placex(place_id=223, class_='place', type='house',
+                      housenumber='1',
+                      centroid=(1.3, 0.7),
+                      geometry='POINT(1.3 0.7)')
+
+    qs = napi.QueryStatistics()
+    assert apiobj.api.reverse((1.3, 0.7)).place_id == 223
+    assert apiobj.api.reverse((1.0, 0.9), query_stats=qs) is None
+    assert qs['reverse_cache_hit'] == 0
+
+
+def test_reverse_many(apiobj, frontend):
+    apiobj.add_placex(place_id=223, class_='place', type='house',
+                      housenumber='1',
+                      centroid=(1.3, 0.7),
+                      geometry='POINT(1.3 0.7)')
+
+    api = frontend(apiobj, options=API_OPTIONS)
+    results = api.reverse_many([(1.3, 0.7), (50.0, 50.0), (200.0, 0.7), (1.3, 0.7)])
+
+    assert len(results) == 4
+    assert results[0].place_id == 223
+    assert results[1] is None
+    assert results[2] is None
+    assert results[3].place_id == 223
+    assert results[3] is not results[0]
+
+
+def test_reverse_many_timeout_of_single_coordinate(apiobj, frontend, monkeypatch):
+    apiobj.add_placex(place_id=223, class_='place', type='house',
+                      housenumber='1',
+                      centroid=(1.3, 0.7),
+                      geometry='POINT(1.3 0.7)')
+
+    lookup = ReverseGeocoder.lookup
+
+    async def _lookup(self, coord):
+        if coord == (1.0, 1.0):
+            raise TimeoutError()
+        return await lookup(self, coord)
+
+    monkeypatch.setattr(ReverseGeocoder, 'lookup', _lookup)
+
+    api = frontend(apiobj, options=API_OPTIONS)
+    results = api.reverse_many([(1.3, 0.7), (1.0, 1.0), (1.3, 0.7)])
+
+    assert results[0].place_id == 223
+    assert results[1] is None
+    assert results[2].place_id == 223
+
+
 def test_reverse_ignore_unindexed(apiobj, frontend):
     apiobj.add_placex(place_id=223, class_='place', type='house',
                       housenumber='1',
@@ -261,6 +376,23 @@ def test_reverse_low_zoom_address(apiobj, frontend):
     assert api.reverse((59.30005, 80.7005), max_rank=18).place_id == 1002
 
 
+@pytest.mark.parametrize('y,place_id', [(0.7, 223), (10.0, 1002)])
+def test_reverse_speculative(apiobj, monkeypatch, y, place_id):
+    monkeypatch.setenv('NOMINATIM_API_SPECULATIVE_REVERSE', 'yes')
+    apiobj.add_placex(place_id=223, class_='place', type='house',
+                      housenumber='1',
+                      centroid=(1.3, 0.7),
+                      geometry='POINT(1.3 0.7)')
+    apiobj.add_placex(place_id=1002, class_='place', type='town',
+                      name={'name': 'Town'},
+                      rank_address=16,
+                      rank_search=16,
+                      centroid=(1.3, 10.0),
+                      geometry="""POLYGON((1.2 9.9, 1.4 9.9, 1.4 10.1, 1.2 10.1, 1.2 9.9))""")
+
+    assert apiobj.api.reverse((1.3, y)).place_id == place_id
+
+
 def test_reverse_place_node_in_area(apiobj, frontend):
     apiobj.add_placex(place_id=1002, class_='place', type='town',
                       name={'name': 'Town Area'},
@@ -10,9 +10,13 @@ Tests for search API calls.
 These tests make sure that all Python code is correct and executable.
 Functional tests can be found in the BDD test suite.
 """
+import asyncio
+
 import pytest
 
+import nominatim_api as napi
 import nominatim_api.logging as loglib
+from nominatim_api.search.geocoder import ForwardGeocoder
 
 API_OPTIONS = {'search'}
 
@@ -50,6 +54,119 @@ def test_search_simple_word(apiobj, frontend):
     assert [r.place_id for r in results] == [444]
 
 
+def test_search_result_cache(apiobj, monkeypatch):
+    monkeypatch.setenv('NOMINATIM_API_RESULT_CACHE_SIZE', '10')
+    apiobj.add_word_table([(55, 'test', 'W', 'test', None),
+                           (2, 'test', 'w', 'test', None)])
+
+    apiobj.add_placex(place_id=444, class_='place', type='village',
+                      centroid=(1.3, 0.7))
+    apiobj.add_search_name(444, names=[2, 55])
+
+    qs1 = napi.QueryStatistics()
+    results1 = apiobj.api.search('TEST', query_stats=qs1)
+    qs2 = napi.QueryStatistics()
+    results2 = apiobj.api.search('test ', query_stats=qs2)
+
+    assert qs1['result_cache_hit'] == 0
+    assert qs2['result_cache_hit'] == 1
+    assert [r.place_id for r in results2] == [444]
+    assert results2[0] is not results1[0]
+    assert apiobj.api.cache_statistics()['results']['hits'] == 1
+
+
+def test_search_result_cache_distinguishes_parameters(apiobj, monkeypatch):
+    monkeypatch.setenv('NOMINATIM_API_RESULT_CACHE_SIZE', '10')
+    apiobj.add_word_table([(55, 'test', 'W', 'test', None),
+                           (2, 'test', 'w', 'test', None)])
+
+    apiobj.add_placex(place_id=444, class_='place', type='village',
+                      centroid=(1.3, 0.7))
+    apiobj.add_search_name(444, names=[2, 55])
+
+    assert [r.place_id for r in apiobj.api.search('TEST')] == [444]
+    assert apiobj.api.search('TEST', excluded=[444]) == []
+
+
+def test_search_coalesce_concurrent_calls(apiobj, monkeypatch):
+    monkeypatch.setenv('NOMINATIM_API_COALESCE_SIZE', '10')
+    apiobj.add_word_table([(55, 'test', 'W', 'test', None),
+                           (2, 'test', 'w', 'test', None)])
+
+    apiobj.add_placex(place_id=444, class_='place', type='village',
+                      centroid=(1.3, 0.7))
+    apiobj.add_search_name(444, names=[2, 55])
+
+    async def _run():
+        api = apiobj.api._async_api
+        # Queries that only differ in case and spacing are the same search.
+        return await asyncio.gather(api.search('TEST'), api.search(' test '))
+
+    results1, results2 = apiobj.async_to_sync(_run())
+
+    assert [r.place_id for r in results1] == [444]
+    assert [r.place_id for r in results2] == [444]
+    assert results1[0] is not results2[0]
+    assert apiobj.api.cache_statistics()['inflight']['hits'] == 1
+
+
+def test_search_speculative(apiobj, monkeypatch):
+    monkeypatch.setenv('NOMINATIM_API_SPECULATIVE_SEARCHES', '3')
+    apiobj.add_word_table([(55, 'test', 'W', 'test', None),
+                           (2, 'test', 'w', 'test', None)])
+
+    apiobj.add_placex(place_id=444, class_='place', type='village',
+                      centroid=(1.3, 0.7))
+    apiobj.add_search_name(444, names=[2, 55])
+
+    qs = napi.QueryStatistics()
+    results = apiobj.api.search('TEST', query_stats=qs)
+
+    assert [r.place_id for r in results] == [444]
+    assert qs['search_rounds'] >= 1
+
+
+def test_search_many(apiobj, frontend):
+    apiobj.add_word_table([(55, 'test', 'W', 'test', None),
+                           (2, 'test', 'w', 'test', None)])
+
+    apiobj.add_placex(place_id=444, class_='place', type='village',
+                      centroid=(1.3, 0.7))
+    apiobj.add_search_name(444, names=[2, 55])
+
+    api = frontend(apiobj, options=API_OPTIONS)
+    results = api.search_many(['TEST', 'nothing', '', 'test'])
+
+    assert [[r.place_id for r in res] for res in results] == [[444], [], [], [444]]
+
+
+def test_search_many_keeps_results_of_other_queries(apiobj, frontend, monkeypatch):
+    apiobj.add_word_table([(55, 'test', 'W', 'test', None),
+                           (2, 'test', 'w', 'test', None)])
+
+    apiobj.add_placex(place_id=444, class_='place', type='village',
+                      centroid=(1.3, 0.7))
+    apiobj.add_search_name(444, names=[2, 55])
+
+    lookup = ForwardGeocoder.lookup
+
+    async def _lookup(self, phrases):
+        if phrases[0].text == 'fail':
+            raise TimeoutError()
+        return await lookup(self, phrases)
+
+    monkeypatch.setattr(ForwardGeocoder, 'lookup', _lookup)
+
+    api = frontend(apiobj, options=API_OPTIONS)
+    qs = napi.QueryStatistics()
+    results = api.search_many(['test', 'fail', 'test'], query_stats=qs)
+
+    assert [r.place_id for r in results[0]] == [444]
+    assert isinstance(results[1], TimeoutError)
+    assert [r.place_id for r in results[2]] == [444]
+    assert qs['time_normalize'] > 0
+
+
 @pytest.mark.parametrize('logtype', ['text', 'html'])
 def test_search_with_debug(apiobj, frontend, logtype):
     apiobj.add_word_table([(55, 'test', 'W', 'test', None),
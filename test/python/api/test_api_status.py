@@ -82,3 +82,40 @@ async def test_status_connection_timeout_multi_pool(status_table, property_table
                 await api.status()
 
         await api.status()
+
+
+@pytest.mark.asyncio
+async def test_status_while_warming_up(monkeypatch):
+    ready = asyncio.Event()
+
+    async def _setup_database():
+        await ready.wait()
+        raise RuntimeError('stop warm-up')
+
+    api = napi.NominatimAPIAsync()
+    monkeypatch.setattr(api, 'setup_database', _setup_database)
+
+    warm_up = asyncio.ensure_future(api.warm_up())
+    await asyncio.sleep(0)
+
+    result = await api.status()
+    assert result.status == 701
+    assert result.message == 'Warming up'
+
+    ready.set()
+    with pytest.raises(RuntimeError):
+        await warm_up
+
+    assert not api._warming_up
+
+
+@pytest.mark.asyncio
+async def test_status_after_warm_up(status_table, property_table, monkeypatch, tmp_path):
+    monkeypatch.setenv('NOMINATIM_API_POOL_SIZE', '2')
+    queries = tmp_path / 'queries.txt'
+    queries.write_text('# sample queries\n\nfoo\n')
+
+    async with napi.NominatimAPIAsync() as api:
+        await api.warm_up(queries)
+
+        assert (await api.status()).status == 0
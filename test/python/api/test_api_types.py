@@ -109,3 +109,36 @@ def test_postcode_ref_normalizes_underscores_to_spaces():
 
     assert ref.postcode == 'EH4 7EA'
     assert str(ref) == 'Pgb:EH4_7EA'
+
+
+def test_query_stats_timer():
+    qs = typ.QueryStatistics()
+
+    with qs.timer('search'):
+        pass
+    qs.add_time('search', 1.0)
+
+    assert qs['time_search'] >= 1.0
+
+
+def test_query_stats_add_stats():
+    qs = typ.QueryStatistics()
+    qs.add_time('search', 1.0)
+
+    qs.add_stats(typ.QueryStatistics(time_search=0.5, time_format=0.2,
+                                     cancelled_statements=2, search_rounds=3))
+    qs.add_stats(typ.NoQueryStats())
+
+    assert qs['time_search'] == 1.5
+    assert qs['time_format'] == 0.2
+    assert qs['cancelled_statements'] == 2
+    assert 'search_rounds' not in qs
+
+
+def test_current_query_stats():
+    assert isinstance(typ.current_query_stats(), typ.NoQueryStats)
+
+    with typ.QueryStatistics() as qs:
+        assert typ.current_query_stats() is qs
+
+    assert isinstance(typ.current_query_stats(), typ.NoQueryStats)
@@ -0,0 +1,80 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of Nominatim. (https://nominatim.org)
+#
+# Copyright (C) 2026 by the Nominatim developer community.
+# For a full list of authors see the git log.
+"""
+Tests for the export of the database to SQLite.
+"""
+import datetime as dt
+import sqlite3
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects import sqlite
+
+import nominatim_api as napi
+from nominatim_api.sql.sqlalchemy_types import IntArray
+from nominatim_api.sql.sqlite_functions import decode_int_array
+from nominatim_db.tools import convert_sqlite
+
+
+def test_bulk_insert_maps_fields_to_columns():
+    table = sa.Table('t', sa.MetaData(),
+                     sa.Column('id', sa.Integer),
+                     sa.Column('class', sa.Text, key='class_'),
+                     sa.Column('places', IntArray),
+                     sa.Column('name', sa.Text))
+    # The source lists the fields in a different order than the table.
+    insert = convert_sqlite._BulkInsert(table, ['name', 'places', 'class', 'id'],
+                                        sqlite.dialect())
+
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE t (id int, class text, places blob, name text)')
+    conn.executemany(insert.sql, insert.convert([('foo', [3, 1], 'place', 1),
+                                                 ('bar', None, 'amenity', 2)]))
+
+    rows = conn.execute('SELECT id, class, places, name FROM t ORDER BY id').fetchall()
+    assert [(r[0], r[1], r[2] and list(decode_int_array(r[2])), r[3]) for r in rows] \
+        == [(1, 'place', [1, 3], 'foo'), (2, 'amenity', None, 'bar')]
+
+
+@pytest.fixture
+def export_data(apiobj):
+    apiobj.add_data('properties',
+                    [{'property': 'tokenizer', 'value': 'icu'},
+                     {'property': 'tokenizer_import_normalisation', 'value': ':: lower();'},
+                     {'property': 'tokenizer_import_transliteration',
+                      'value': "'1' > '/1/'; 'ä' > 'ä '"}])
+    apiobj.add_word_table([(55, 'test', 'W', 'test', None),
+                           (2, 'test', 'w', 'test', None)])
+    for place_id in range(100, 110):
+        apiobj.add_placex(place_id=place_id, osm_id=place_id, class_='place', type='village',
+                          name={'name': 'Test'}, extratags={'population': '10'},
+                          indexed_date=dt.datetime(2022, 12, 7, 14, 14, 46,
+                                                   tzinfo=dt.timezone.utc),
+                          centroid=(1.0 + place_id / 100, 0.7))
+        apiobj.add_search_name(place_id, names=[2, 55], centroid=(1.0 + place_id / 100, 0.7))
+
+
+def _export(apiobj, db, **kwargs):
+    apiobj.async_to_sync(convert_sqlite.convert(None, db, {'search', 'reverse', 'details'},
+                                                **kwargs))
+
+    return napi.NominatimAPI(environ={'NOMINATIM_DATABASE_DSN': f"sqlite:dbname={db}"})
+
+
+def test_bulk_export_matches_default_export(apiobj, export_data, tmp_path):
+    with _export(apiobj, tmp_path / 'default.sqlite') as default_api, \
+         _export(apiobj, tmp_path / 'bulk.sqlite', bulk=True, threads=3) as bulk_api:
+        for api in (default_api, bulk_api):
+            assert sorted(r.place_id for r in api.search('test')) == list(range(100, 110))
+
+        for place_id in (100, 105):
+            default_result = default_api.details(napi.PlaceID(place_id))
+            bulk_result = bulk_api.details(napi.PlaceID(place_id))
+            assert bulk_result.names == default_result.names
+            assert bulk_result.extratags == default_result.extratags
+            assert bulk_result.indexed_date == default_result.indexed_date
+            assert bulk_result.centroid == default_result.centroid
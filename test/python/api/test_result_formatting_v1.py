@@ -428,3 +428,22 @@ def test_search_extratags_boundary_admin_level_15_no_injection(fmt):
 
         assert 'admin_level' not in extra
         assert extra['place'] == 'city'
+
+
+@pytest.mark.parametrize('fmt', SEARCH_FORMATS)
+def test_search_streamed_output(fmt):
+    geom = '{"type":"LineString","coordinates":[' + ','.join(['[1.0,2.0]'] * 5000) + ']}'
+    results = napi.SearchResults(napi.SearchResult(napi.SourceTable.PLACEX,
+                                                   ('place', 'thing'),
+                                                   napi.Point(1.0, 2.0),
+                                                   place_id=i,
+                                                   geometry={'geojson': geom})
+                                 for i in range(10))
+
+    chunks = list(v1_format.stream_result(results, fmt, {}))
+
+    assert ''.join(chunks) == v1_format.format_result(results, fmt, {})
+    if v1_format.supports_streaming(napi.SearchResults, fmt):
+        assert len(chunks) > 1
+    else:
+        assert len(chunks) == 1
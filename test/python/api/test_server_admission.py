@@ -0,0 +1,185 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of Nominatim. (https://nominatim.org)
+#
+# Copyright (C) 2026 by the Nominatim developer community.
+# For a full list of authors see the git log.
+"""
+Tests for admission control of the ASGI servers.
+"""
+import asyncio
+
+import pytest
+
+from nominatim_api.config import Configuration
+from nominatim_api.errors import UsageError
+from nominatim_api.server.admission import EndpointLimiter, AdmissionController
+
+
+@pytest.mark.asyncio
+async def test_limiter_admit_below_limit():
+    limiter = EndpointLimiter(2, 0, 0.1)
+
+    assert await limiter.acquire()
+    assert await limiter.acquire()
+    assert not await limiter.acquire()
+    assert limiter.rejected == 1
+
+    limiter.release()
+    assert await limiter.acquire()
+
+
+@pytest.mark.asyncio
+async def test_limiter_queue_timeout():
+    limiter = EndpointLimiter(1, 1, 0.05)
+
+    assert await limiter.acquire()
+    assert not await limiter.acquire()
+
+    assert not limiter.waiters
+    assert limiter.running == 1
+
+
+@pytest.mark.asyncio
+async def test_limiter_handover_to_waiting():
+    limiter = EndpointLimiter(1, 1, 10)
+
+    assert await limiter.acquire()
+    waiting = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+
+    assert not await limiter.acquire()  # queue is full
+
+    limiter.release()
+    assert await waiting
+    assert limiter.running == 1
+
+    limiter.release()
+    assert limiter.running == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_cancel_waiting():
+    limiter = EndpointLimiter(1, 1, 10)
+
+    assert await limiter.acquire()
+    waiting = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+    waiting.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+
+    assert not limiter.waiters
+    limiter.release()
+    assert limiter.running == 0
+
+
+def test_controller_disabled():
+    assert AdmissionController.from_config(Configuration(None)) is None
+
+
+def test_controller_from_config():
+    config = Configuration(None, {'NOMINATIM_API_ADMISSION_LIMITS': 'search:4:10, *:8',
+                                  'NOMINATIM_API_ADMISSION_QUEUE_SIZE': '5',
+                                  'NOMINATIM_API_ADMISSION_QUEUE_TIMEOUT': '200'})
+
+    controller = AdmissionController.from_config(config)
+
+    search = controller.get('search')
+    assert (search.max_running, search.max_queued, search.max_wait) == (4, 10, 0.2)
+
+    reverse = controller.get('reverse')
+    assert (reverse.max_running, reverse.max_queued) == (8, 5)
+    assert controller.get('lookup') is reverse
+
+
+@pytest.mark.asyncio
+async def test_controller_rejected():
+    config = Configuration(None, {'NOMINATIM_API_ADMISSION_LIMITS': 'search:1:0, *:1:0'})
+    controller = AdmissionController.from_config(config)
+
+    assert await controller.get('search').acquire()
+    assert not await controller.get('search').acquire()
+
+    assert controller.rejected() == [('*', 0), ('search', 1)]
+
+
+@pytest.mark.asyncio
+async def test_starlette_release_after_streamed_body():
+    pytest.importorskip('starlette')
+    from starlette.responses import StreamingResponse
+    from nominatim_api.server.starlette.server import AdmissionMiddleware
+
+    limiter = EndpointLimiter(1, 0, 0.1)
+    running = []
+
+    async def _body():
+        for chunk in (b'a', b'b'):
+            running.append(limiter.running)
+            yield chunk
+
+    middleware = AdmissionMiddleware(StreamingResponse(_body()),
+                                     AdmissionController({'search': limiter}),
+                                     {'/search': 'search'})
+
+    async def _receive():
+        return {'type': 'http.disconnect'}
+
+    sent = []
+
+    async def _send(message):
+        sent.append(message)
+
+    await middleware({'type': 'http', 'path': '/search', 'method': 'GET', 'headers': []},
+                     _receive, _send)
+
+    assert running == [1, 1]
+    assert sent[-1]['more_body'] is False
+    assert limiter.running == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('path,status', [('/search', 503), ('/status', 200),
+                                         ('/metrics', 200), ('/nothere', 200)])
+async def test_starlette_only_limits_api_endpoints(path, status):
+    pytest.importorskip('starlette')
+    from starlette.responses import PlainTextResponse
+    from nominatim_api.server.starlette.server import AdmissionMiddleware
+
+    limiter = EndpointLimiter(1, 0, 0.1)
+    middleware = AdmissionMiddleware(PlainTextResponse('OK'),
+                                     AdmissionController({}, limiter),
+                                     {'/search': 'search', '/status': 'status'})
+
+    # The server is overloaded.
+    assert await limiter.acquire()
+
+    async def _receive():
+        return {'type': 'http.disconnect'}
+
+    sent = []
+
+    async def _send(message):
+        sent.append(message)
+
+    await middleware({'type': 'http', 'path': path, 'method': 'GET', 'headers': []},
+                     _receive, _send)
+
+    assert sent[0]['status'] == status
+
+
+def test_controller_default_not_for_status():
+    config = Configuration(None, {'NOMINATIM_API_ADMISSION_LIMITS': 'status:2, *:1'})
+    assert AdmissionController.from_config(config).get('status').max_running == 2
+
+    config = Configuration(None, {'NOMINATIM_API_ADMISSION_LIMITS': '*:1'})
+    assert AdmissionController.from_config(config).get('status') is None
+
+
+@pytest.mark.parametrize('limits', ['search', 'search:x', 'search:0', ':4', 'search:1:2:3'])
+def test_controller_bad_config(limits):
+    config = Configuration(None, {'NOMINATIM_API_ADMISSION_LIMITS': limits})
+
+    with pytest.raises(UsageError):
+        AdmissionController.from_config(config)
@@ -385,6 +385,42 @@ class TestReverseEndPoint:
 
         assert await glue.reverse_endpoint(napi.NominatimAPIAsync(), a)
 
+    @pytest.mark.asyncio
+    async def test_reverse_many_success(self, monkeypatch):
+        async def _reverse_many(_, coords, **kwargs):
+            return [self.result if c[0] > 0 else None for c in coords]
+
+        monkeypatch.setattr(napi.NominatimAPIAsync, 'reverse_many', _reverse_many)
+
+        a = FakeAdaptor()
+        a.params['coords'] = '6.8,56.3;-1.0,4.5'
+        a.params['format'] = 'json'
+
+        res = await glue.reverse_endpoint(napi.NominatimAPIAsync(), a)
+        output = json.loads(res.output)
+
+        assert len(output) == 2
+        assert output[0]['lat'] == '2.0000000'
+        assert output[1] == {'error': 'Unable to geocode'}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('coords', ['6.8', '6.8,56.3;', 'a,b', '200,3'])
+    async def test_reverse_many_bad_coords(self, coords):
+        a = FakeAdaptor()
+        a.params['coords'] = coords
+        a.params['format'] = 'json'
+
+        with pytest.raises(FakeError, match="^400 -- (?s:.*)Parameter 'coords'"):
+            await glue.reverse_endpoint(napi.NominatimAPIAsync(), a)
+
+    @pytest.mark.asyncio
+    async def test_reverse_many_xml_not_supported(self):
+        a = FakeAdaptor()
+        a.params['coords'] = '6.8,56.3'
+
+        with pytest.raises(FakeError, match='^400 -- (?s:.*)JSON'):
+            await glue.reverse_endpoint(napi.NominatimAPIAsync(), a)
+
     @pytest.mark.asyncio
     async def test_reverse_from_search(self):
         a = FakeAdaptor()
@@ -452,6 +488,23 @@ class TestLookupEndpoint:
 
         assert len(json.loads(res.output)) == 1
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('fmt', ['json', 'jsonv2', 'geojson', 'geocodejson'])
+    async def test_lookup_streamed_geometry(self, fmt):
+        self.results[0].geometry = {'geojson': '{"type":"Point","coordinates":[1.0,2.0]}'}
+        a = FakeAdaptor()
+        a.params['format'] = fmt
+        a.params['osm_ids'] = 'N23,W34'
+        a.params['polygon_geojson'] = '1'
+        a.params['json_callback'] = 'foo'
+
+        res = await glue.lookup_endpoint(napi.NominatimAPIAsync(), a)
+
+        assert res.content_type == 'application/javascript; charset=utf-8'
+        assert res.output.startswith('foo(')
+        assert res.output.endswith(')')
+        json.loads(res.output[4:-1])
+
 
 # search_endpoint()
 
@@ -583,3 +636,99 @@ class TestSearchEndPointSearchCategory:
         res = await glue.search_endpoint(napi.NominatimAPIAsync(), a)
 
         assert len(json.loads(res.output)) == 1
+
+
+class TestSearchBatchEndPoint:
+
+    @pytest.fixture(autouse=True)
+    def patch_lookup_func(self, monkeypatch):
+        self.results = [napi.SearchResult(napi.SourceTable.PLACEX,
+                                          ('place', 'thing'),
+                                          napi.Point(1.0, 2.0))]
+
+        async def _search_many(_, queries, **kwargs):
+            return [napi.SearchResults(self.results if q else []) for q in queries]
+
+        monkeypatch.setattr(napi.NominatimAPIAsync, 'search_many', _search_many)
+
+    @pytest.mark.asyncio
+    async def test_search_batch(self):
+        a = FakeAdaptor(body=b'["something", "", "else"]')
+
+        res = await glue.search_batch_endpoint(napi.NominatimAPIAsync(), a)
+        output = json.loads(res.output)
+
+        assert [len(r) for r in output] == [1, 0, 1]
+
+    @pytest.mark.asyncio
+    async def test_search_batch_failed_queries(self, monkeypatch):
+        async def _search_many(_, queries, **kwargs):
+            return [napi.SearchResults(self.results), TimeoutError(), napi.UsageError('Bad'),
+                    RuntimeError('Oops')]
+
+        monkeypatch.setattr(napi.NominatimAPIAsync, 'search_many', _search_many)
+        a = FakeAdaptor(body=b'["something", "slow", "bad", "broken"]')
+
+        res = await glue.search_batch_endpoint(napi.NominatimAPIAsync(), a)
+        output = json.loads(res.output)
+
+        assert len(output[0]) == 1
+        assert output[1] == {'error': {'code': 503,
+                                       'message': 'Query took too long to process.'}}
+        assert output[2] == {'error': {'code': 400, 'message': 'Bad'}}
+        assert output[3]['error']['code'] == 500
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('body', [b'', b'{"q": "foo"}', b'["foo", 3]', b'[foo]'])
+    async def test_search_batch_bad_body(self, body):
+        a = FakeAdaptor(body=body)
+
+        with pytest.raises(FakeError, match='^400 -- (?s:.*)JSON array'):
+            await glue.search_batch_endpoint(napi.NominatimAPIAsync(), a)
+
+    @pytest.mark.asyncio
+    async def test_search_batch_too_many_queries(self):
+        a = FakeAdaptor(body=json.dumps(['foo'] * 1001).encode())
+
+        with pytest.raises(FakeError, match='^400 -- (?s:.*)Too many'):
+            await glue.search_batch_endpoint(napi.NominatimAPIAsync(), a)
+
+    @pytest.mark.asyncio
+    async def test_search_batch_xml_not_supported(self):
+        a = FakeAdaptor(params={'format': 'xml'}, body=b'["foo"]')
+
+        with pytest.raises(FakeError, match='^400 -- (?s:.*)JSON output'):
+            await glue.search_batch_endpoint(napi.NominatimAPIAsync(), a)
+
+
+class TestAutocompleteEndPoint:
+
+    @pytest.fixture(autouse=True)
+    def patch_lookup_func(self, monkeypatch):
+        self.results = [napi.SearchResult(napi.SourceTable.PLACEX,
+                                          ('place', 'thing'),
+                                          napi.Point(1.0, 2.0))]
+        self.queries = []
+
+        async def _autocomplete(_, query, **kwargs):
+            self.queries.append(query)
+            return napi.SearchResults(self.results)
+
+        monkeypatch.setattr(napi.NominatimAPIAsync, 'autocomplete', _autocomplete)
+
+    @pytest.mark.asyncio
+    async def test_autocomplete(self):
+        a = FakeAdaptor()
+        a.params['q'] = 'Berlin Ale'
+
+        res = await glue.autocomplete_endpoint(napi.NominatimAPIAsync(), a)
+
+        assert len(json.loads(res.output)) == 1
+        assert self.queries == ['Berlin Ale']
+
+    @pytest.mark.asyncio
+    async def test_autocomplete_missing_query(self):
+        a = FakeAdaptor()
+
+        with pytest.raises(FakeError, match='^400 -- (?s:.*)Missing'):
+            await glue.autocomplete_endpoint(napi.NominatimAPIAsync(), a)
@@ -0,0 +1,125 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of Nominatim. (https://nominatim.org)
+#
+# Copyright (C) 2026 by the Nominatim developer community.
+# For a full list of authors see the git log.
+"""
+Tests for HTTP caching support of the ASGI servers.
+"""
+import datetime as dt
+import time
+
+import pytest
+
+from nominatim_api import NominatimAPIAsync
+from nominatim_api.config import Configuration
+from nominatim_api.errors import UsageError
+from nominatim_api.server.http_cache import CacheValidators, HttpCacheControl
+
+IMPORT_DATE = dt.datetime(2022, 12, 7, 14, 14, 46, 345, tzinfo=dt.timezone.utc)
+
+
+def test_validators_headers():
+    validators = CacheValidators('"abc"', IMPORT_DATE, 3600)
+
+    assert validators.headers() == {'ETag': '"abc"',
+                                    'Last-Modified': 'Wed, 07 Dec 2022 14:14:46 GMT',
+                                    'Cache-Control': 'public, max-age=3600',
+                                    'Vary': 'Accept-Language'}
+
+
+@pytest.mark.parametrize('header,result', [('"abc"', True), ('W/"abc"', True),
+                                           ('"xyz", "abc"', True), ('*', True),
+                                           ('"xyz"', False), ('abc', False)])
+def test_validators_if_none_match(header, result):
+    validators = CacheValidators('"abc"', IMPORT_DATE, 3600)
+
+    assert validators.is_not_modified(header, None) == result
+    # If-Modified-Since must be ignored.
+    assert validators.is_not_modified(header, 'Wed, 07 Dec 2022 14:14:45 GMT') == result
+
+
+@pytest.mark.parametrize('header,result', [('Wed, 07 Dec 2022 14:14:46 GMT', True),
+                                           ('Thu, 08 Dec 2022 00:00:00 GMT', True),
+                                           ('Wed, 07 Dec 2022 14:14:45 GMT', False),
+                                           ('yesterday', False)])
+def test_validators_if_modified_since(header, result):
+    validators = CacheValidators('"abc"', IMPORT_DATE, 3600)
+
+    assert validators.is_not_modified(None, header) == result
+
+
+def test_validators_unconditional():
+    assert not CacheValidators('"abc"', IMPORT_DATE, 3600).is_not_modified(None, None)
+
+
+def test_cache_control_disabled():
+    assert HttpCacheControl.from_config(Configuration(None)) is None
+
+
+def test_cache_control_from_config():
+    config = Configuration(None, {'NOMINATIM_API_HTTP_CACHE_MAX_AGE': 'reverse:3600, *:60'})
+
+    control = HttpCacheControl.from_config(config)
+
+    assert control.get('reverse') == 3600
+    assert control.get('details') == 60
+
+
+@pytest.mark.parametrize('setting', ['reverse', 'reverse:x', 'reverse:-1', ':4', 'reverse:1:2'])
+def test_cache_control_bad_config(setting):
+    config = Configuration(None, {'NOMINATIM_API_HTTP_CACHE_MAX_AGE': setting})
+
+    with pytest.raises(UsageError):
+        HttpCacheControl.from_config(config)
+
+
+@pytest.mark.asyncio
+async def test_cache_control_validators(apiobj):
+    apiobj.add_data('import_status', [{'lastimportdate': IMPORT_DATE}])
+    api = apiobj.api._async_api
+    control = HttpCacheControl({'reverse': 60})
+
+    # The import date is not known yet, it is read in the background.
+    assert control.validators(api, 'reverse', b'lat=1&lon=2', None) is None
+    await api._data_version_refresh
+
+    validators = control.validators(api, 'reverse', b'lat=1&lon=2', None)
+
+    assert validators.last_modified == IMPORT_DATE.replace(microsecond=0)
+    assert validators.max_age == 60
+
+    same = control.validators(api, 'reverse', b'lon=2&lat=1', None)
+    assert same.etag == validators.etag
+
+    for args in (('reverse', b'lat=1&lon=3', None), ('reverse', b'lat=1&lon=2', 'de'),
+                 ('lookup', b'lat=1&lon=2', None)):
+        other = control.validators(api, *args)
+        assert other is None or other.etag != validators.etag
+
+    assert control.validators(api, 'lookup', b'', None) is None
+
+
+@pytest.mark.asyncio
+async def test_cache_control_uses_known_import_date():
+    api = NominatimAPIAsync(environ={'NOMINATIM_DATABASE_DSN': 'sqlite:dbname=/nonexistent'})
+    api._property_cache['DB:data_version'] = (time.monotonic() + 100, IMPORT_DATE)
+    control = HttpCacheControl({}, 60)
+
+    assert control.validators(api, 'reverse', b'lat=1&lon=2', None).max_age == 60
+    assert control.validators(api, 'status', b'', None) is None
+    assert api._data_version_refresh is None
+
+
+@pytest.mark.asyncio
+async def test_cache_control_database_unavailable(tmp_path):
+    api = NominatimAPIAsync(environ={'NOMINATIM_DATABASE_DSN':
+                                     f"sqlite:dbname={tmp_path / 'missing.sqlite'}"})
+    control = HttpCacheControl({}, 60)
+
+    assert control.validators(api, 'reverse', b'lat=1&lon=2', None) is None
+    await api._data_version_refresh
+
+    assert control.validators(api, 'reverse', b'lat=1&lon=2', None) is None
+    await api.close()
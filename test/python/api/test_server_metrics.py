@@ -0,0 +1,59 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of Nominatim. (https://nominatim.org)
+#
+# Copyright (C) 2026 by the Nominatim developer community.
+# For a full list of authors see the git log.
+"""
+Tests for the collection of request latency metrics.
+"""
+from nominatim_api.server.admission import EndpointLimiter, AdmissionController
+from nominatim_api.server.metrics import MetricsCollector
+
+
+def test_metrics_empty():
+    assert MetricsCollector().render().count('\n') == 4
+
+
+def test_metrics_observe():
+    collector = MetricsCollector()
+
+    collector.observe('search', {'total_time': 0.2, 'wait_time': 0.001,
+                                 'time_search': 0.15, 'time_format': ''})
+    collector.observe('search', {'total_time': 0.02, 'wait_time': 0.001})
+
+    assert set(collector.histograms) == {('search', 'total'), ('search', 'wait'),
+                                         ('search', 'search')}
+
+    lines = collector.render().split('\n')
+
+    prefix = 'nominatim_request_duration_seconds'
+    assert f'{prefix}_bucket{{endpoint="search",stage="total",le="0.025"}} 1' in lines
+    assert f'{prefix}_bucket{{endpoint="search",stage="total",le="0.25"}} 2' in lines
+    assert f'{prefix}_bucket{{endpoint="search",stage="total",le="+Inf"}} 2' in lines
+    assert f'{prefix}_count{{endpoint="search",stage="search"}} 1' in lines
+    assert f'{prefix}_sum{{endpoint="search",stage="search"}} 0.15' in lines
+
+
+def test_metrics_cancelled():
+    collector = MetricsCollector()
+
+    collector.count_cancelled('search', {'cancelled_statements': 2})
+    collector.count_cancelled('search', {'cancelled_statements': ''})
+    collector.count_cancelled('reverse', {})
+
+    lines = collector.render().split('\n')
+
+    assert 'nominatim_cancelled_statements_total{endpoint="search"} 2' in lines
+    assert not any(line.startswith('nominatim_cancelled_statements_total{endpoint="reverse"')
+                   for line in lines)
+
+
+def test_metrics_admission_rejected():
+    limiter = EndpointLimiter(1, 0, 0.1)
+    limiter.rejected = 3
+    collector = MetricsCollector(AdmissionController({'search': limiter}))
+
+    lines = collector.render().split('\n')
+
+    assert 'nominatim_admission_rejected_total{endpoint="search"} 3' in lines
@@ -0,0 +1,97 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of Nominatim. (https://nominatim.org)
+#
+# Copyright (C) 2026 by the Nominatim developer community.
+# For a full list of authors see the git log.
+"""
+Tests for the custom functions of the SQLite frontend.
+"""
+import sqlite3
+
+import pytest
+
+from nominatim_api.sql.sqlite_functions import encode_int_array, decode_int_array, \
+                                               weigh_search, array_contains, \
+                                               array_pair_contains, array_cat, \
+                                               ArrayIntersectFuzzy, ArrayUnion
+
+
+def text_array(values):
+    return ','.join(map(str, values))
+
+
+ENCODINGS = [text_array, encode_int_array]
+
+
+@pytest.mark.parametrize('values', [[], [5], [3, 1, 2], [-4, 2**31 - 1],
+                                    [2**31, 1], [-2**40, 0]])
+def test_int_array_roundtrip(values):
+    assert list(decode_int_array(encode_int_array(values))) == sorted(values)
+
+
+def test_int_array_binary_is_compact():
+    values = list(range(100000, 101000))
+
+    assert len(encode_int_array(values)) < len(text_array(values))
+
+
+@pytest.mark.parametrize('enc', ENCODINGS)
+def test_weigh_search(enc):
+    rankings = '[[0.1, [1, 2]], [0.3, [4]]]'
+
+    assert weigh_search(enc([4, 2, 5]), rankings, 1.0) == 0.3
+    assert weigh_search(enc([2, 1]), rankings, 1.0) == 0.1
+    assert weigh_search(enc([2, 3]), rankings, 1.0) == 1.0
+    assert weigh_search(None, rankings, 1.0) == 1.0
+
+
+@pytest.mark.parametrize('enc', ENCODINGS)
+def test_array_contains(enc):
+    assert array_contains(enc([1, 2, 3]), '3,1')
+    assert not array_contains(enc([1, 2, 3]), '3,4')
+    assert array_contains(None, '1') is None
+
+    assert array_pair_contains(enc([1, 2]), enc([3]), '3,1')
+    assert not array_pair_contains(enc([1, 2]), enc([3]), '4')
+
+
+@pytest.mark.parametrize('enc', ENCODINGS)
+def test_array_cat(enc):
+    assert array_cat(enc([1, 2]), enc([3])) == '1,2,3'
+    assert array_cat(None, enc([3])) == '3'
+    assert array_cat(None, None) is None
+
+
+@pytest.fixture
+def sqlite_conn():
+    conn = sqlite3.connect(':memory:')
+    conn.create_function('array_contains', 2, array_contains)
+    conn.create_aggregate('array_intersect_fuzzy', 1, ArrayIntersectFuzzy)
+    conn.create_aggregate('array_union', 1, ArrayUnion)
+    conn.execute('CREATE TABLE arrays (id int, places text)')
+    yield conn
+    conn.close()
+
+
+@pytest.mark.parametrize('enc', ENCODINGS)
+def test_aggregates(sqlite_conn, enc):
+    sqlite_conn.executemany('INSERT INTO arrays VALUES (?, ?)',
+                            [(1, enc([3, 5, 7])),
+                             (2, enc(range(0, 1000))),
+                             (3, enc([1, 3, 5, 8]))])
+
+    def _query(sql):
+        return sqlite_conn.execute(sql).fetchone()[0]
+
+    intersect = _query("SELECT array_intersect_fuzzy(places)"
+                       " FROM (SELECT places FROM arrays ORDER BY id)")
+    assert sorted(map(int, intersect.split(','))) == [3, 5]
+
+    single = _query("SELECT array_intersect_fuzzy(places) FROM arrays WHERE id = 1")
+    assert single == '3,5,7'
+
+    union = _query("SELECT array_union(places) FROM arrays WHERE id != 2")
+    assert sorted(map(int, union.split(','))) == [1, 3, 5, 7, 8]
+
+    assert _query("SELECT count(*) FROM arrays WHERE array_contains(places, '3,5')") == 3
@@ -34,3 +34,13 @@ async def test_timeout_elapse():
     assert timeout.abs is not None
     await asyncio.sleep(0.5)
     assert timeout.is_elapsed()
+
+
+@pytest.mark.asyncio
+async def test_timeout_remaining():
+    assert Timeout(None).remaining() is None
+
+    timeout = Timeout(0.5)
+    assert 0.0 < timeout.remaining() <= 0.5
+    await asyncio.sleep(0.5)
+    assert timeout.remaining() == 0.0
@@ -15,8 +15,10 @@ import pytest
 
 import nominatim_db.indexer.indexer
 import nominatim_db.tools.add_osm_data
+import nominatim_db.tools.convert_sqlite
 import nominatim_db.tools.freeze
 import nominatim_db.tools.tiger_data
+from nominatim_db.tools.special_phrases.sp_importer import SPImporter
 
 
 def test_cli_help(cli_call, capsys):
@@ -37,6 +39,17 @@ def test_cli_version(cli_call, capsys):
     assert captured.out.startswith('Nominatim version')
 
 
+@pytest.mark.parametrize('params,bulk,threads', [((), False, 1),
+                                                 (('--bulk', '--threads', '4'), True, 4)])
+def test_cli_convert(cli_call, async_mock_func_factory, tmp_path, params, bulk, threads):
+    mock = async_mock_func_factory(nominatim_db.tools.convert_sqlite, 'convert')
+
+    assert cli_call('convert', '-o', str(tmp_path / 'out.sqlite'), *params) == 0
+
+    assert mock.called == 1
+    assert mock.last_kwargs == {'bulk': bulk, 'threads': threads}
+
+
 class TestCliWithDb:
 
     @pytest.fixture(autouse=True)
@@ -102,14 +115,14 @@ class TestCliWithDb:
         assert postcode_mock.called == do_ranks
 
     def test_special_phrases_wiki_command(self, mock_func_factory):
-        func = mock_func_factory(nominatim_db.clicmd.special_phrases.SPImporter, 'import_phrases')
+        func = mock_func_factory(SPImporter, 'import_phrases')
 
         self.call_nominatim('special-phrases', '--import-from-wiki', '--no-replace')
 
         assert func.called == 1
 
     def test_special_phrases_csv_command(self, src_dir, mock_func_factory):
-        func = mock_func_factory(nominatim_db.clicmd.special_phrases.SPImporter, 'import_phrases')
+        func = mock_func_factory(SPImporter, 'import_phrases')
         testdata = src_dir / 'test' / 'testdb'
         csv_path = str((testdata / 'full_en_phrases_test.csv').resolve())
 
@@ -41,6 +41,16 @@ class TestRefresh:
         assert self.call_nominatim('refresh', '--word-tokens') == 0
         assert self.tokenizer_mock.update_word_tokens_called
 
+    def test_refresh_word_dictionary_not_configured(self):
+        assert self.call_nominatim('refresh', '--word-dictionary') == 1
+
+    def test_refresh_word_dictionary(self, monkeypatch, async_mock_func_factory):
+        monkeypatch.setenv('NOMINATIM_API_WORD_DICTIONARY', 'words.bin')
+        func_mock = async_mock_func_factory(nominatim_db.tools.refresh, 'create_word_dictionary')
+
+        assert self.call_nominatim('refresh', '--word-dictionary') == 0
+        assert func_mock.called == 1
+
     def test_refresh_postcodes(self, async_mock_func_factory, mock_func_factory,
                                place_postcode_table):
         func_mock = mock_func_factory(nominatim_db.tools.postcodes, 'update_postcodes')
@@ -0,0 +1,67 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of Nominatim. (https://nominatim.org)
+#
+# Copyright (C) 2026 by the Nominatim developer community.
+# For a full list of authors see the git log.
+"""
+Benchmarks for the import time of the entry points of the command line
+tool and the library.
+
+Each test imports an entry point in a fresh interpreter with
+'-X importtime' and checks that no heavy dependencies are loaded.
+The check of the cumulative import time against a budget depends on
+the machine and only runs with '--run-benchmarks'.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Modules that must only be loaded once they are needed by a command or request.
+HEAVY_MODULES = ('sqlalchemy', 'psycopg', 'asyncpg', 'yaml', 'icu', 'psutil',
+                 'mwparserfromhell', 'falcon', 'starlette')
+
+# Budget for the cumulative import time of each entry point in milliseconds.
+# The budgets are generous to accommodate slow test machines. They are meant
+# to catch an eager import of one of the heavy dependencies.
+IMPORT_BUDGETS = {'nominatim_api': 150, 'nominatim_db.cli': 300}
+
+ENTRY_POINT_CODE = {'nominatim_api': 'import nominatim_api',
+                    'nominatim_db.cli': 'import nominatim_db.cli as cli; cli.get_set_parser()'}
+
+
+def run_import(src_dir, entry_point):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, (str(src_dir / 'src'),
+                                                      env.get('PYTHONPATH'))))
+    code = ENTRY_POINT_CODE[entry_point] \
+        + '; import sys; print(" ".join(sorted(sys.modules)))'
+
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          env=env, capture_output=True, text=True, check=True)
+
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, module = line[12:].split('|')
+            if cumulative.strip().isdigit():
+                timings[module.strip()] = int(cumulative) / 1000.0
+
+    return set(proc.stdout.split()), timings
+
+
+@pytest.mark.parametrize('entry_point', IMPORT_BUDGETS)
+def test_no_heavy_imports(src_dir, entry_point):
+    modules, _ = run_import(src_dir, entry_point)
+
+    assert not [m for m in HEAVY_MODULES if m in modules]
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('entry_point', IMPORT_BUDGETS)
+def test_import_time_budget(src_dir, entry_point):
+    _, timings = run_import(src_dir, entry_point)
+
+    assert timings[entry_point] < IMPORT_BUDGETS[entry_point]
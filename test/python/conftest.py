@@ -43,6 +43,21 @@ def _with_srid(geom, default=None):
     return f"SRID=4326;{geom}"
 
 
+def pytest_addoption(parser):
+    parser.addoption('--run-benchmarks', action='store_true',
+                     help='Run tests that measure timings.')
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--run-benchmarks'):
+        return
+
+    skip = pytest.mark.skip(reason='needs --run-benchmarks')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
+
+
 @pytest.fixture
 def src_dir():
     return SRC_DIR
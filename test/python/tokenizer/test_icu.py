@@ -238,6 +238,55 @@ def test_update_statistics(word_table, table_factory, temp_db_cursor,
         {(1000, 2, None), (1001, 2, None), (1002, None, 2)}
 
 
+def test_update_statistics_word_pairs(word_table, table_factory, temp_db_cursor,
+                                      tokenizer_factory, test_config, monkeypatch):
+    monkeypatch.setattr(icu_tokenizer, 'PAIR_MIN_WORD_COUNT', 2)
+    monkeypatch.setattr(icu_tokenizer, 'PAIR_MIN_COUNT', 2)
+    for word_id, word in ((1, 'new'), (2, 'york'), (3, 'road'), (4, 'rare')):
+        temp_db_cursor.execute("""INSERT INTO word (word_id, word_token, type, word)
+                                  VALUES (%s, %s, 'w', %s)""", (word_id, word, word))
+    table_factory('search_name',
+                  'place_id BIGINT, name_vector INT[], nameaddress_vector INT[]',
+                  [(12, [1, 2], []), (13, [1, 2, 3], []), (14, [1, 3, 4], []),
+                   (15, [4], [])])
+    tok = tokenizer_factory()
+
+    tok.update_statistics(test_config)
+
+    assert temp_db_cursor.row_set("""SELECT word_id, key::int, value::int
+                                     FROM word, jsonb_each_text(info->'pairs')
+                                     WHERE type = 'w'""") == \
+        {(1, 2, 2), (1, 3, 2), (2, 1, 2), (3, 1, 2)}
+
+
+def test_update_statistics_word_pairs_sampled(word_table, table_factory, temp_db_cursor,
+                                              tokenizer_factory, test_config, monkeypatch):
+    monkeypatch.setattr(icu_tokenizer, 'PAIR_MIN_WORD_COUNT', 2)
+    monkeypatch.setattr(icu_tokenizer, 'PAIR_MIN_COUNT', 2)
+    monkeypatch.setattr(icu_tokenizer, 'PAIR_SAMPLE_SIZE', 400)
+    for word_id, word in ((1, 'new'), (2, 'york'), (3, 'road'), (4, 'rare')):
+        temp_db_cursor.execute("""INSERT INTO word (word_id, word_token, type, word)
+                                  VALUES (%s, %s, 'w', %s)""", (word_id, word, word))
+    # Exact pair counts: (1, 2) appears 400 times, (1, 3) 200 times.
+    table_factory('search_name',
+                  'place_id BIGINT, name_vector INT[], nameaddress_vector INT[]',
+                  [(i, [1, 2], []) for i in range(400)]
+                  + [(i, [1, 3], []) for i in range(400, 600)]
+                  + [(i, [4], []) for i in range(600, 800)])
+    tok = tokenizer_factory()
+
+    tok.update_statistics(test_config)
+
+    pairs = {(w1, w2): count for w1, w2, count in
+             temp_db_cursor.row_set("""SELECT word_id, key::int, value::int
+                                       FROM word, jsonb_each_text(info->'pairs')
+                                       WHERE type = 'w'""")}
+    assert pairs.keys() == {(1, 2), (1, 3), (2, 1), (3, 1)}
+    assert pairs[(1, 2)] == pytest.approx(400, rel=0.25)
+    assert pairs[(1, 3)] == pytest.approx(200, rel=0.25)
+    assert pairs[(2, 1)] == pairs[(1, 2)]
+
+
 def test_normalize_postcode(analyzer):
     with analyzer() as anl:
         anl.normalize_postcode('123') == '123'
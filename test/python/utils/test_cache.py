@@ -0,0 +1,190 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of Nominatim. (https://nominatim.org)
+#
+# Copyright (C) 2026 by the Nominatim developer community.
+# For a full list of authors see the git log.
+"""
+Tests for the in-process LRU cache and call coalescing.
+"""
+import asyncio
+
+import pytest
+
+from nominatim_api.utils.cache import LRUCache, CallCoalescer
+
+
+def test_get_and_put():
+    cache = LRUCache(10)
+
+    assert cache.get('a') is None
+    cache.put('a', 1)
+
+    assert cache.get('a') == 1
+    assert 'a' in cache
+    assert cache.stats() == {'size': 1, 'maxsize': 10,
+                             'hits': 1, 'misses': 1, 'evictions': 0}
+
+
+def test_evict_least_recently_used():
+    cache = LRUCache(2)
+
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+
+    assert list(cache) == ['a', 'c']
+    assert cache.evictions == 1
+
+
+def test_zero_size_cache_stores_nothing():
+    cache = LRUCache(0)
+
+    cache.put('a', 1)
+
+    assert len(cache) == 0
+    assert cache.get('a') is None
+
+
+def test_pop_and_clear():
+    cache = LRUCache(10)
+    cache.put('a', 1)
+    cache.put('b', 2)
+
+    assert cache.pop('a') == 1
+    assert cache.pop('a') is None
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_set_version_discards_content():
+    cache = LRUCache(10)
+
+    cache.set_version(1)
+    cache.put('a', 1)
+    cache.set_version(1)
+    assert cache.get('a') == 1
+
+    cache.set_version(2)
+    assert cache.get('a') is None
+    assert cache.version == 2
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('nominatim_api.utils.cache.time.monotonic', lambda: now[0])
+    cache = LRUCache(10, ttl=5)
+
+    cache.put('a', 1)
+    now[0] += 4
+    assert cache.get('a') == 1
+
+    now[0] += 2
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_coalescer_shares_result():
+    coalescer = CallCoalescer(10)
+    calls = []
+
+    async def _func():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return ['result']
+
+    results = await asyncio.gather(*(coalescer.run('a', _func) for _ in range(3)))
+
+    assert len(calls) == 1
+    assert [r[0] for r in results] == [['result']] * 3
+    assert [r[1] for r in results] == [False, True, True]
+    assert results[1][0] is not results[2][0]
+    assert coalescer.stats() == {'size': 0, 'maxsize': 10, 'hits': 2,
+                                 'misses': 1, 'bypassed': 0}
+
+
+@pytest.mark.asyncio
+async def test_coalescer_different_keys():
+    coalescer = CallCoalescer(10)
+
+    async def _func(key):
+        await asyncio.sleep(0.01)
+        return key
+
+    results = await asyncio.gather(coalescer.run('a', lambda: _func('a')),
+                                   coalescer.run('b', lambda: _func('b')))
+
+    assert results == [('a', False), ('b', False)]
+
+
+@pytest.mark.asyncio
+async def test_coalescer_bypass_when_full():
+    coalescer = CallCoalescer(1)
+
+    async def _func():
+        await asyncio.sleep(0.01)
+        return 1
+
+    await asyncio.gather(coalescer.run('a', _func), coalescer.run('b', _func))
+
+    assert coalescer.bypassed == 1
+
+
+@pytest.mark.asyncio
+async def test_coalescer_shares_exception():
+    coalescer = CallCoalescer(10)
+
+    async def _func():
+        await asyncio.sleep(0.01)
+        raise ValueError('bad')
+
+    results = await asyncio.gather(coalescer.run('a', _func), coalescer.run('a', _func),
+                                   return_exceptions=True)
+
+    assert all(isinstance(r, ValueError) for r in results)
+    assert len(coalescer) == 0
+
+
+@pytest.mark.asyncio
+async def test_coalescer_follower_runs_after_cancel():
+    coalescer = CallCoalescer(10)
+
+    async def _func():
+        await asyncio.sleep(0.05)
+        return 1
+
+    leader = asyncio.ensure_future(coalescer.run('a', _func))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(coalescer.run('a', _func))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == (1, False)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('leader_result', [TimeoutError, 'incomplete'])
+async def test_coalescer_follower_runs_after_timeout(leader_result):
+    coalescer = CallCoalescer(10)
+    calls = []
+
+    async def _func():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        if len(calls) == 1 and leader_result is TimeoutError:
+            raise TimeoutError()
+        return len(calls)
+
+    results = await asyncio.gather(coalescer.run('a', _func, lambda: len(calls) > 1),
+                                   coalescer.run('a', _func),
+                                   return_exceptions=True)
+
+    if leader_result is TimeoutError:
+        assert isinstance(results[0], TimeoutError)
+    else:
+        assert results[0] == (1, False)
+    assert results[1] == (2, False)
+    assert coalescer.hits == 0
@@ -11,7 +11,7 @@ import json
 
 import pytest
 
-from nominatim_api.utils.json_writer import JsonWriter
+from nominatim_api.utils.json_writer import JsonWriter, ChunkedJsonWriter
 
 
 @pytest.mark.parametrize("inval,outstr", [(None, 'null'),
@@ -107,3 +107,20 @@ def test_raw_output():
                 .end_array()
 
     assert writer() == '[{ "nicely": "formatted here" },1]'
+
+
+def test_chunked_output():
+    writer = ChunkedJsonWriter(chunk_size=10)
+    chunks = []
+
+    writer.start_array()
+    for i in range(5):
+        writer.value('x' * i).next()
+        chunk = writer.chunk()
+        if chunk is not None:
+            chunks.append(chunk)
+    writer.end_array()
+    chunks.append(writer())
+
+    assert len(chunks) == 3
+    assert ''.join(chunks) == '["","x","xx","xxx","xxxx"]'